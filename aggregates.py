@@ -0,0 +1,181 @@
+"""Precomputed group statistics shared by the objective pages.
+
+The cube is built once per dataset version and holds count, sum, sum of
+squares, min and max of every measure for each grouping the pages chart.
+Pages derive means (and spreads) from it, so a rerun costs O(groups)
+instead of a scan over every student row.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils import (
+    COL_ATTENDANCE, COL_DEPARTMENT, COL_GAMING, COL_GENDER, COL_HSC, COL_LAST,
+    COL_OVERALL, COL_PREPARATION, COL_SEMESTER, COL_SSC, load_stream_summary
+)
+
+# Group combinations used by the pages; an empty tuple is the whole-cohort total
+CUBE_DIMENSIONS = {
+    'total': (),
+    'attendance': (COL_ATTENDANCE,),
+    'department': (COL_DEPARTMENT,),
+    'dept_gender': (COL_DEPARTMENT, COL_GENDER),
+    'semester': (COL_SEMESTER,),
+    'preparation': (COL_PREPARATION,),
+    'gaming': (COL_GAMING,),
+    'prep_gaming': (COL_PREPARATION, COL_GAMING),
+}
+
+MEASURES = [
+    COL_OVERALL, COL_LAST, COL_HSC, COL_SSC,
+    'Attendance_numeric', 'Preparation_numeric', 'Semester_sort',
+]
+
+STATS = ['count', 'sum', 'sumsq', 'min', 'max']
+
+
+def _group_frame(df, dims, measures):
+    values = df[measures].astype('float64')  # accumulate float32 scores in float64
+    squares = values.pow(2).add_suffix('__sq')
+    frame = pd.concat([values, squares], axis=1)
+    keys = list(dims) if dims else np.zeros(len(df), dtype=np.int8)
+    if dims:
+        frame = pd.concat([df[list(dims)], frame], axis=1)
+
+    grouped = frame.groupby(keys, observed=True, sort=True)
+    count = grouped[measures].count()
+    total = grouped[measures].sum()
+    sumsq = grouped[list(squares.columns)].sum()
+    sumsq.columns = measures
+    low = grouped[measures].min()
+    high = grouped[measures].max()
+    return pd.concat(
+        {'count': count, 'sum': total, 'sumsq': sumsq, 'min': low, 'max': high}, axis=1
+    ).swaplevel(axis=1).sort_index(axis=1)
+
+
+def build_cube(df, backend=None):
+    """Materializes count/sum/sumsq/min/max of every measure for each grouping in CUBE_DIMENSIONS.
+
+    The group-bys run on the query backend (query.py; pandas unless configured otherwise).
+    """
+    from query import get_backend  # query builds on this module's cube layout
+
+    engine = get_backend(backend)
+    measures = [m for m in MEASURES if m in df.columns]
+    cube = {}
+    for name, dims in CUBE_DIMENSIONS.items():
+        if all(d in df.columns for d in dims):
+            cube[name] = engine.group_stats(df, dims, measures)
+    return cube
+
+
+# Cubes produced by merging an appended delta into the previous version's cube
+_REGISTERED_CUBES = {}
+_MAX_REGISTERED_CUBES = 4
+
+
+def register_cube(dataset_version, cube):
+    """Makes an incrementally merged cube the one get_cube returns for that dataset version."""
+    _REGISTERED_CUBES[dataset_version] = cube
+    while len(_REGISTERED_CUBES) > _MAX_REGISTERED_CUBES:
+        _REGISTERED_CUBES.pop(next(iter(_REGISTERED_CUBES)))
+
+
+@st.cache_data(show_spinner=False, max_entries=32)  # one per dataset version or filter slice
+def _cached_cube(dataset_version, _df):
+    return build_cube(_df)
+
+
+# Cubes being built off the script thread, so pages can render estimates meanwhile
+_BACKGROUND_CUBES = {}
+_MAX_BACKGROUND_CUBES = 32
+_background_lock = threading.Lock()
+_background_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='cube')
+
+
+def build_cube_in_background(df):
+    """Starts building the cube for df's dataset version on a worker thread (once) and returns its Future."""
+    version = df.attrs['dataset_version']
+    with _background_lock:
+        future = _BACKGROUND_CUBES.get(version)
+        if future is None:
+            future = _BACKGROUND_CUBES[version] = _background_pool.submit(build_cube, df)
+            while len(_BACKGROUND_CUBES) > _MAX_BACKGROUND_CUBES:
+                _BACKGROUND_CUBES.pop(next(iter(_BACKGROUND_CUBES)))
+    return future
+
+
+def cube_ready(df):
+    """True when get_cube(df) returns without scanning the rows (streamed, registered or built in the background)."""
+    if df.attrs.get('ingest_mode') == 'stream':
+        return True
+    version = df.attrs.get('dataset_version')
+    future = _BACKGROUND_CUBES.get(version)
+    return version in _REGISTERED_CUBES or (future is not None and future.done())
+
+
+def get_cube(df):
+    """Returns the aggregate cube for a dataset, built once per dataset version."""
+    if df.attrs.get('ingest_mode') == 'stream':
+        return load_stream_summary(df.attrs['source']).cube  # covers every row, not just the sample
+    version = df.attrs.get('dataset_version')
+    if version is None:
+        return build_cube(df)
+    if version in _REGISTERED_CUBES:
+        return _REGISTERED_CUBES[version]
+    if version in _BACKGROUND_CUBES:
+        return _BACKGROUND_CUBES[version].result()  # waits for a build already under way
+    return _cached_cube(version, df)
+
+
+def group_stats(cube, name, measure):
+    """Per-group count, sum, sumsq, min, max, mean and sample std of a measure."""
+    stats = cube[name][measure].copy()
+    n = stats['count']
+    stats['mean'] = stats['sum'] / n
+    variance = (stats['sumsq'] - stats['sum'] ** 2 / n) / (n - 1)
+    stats['std'] = np.sqrt(variance.clip(lower=0))
+    return stats
+
+
+def group_means(cube, name, measures):
+    """Per-group means of one or more measures, with the group keys as columns."""
+    frame = cube[name]
+    means = pd.DataFrame({m: frame[(m, 'sum')] / frame[(m, 'count')] for m in measures})
+    return means.reset_index()
+
+
+def total_stats(cube, measure):
+    """Whole-cohort statistics of a measure as a Series (count, mean, min, max, ...)."""
+    return group_stats(cube, 'total', measure).iloc[0]
+
+
+def column_quantile(df, column, q):
+    """Quantile of a column over the whole dataset (sketch-based when the data was streamed)."""
+    if df.attrs.get('ingest_mode') == 'stream':
+        return float(load_stream_summary(df.attrs['source']).quantile(column, q))
+    from query import get_backend
+
+    return get_backend().quantile(df, column, q)
+
+
+def merge_cubes(left, right):
+    """Combines two cubes built from disjoint rows (counts/sums add, min/max fold)."""
+    merged = {}
+    for name in left.keys() | right.keys():
+        if name not in left or name not in right:
+            merged[name] = left.get(name, right.get(name))
+            continue
+        both = pd.concat([left[name], right[name]])
+        levels = list(range(both.index.nlevels))
+        grouped = both.groupby(level=levels, observed=True, sort=True)
+        additive = [col for col in both.columns if col[1] in ('count', 'sum', 'sumsq')]
+        low = [col for col in both.columns if col[1] == 'min']
+        high = [col for col in both.columns if col[1] == 'max']
+        parts = pd.concat([grouped[additive].sum(), grouped[low].min(), grouped[high].max()], axis=1)
+        merged[name] = parts[both.columns]
+    return merged
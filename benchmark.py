@@ -0,0 +1,190 @@
+"""Scaling benchmark for ingestion, page aggregations and figure construction.
+
+For each cohort size a synthetic CSV is generated (see synthetic.py) and
+every stage is timed with its peak traced memory: CSV parse, schema
+preprocessing, columnar artifact build/read, aggregate cube, each page's
+remaining aggregations, the correlation statistics and matrix, and
+construction, payload compaction and JSON serialization of every page
+figure, plus rebuilding it from a figure-cache entry. Results are written as JSON so two runs can
+be compared.
+
+    python benchmark.py [--sizes 10k,1m,10m] [--output bench_results.json] [--no-memory]
+                        [--compare OLD.json [--fail-over 1.5]]
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import figure_cache
+import figures
+import ingest
+from aggregates import build_cube, column_quantile, group_means, group_stats, total_stats
+from correlation import HEATMAP_COLUMNS, correlation_stats, numeric_columns
+from payload import compact_figure
+from stats import distribution_summary
+from synthetic import parse_size, write_cohort_csv
+from utils import (
+    COL_GENDER, COL_HOMETOWN, COL_HSC, COL_INCOME, COL_LAST, COL_OVERALL,
+    INCOME_ORDER, apply_schema
+)
+
+DEFAULT_SIZES = '10k,1m,10m'
+DEFAULT_OUTPUT = 'bench_results.json'
+
+
+def _measure(fn, trace_memory=True):
+    """Times fn untraced, then (optionally) reruns it under tracemalloc for its peak allocation.
+
+    Tracing slows allocation-heavy pandas code several-fold, so it never
+    shares a run with the timing.
+    """
+    started = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - started
+    peak = None
+    if trace_memory:
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, seconds, peak
+
+
+def _page_aggregates(df, cube):
+    """The per-page work still done on each rerun, beyond reading the shared cube."""
+    return {
+        'objective1 aggregates': lambda: (
+            total_stats(cube, COL_OVERALL), total_stats(cube, 'Attendance_numeric'),
+            group_means(cube, 'attendance', [COL_OVERALL]),
+        ),
+        'objective2 aggregates': lambda: (
+            total_stats(cube, COL_OVERALL), column_quantile(df, COL_OVERALL, 0.5),
+            group_means(cube, 'dept_gender', [COL_OVERALL]),
+            distribution_summary(df, COL_HOMETOWN, COL_OVERALL),
+            distribution_summary(df, COL_INCOME, COL_OVERALL, order=INCOME_ORDER),
+        ),
+        'objective3 aggregates': lambda: (
+            group_stats(cube, 'semester', COL_OVERALL), group_stats(cube, 'preparation', COL_OVERALL),
+            group_stats(cube, 'gaming', COL_OVERALL),
+            group_means(cube, 'semester', [COL_OVERALL, 'Semester_sort']),
+            group_means(cube, 'department', [COL_LAST, COL_OVERALL]),
+            group_means(cube, 'prep_gaming', [COL_OVERALL]),
+        ),
+    }
+
+
+def _figure_builders(df, cube, corr):
+    hometown = distribution_summary(df, COL_HOMETOWN, COL_OVERALL)
+    income = distribution_summary(df, COL_INCOME, COL_OVERALL, order=INCOME_ORDER)
+    return {
+        'fig_scatter': lambda: figures.scatter_figure(df, COL_HSC, COL_LAST, color=COL_GENDER)[0],
+        'fig_bar': lambda: figures.attendance_bar_figure(cube),
+        'fig_corr': lambda: figures.correlation_heatmap_figure(corr.round(2)),
+        'fig_bar_dept_gender': lambda: figures.dept_gender_bar_figure(cube),
+        'fig_violin': lambda: figures.violin_figure(hometown, COL_HOMETOWN, COL_OVERALL),
+        'fig_box': lambda: figures.box_figure(income, COL_INCOME, COL_OVERALL),
+        'fig_line': lambda: figures.semester_line_figure(cube),
+        'fig_dumbbell': lambda: figures.dumbbell_figure(cube),
+        'fig_prep_gaming': lambda: figures.prep_gaming_bar_figure(cube),
+    }
+
+
+def benchmark_size(n_rows, workdir, trace_memory=True):
+    """Runs every stage for one cohort size and returns a list of result records."""
+    records = []
+
+    def record(stage, fn, **extra):
+        result, seconds, peak = _measure(fn, trace_memory)
+        records.append(dict(rows=n_rows, stage=stage, seconds=seconds, peak_bytes=peak, **extra))
+        memory = f"{peak / 2**20:9.1f} MB" if peak is not None else ""
+        print(f"{n_rows:>12,}  {stage:<28} {seconds:9.3f}s  {memory}", flush=True)
+        return result
+
+    csv_path = Path(workdir) / f"cohort-{n_rows}.csv"
+    started = time.perf_counter()
+    write_cohort_csv(csv_path, n_rows)
+    print(f"{n_rows:>12,}  (generated {csv_path.stat().st_size / 2**20:.0f} MB CSV in {time.perf_counter() - started:.1f}s)")
+
+    raw = record('parse csv', lambda: pd.read_csv(csv_path))
+    df = record('preprocess', lambda: apply_schema(raw.copy()).dropna(subset=[COL_HSC, COL_LAST, COL_OVERALL]))
+    del raw
+
+    ingest.CACHE_DIR = Path(workdir) / 'cache'
+    artifact, _ = record('columnar build', lambda: ingest.build_artifact(csv_path, force=True))
+    record('columnar read', lambda: ingest._read_artifact(artifact))
+
+    cube = record('aggregate cube', lambda: build_cube(df))
+    for stage, fn in _page_aggregates(df, cube).items():
+        record(stage, fn)
+    stats = record('correlation stats', lambda: correlation_stats(df, numeric_columns(df)))
+    record('correlation spearman stats', lambda: correlation_stats(df, numeric_columns(df), 'spearman'))
+    corr = record('correlation matrix', lambda: stats.corr().loc[HEATMAP_COLUMNS, HEATMAP_COLUMNS])
+
+    for name, build in _figure_builders(df, cube, corr).items():
+        fig = record(f'{name} build', build)
+        fig = record(f'{name} compact', lambda: compact_figure(fig))
+        payload = record(f'{name} serialize', fig.to_json)
+        records[-1]['payload_bytes'] = len(payload)
+        record(f'{name} cache hit', lambda: figure_cache._from_payload(payload))
+
+    csv_path.unlink()
+    return records
+
+
+def compare(current, baseline, fail_over=None):
+    """Prints per-stage time ratios against a baseline run; returns the stages slower than fail_over."""
+    old = {(r['rows'], r['stage']): r['seconds'] for r in baseline['results']}
+    regressions = []
+    for r in current['results']:
+        before = old.get((r['rows'], r['stage']))
+        if not before:
+            continue
+        ratio = r['seconds'] / before
+        flag = ' <-- regression' if fail_over and ratio > fail_over else ''
+        print(f"{r['rows']:>12,}  {r['stage']:<28} {before:9.3f}s -> {r['seconds']:9.3f}s  x{ratio:5.2f}{flag}")
+        if flag:
+            regressions.append((r['rows'], r['stage'], ratio))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help="comma-separated cohort sizes, e.g. 10k,1m")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="where to write the results JSON")
+    parser.add_argument('--no-memory', action='store_true', help="skip peak traced memory (faster)")
+    parser.add_argument('--compare', metavar='OLD.json', help="print time ratios against an earlier run")
+    parser.add_argument('--fail-over', type=float, metavar='RATIO', help="with --compare, exit non-zero for stages this many times slower")
+    args = parser.parse_args()
+    sizes = [parse_size(s) for s in args.sizes.split(',')]
+
+    run = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+        },
+        'results': [],
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            run['results'].extend(benchmark_size(size, workdir, trace_memory=not args.no_memory))
+
+    with open(args.output, 'w') as fh:
+        json.dump(run, fh, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as fh:
+            slower = compare(run, json.load(fh), fail_over=args.fail_over or None)
+        sys.exit(1 if slower else 0)
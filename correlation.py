@@ -0,0 +1,109 @@
+"""Correlation matrices from mergeable sufficient statistics.
+
+Pearson correlations come from online.CorrelationStats: pairwise counts,
+sums, sums of squares and cross-products over every numeric column. The
+statistics are gathered once per dataset version (or filter slice), merged
+with the appended rows' statistics when the source grows, and taken from
+the streamed summary in stream mode. A heatmap of any column subset then
+costs O(columns^2) on each rerun, however many rows there are.
+
+Spearman correlations are approximate. Each value is replaced by its
+mid-rank under a per-column quantile sketch, and the ranks are correlated
+with the same statistics. Ties share their rank exactly (the habit columns
+take a handful of values), and other ranks are within about 1/k of exact.
+"""
+import pandas as pd
+import streamlit as st
+
+from online import CorrelationStats, QuantileSketch
+from utils import COL_HSC, COL_LAST, COL_OVERALL, COL_SSC, load_stream_summary
+
+# Variables shown by default in the objective 1 heatmap
+HEATMAP_COLUMNS = [
+    COL_HSC, COL_SSC, 'Preparation_numeric', 'Attendance_numeric', 'Gaming_numeric',
+    'Semester_numeric', COL_LAST, COL_OVERALL,
+]
+METHODS = {'Pearson': 'pearson', 'Spearman (approx.)': 'spearman'}
+RANK_SKETCH_K = 1024
+CHUNK_ROWS = 1_000_000  # bounds the float64 working copy while accumulating
+
+
+def numeric_columns(df):
+    """Numeric columns with at least one value (Semester_sort is left out; Semester_numeric carries it)."""
+    return [
+        col for col in df.columns
+        if col != 'Semester_sort' and pd.api.types.is_numeric_dtype(df[col]) and df[col].notna().any()
+    ]
+
+
+def rank_frame(df, columns, sketches=None, k=RANK_SKETCH_K):
+    """Approximate mid-ranks of each column, from the given sketches or ones built over df."""
+    sketches = sketches or {}
+    ranks = {}
+    for col in columns:
+        values = df[col].to_numpy(dtype='float64')
+        sketch = sketches.get(col) or QuantileSketch(k).update(values)
+        ranks[col] = sketch.rank(values)
+    return pd.DataFrame(ranks, index=df.index)
+
+
+def correlation_stats(df, columns, method='pearson', sketches=None):
+    """Sufficient statistics of the Pearson (or approximate Spearman) matrix over the given columns."""
+    columns = list(columns)
+    frame = rank_frame(df, columns, sketches) if method == 'spearman' else df[columns]
+    stats = CorrelationStats(columns)
+    for start in range(0, len(frame), CHUNK_ROWS):
+        stats.update(frame.iloc[start:start + CHUNK_ROWS])
+    return stats
+
+
+# Statistics produced by merging an appended delta into the previous version's statistics
+_REGISTERED_STATS = {}
+_MAX_REGISTERED_STATS = 4
+
+
+def register_stats(dataset_version, method, stats):
+    """Makes merged statistics the ones get_correlation uses for that dataset version."""
+    _REGISTERED_STATS[(dataset_version, method)] = stats
+    while len(_REGISTERED_STATS) > _MAX_REGISTERED_STATS:
+        _REGISTERED_STATS.pop(next(iter(_REGISTERED_STATS)))
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_stats(dataset_version, method, _df):
+    sketches = None
+    if _df.attrs.get('ingest_mode') == 'stream':
+        sketches = load_stream_summary(_df.attrs['source']).sketches  # rank the sample against every streamed row
+    return correlation_stats(_df, numeric_columns(_df), method, sketches)
+
+
+def get_stats(df, method='pearson'):
+    """Correlation statistics over every numeric column, gathered once per dataset version."""
+    if method == 'pearson' and df.attrs.get('ingest_mode') == 'stream':
+        return load_stream_summary(df.attrs['source']).correlation  # covers every row, not just the sample
+    version = df.attrs.get('dataset_version')
+    if version is None:
+        return correlation_stats(df, numeric_columns(df), method)
+    if (version, method) in _REGISTERED_STATS:
+        return _REGISTERED_STATS[(version, method)]
+    return _cached_stats(version, method, df)
+
+
+def get_correlation(df, columns, method='pearson'):
+    """Correlation matrix of the given columns ('pearson' or approximate 'spearman')."""
+    stats = get_stats(df, method)
+    if not set(columns) <= set(stats.columns):
+        # A column the streamed summary does not track: fall back to the row sample
+        stats = _cached_stats(df.attrs['dataset_version'], method, df)
+    return stats.corr().loc[columns, columns]
+
+
+def appended_stats(df, delta):
+    """Pearson statistics of df + delta, merged without rescanning df (register them for the combined version).
+
+    Spearman ranks shift with every new row, so those are rebuilt on demand.
+    """
+    previous = get_stats(df, 'pearson')
+    merged = CorrelationStats(previous.columns).merge(previous)
+    merged.merge(correlation_stats(delta, previous.columns))
+    return merged
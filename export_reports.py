@@ -0,0 +1,233 @@
+"""Headless static export of the three objective pages, one report per group.
+
+Each report is a self-contained HTML file with the summary metrics and
+every figure of the chosen objectives (1-3 by default). The metrics and
+figures come from the same metrics.py and figures.py code the pages use.
+PNG images are written too when a local Plotly image renderer (kaleido) is
+installed. Reports are built by a pool of worker processes.
+
+Reports by Semester or Department read the partitioned layout (ingest.py).
+Each worker opens only its group's partitions and only the columns its
+objectives use, so a department's report reads about that department's
+share of the data. For other groupings, the dataset is loaded once and
+written to a memory-mappable Feather file. Every worker opens that file
+read-only and gets the row positions of its group.
+
+    python export_reports.py [OUTPUT_DIR] [--by Department] [--objectives 1,2,3]
+                             [--workers N] [--source SRC] [--png] [--limit N]
+
+Without --by, a single report covers the whole cohort.
+"""
+import argparse
+import html
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from importlib.util import find_spec
+from pathlib import Path
+
+import pyarrow.feather as feather
+
+DEFAULT_OUTPUT_DIR = 'reports'
+OBJECTIVES = (1, 2, 3)
+
+# Columns each objective's section reads (derived columns are rebuilt from their raw ones on load)
+OBJECTIVE_COLUMNS = {
+    1: ['HSC', 'SSC', 'Last', 'Overall', 'Gender', 'Attendance', 'Attendance_numeric', 'Preparation_numeric',
+        'Gaming_numeric', 'Semester_numeric'],
+    2: ['Overall', 'Department', 'Gender', 'Hometown', 'Income'],
+    3: ['Overall', 'Last', 'Semester', 'Semester_sort', 'Department', 'Preparation', 'Gaming'],
+}
+
+_FRAME = None  # the shared, preprocessed dataset inside each worker
+
+
+def _init_worker(frame_path):
+    global _FRAME
+    _FRAME = feather.read_feather(frame_path, memory_map=True)
+
+
+def _slug(text):
+    return re.sub(r'[^A-Za-z0-9]+', '-', str(text)).strip('-').lower() or 'report'
+
+
+def report_content(df, objectives=OBJECTIVES):
+    """Metrics and figures of the chosen objective pages for one slice, without Streamlit."""
+    import figures
+    from aggregates import build_cube
+    from correlation import HEATMAP_COLUMNS, correlation_stats, numeric_columns
+    from metrics import objective1_metrics, objective2_metrics, objective3_metrics
+    from stats import distribution_summary, group_mean_intervals
+    from utils import COL_GENDER, COL_HOMETOWN, COL_HSC, COL_INCOME, COL_LAST, COL_OVERALL, INCOME_ORDER
+
+    cube = build_cube(df)
+
+    def intervals(name, measure=COL_OVERALL):
+        return group_mean_intervals(df, cube, name, measure)
+
+    def objective1():
+        columns = [c for c in HEATMAP_COLUMNS if c in numeric_columns(df)]
+        correlation_matrix = correlation_stats(df, columns).corr().round(2)
+        return 'Objective 1: Prior Academic & Habits', (objective1_metrics(cube), {
+            'fig_scatter': figures.scatter_figure(
+                df, COL_HSC, COL_LAST, color=COL_GENDER,
+                title="Last Semester Score vs. Higher Secondary Score (HSC)"
+            )[0],
+            'fig_bar': figures.attendance_bar_figure(cube, intervals('attendance')),
+            'fig_corr': figures.correlation_heatmap_figure(correlation_matrix),
+        })
+
+    def objective2():
+        income_order = [inc for inc in INCOME_ORDER if inc in df[COL_INCOME].unique()]
+        fig_box = figures.box_figure(
+            distribution_summary(df, COL_INCOME, COL_OVERALL, order=income_order), COL_INCOME, COL_OVERALL,
+            title='Overall CGPA Distribution by Income Level'
+        )
+        fig_box.update_xaxes(tickangle=45)
+        return 'Objective 2: Demographic & Socioeconomic Factors', (objective2_metrics(df, cube), {
+            'fig_bar_dept_gender': figures.dept_gender_bar_figure(cube, intervals('dept_gender')),
+            'fig_violin': figures.violin_figure(
+                distribution_summary(df, COL_HOMETOWN, COL_OVERALL), COL_HOMETOWN, COL_OVERALL,
+                title='Overall CGPA Distribution by Hometown'
+            ),
+            'fig_box': fig_box,
+        })
+
+    def objective3():
+        return 'Objective 3: Temporal & Habit Interaction', (objective3_metrics(cube), {
+            'fig_line': figures.semester_line_figure(cube, intervals('semester')),
+            'fig_dumbbell': figures.dumbbell_figure(
+                cube, intervals={m: intervals('department', m) for m in (COL_LAST, COL_OVERALL)}
+            ),
+            'fig_prep_gaming': figures.prep_gaming_bar_figure(cube, intervals('prep_gaming')),
+        })
+
+    builders = {1: objective1, 2: objective2, 3: objective3}
+    return dict(builders[objective]() for objective in objectives)
+
+
+def report_columns(objectives=OBJECTIVES, by=None):
+    """Columns a report of these objectives reads (plus the grouping column)."""
+    columns = [col for objective in objectives for col in OBJECTIVE_COLUMNS[objective]] + ([by] if by else [])
+    return list(dict.fromkeys(columns))
+
+
+def _render_html(title, n_rows, sections):
+    parts = [
+        '<!DOCTYPE html><html><head><meta charset="utf-8">',
+        f'<title>{html.escape(title)}</title><script src="plotly.min.js"></script>',
+        '<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse}'
+        'td,th{border:1px solid #ccc;padding:4px 10px;text-align:left}</style></head><body>',
+        f'<h1>{html.escape(title)}</h1><p>{n_rows:,} students</p>',
+    ]
+    for heading, (metrics, figs) in sections.items():
+        rows = ''.join(
+            f'<tr><th>{html.escape(k)}</th><td>{html.escape(str(v))}</td></tr>' for k, v in metrics.items()
+        )
+        parts.append(f'<h2>{html.escape(heading)}</h2><table>{rows}</table>')
+        parts += [fig.to_html(full_html=False, include_plotlyjs=False) for fig in figs.values()]
+    parts.append('</body></html>')
+    return '\n'.join(parts)
+
+
+def export_report(title, output_dir, positions=None, where=None, source=None, columns=None, png=False,
+                  objectives=OBJECTIVES):
+    """Writes one report; returns (path, seconds).
+
+    The rows are either read from the partitioned layout of `source` (`where`
+    and `columns` select the slice) or taken at `positions` (all when None)
+    from the worker's shared frame.
+    """
+    started = time.perf_counter()
+    if where is not None:
+        from utils import prepare_data
+
+        df = prepare_data(source, where=where, columns=columns)
+    else:
+        df = _FRAME if positions is None else _FRAME.iloc[positions]
+    sections = report_content(df, objectives)
+
+    path = Path(output_dir) / f'{_slug(title)}.html'
+    path.write_text(_render_html(title, len(df), sections), encoding='utf-8')
+    if png:
+        image_dir = Path(output_dir) / _slug(title)
+        image_dir.mkdir(exist_ok=True)
+        for _, figs in sections.values():
+            for name, fig in figs.items():
+                fig.write_image(image_dir / f'{name}.png')
+    return str(path), time.perf_counter() - started
+
+
+def _write_plotly_js(output_dir):
+    from plotly.offline import get_plotlyjs
+
+    (Path(output_dir) / 'plotly.min.js').write_text(get_plotlyjs(), encoding='utf-8')
+
+
+def export_reports(output_dir=DEFAULT_OUTPUT_DIR, by=None, workers=None, source=None, png=False, limit=None,
+                   objectives=OBJECTIVES):
+    """Exports one report per `by` group (or one for the whole cohort); returns [(path, seconds)]."""
+    from ingest import PARTITION_COLUMNS, build_partitions, can_partition, partition_values
+    from utils import DATA_SOURCE, prepare_data
+
+    if png and find_spec('kaleido') is None:
+        print("kaleido is not installed; writing HTML only.")
+        png = False
+
+    source = source or DATA_SOURCE
+    columns = report_columns(objectives, by)
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    _write_plotly_js(output_dir)
+    options = dict(png=png, objectives=objectives)
+
+    if by in PARTITION_COLUMNS and can_partition(source):
+        build_partitions(source)  # once, before the workers read their partitions
+        tasks = [
+            (f'{by} - {label}', dict(where={by: [label]}, source=source, columns=columns))
+            for label in partition_values(source, by)
+        ]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(export_report, title, output_dir, **task, **options) for title, task in tasks[:limit]]
+            return [future.result() for future in as_completed(futures)]
+
+    df = prepare_data(source)
+    df = df[[col for col in df.columns if col in columns]]
+    if by:
+        groups = df.groupby(by, observed=True).indices  # row positions per group, computed once
+        tasks = [(f'{by} - {label}', positions) for label, positions in sorted(groups.items())]
+    else:
+        tasks = [('All students', None)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        frame_path = Path(tmp) / 'dataset.feather'
+        feather.write_feather(df, frame_path, compression='uncompressed')  # uncompressed stays mmap-able
+        del df
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(str(frame_path),)) as pool:
+            futures = [
+                pool.submit(export_report, title, output_dir, positions=positions, **options)
+                for title, positions in tasks[:limit]
+            ]
+            return [future.result() for future in as_completed(futures)]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('output', nargs='?', default=DEFAULT_OUTPUT_DIR, metavar='OUTPUT_DIR')
+    parser.add_argument('--by', metavar='COLUMN', help="one report per value of this column")
+    parser.add_argument('--objectives', default=','.join(map(str, OBJECTIVES)), help="comma-separated, e.g. 1,3")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--source', help="CSV path or URL (the configured dataset by default)")
+    parser.add_argument('--png', action='store_true', help="also write PNG images (needs kaleido)")
+    parser.add_argument('--limit', type=int, help="export only the first N groups")
+    args = parser.parse_args()
+    objectives = tuple(int(o) for o in args.objectives.split(','))
+
+    started = time.perf_counter()
+    results = export_reports(args.output, by=args.by, workers=args.workers, source=args.source,
+                             png=args.png, limit=args.limit or None, objectives=objectives)
+    for path, seconds in sorted(results):
+        print(f"{seconds:6.2f}s  {path}")
+    print(f"Exported {len(results)} reports to {args.output}/ in {time.perf_counter() - started:.1f}s "
+          f"with {args.workers} worker(s).")
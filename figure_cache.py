@@ -0,0 +1,114 @@
+"""Process-wide LRU cache of built Plotly figures.
+
+Figures are keyed by chart name, dataset version (content hash) and the view
+parameters that shaped them, and stored as serialized compact figure JSON
+(payload.compact_figure) so the cache's footprint is measurable and small,
+and entries can never be mutated by a page.
+Every session viewing the same dataset shares the entries; once the total
+payload exceeds the byte budget the least recently used figures are evicted.
+
+The budget defaults to 64 MB and can be set with STUDENT_FIGURE_CACHE_MB.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from payload import compact_figure
+
+DEFAULT_BUDGET_MB = 64
+
+_lock = threading.Lock()
+_entries = OrderedDict()  # key -> (payload, extra, size)
+_counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'bytes': 0}
+_budget = {'bytes': int(float(os.environ.get('STUDENT_FIGURE_CACHE_MB', DEFAULT_BUDGET_MB)) * 2**20)}
+_PAYLOAD_ATTR = '_compact_payload_bytes'  # set on the figures cached_figure returns
+
+
+def set_budget(max_bytes):
+    """Changes the byte budget, evicting entries right away if the cache is now over it."""
+    with _lock:
+        _budget['bytes'] = int(max_bytes)
+        _evict()
+
+
+def _evict():
+    while _entries and _counters['bytes'] > _budget['bytes']:
+        _, (_, _, size) = _entries.popitem(last=False)
+        _counters['bytes'] -= size
+        _counters['evictions'] += 1
+
+
+def _key(name, dataset_version, params):
+    return name, dataset_version, tuple(sorted((k, repr(v)) for k, v in (params or {}).items()))
+
+
+def _from_payload(payload):
+    import plotly.graph_objects as go
+
+    # The payload was serialized from a validated figure, so re-validating it is wasted work
+    return go.Figure(json.loads(payload), _validate=False)
+
+
+def cached_payload_bytes(fig):
+    """Bytes of fig's compact payload when it came from cached_figure (already compacted), else None."""
+    return getattr(fig, _PAYLOAD_ATTR, None)
+
+
+def cached_figure(name, dataset_version, build, params=None, record=None):
+    """Returns the figure for (name, dataset version, params), calling build() only on a miss.
+
+    build returns a figure or a (figure, *extra) tuple; the same shape is
+    returned on a hit. The figure is compact, and its payload size is kept
+    with the entry (see cached_payload_bytes). Without a dataset version
+    nothing is cached. When a section record is passed, its 'cache' field is
+    set to 'hit' or 'miss'.
+    """
+    if dataset_version is None:
+        return build()
+
+    key = _key(name, dataset_version, params)
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None:
+            _entries.move_to_end(key)
+            _counters['hits'] += 1
+        else:
+            _counters['misses'] += 1
+    if record is not None:
+        record['cache'] = 'hit' if entry is not None else 'miss'
+
+    if entry is not None:
+        payload, extra, size = entry
+        fig = _from_payload(payload)
+        setattr(fig, _PAYLOAD_ATTR, size)
+        return (fig, *extra) if extra is not None else fig
+
+    result = build()
+    fig, extra = (result[0], tuple(result[1:])) if isinstance(result, tuple) else (result, None)
+    fig = compact_figure(fig)
+    payload = fig.to_json()
+    size = len(payload)
+    setattr(fig, _PAYLOAD_ATTR, size)
+    with _lock:
+        if size <= _budget['bytes']:
+            previous = _entries.pop(key, None)
+            if previous is not None:
+                _counters['bytes'] -= previous[2]
+            _entries[key] = (payload, extra, size)
+            _counters['bytes'] += size
+            _evict()
+    return (fig, *extra) if extra is not None else fig
+
+
+def cache_stats():
+    """Hit/miss/eviction counters plus current entry count, bytes held and budget."""
+    with _lock:
+        return dict(_counters, entries=len(_entries), budget_bytes=_budget['bytes'])
+
+
+def clear():
+    """Drops every cached figure and resets the counters."""
+    with _lock:
+        _entries.clear()
+        _counters.update(hits=0, misses=0, evictions=0, bytes=0)
@@ -0,0 +1,374 @@
+"""Figure builders shared by the objective pages.
+
+Builders take the already-loaded DataFrame and return a Plotly figure (plus
+a short caption where the figure does not show every row), so the pages
+stay focused on layout and interpretation text. Plotly is imported inside
+the builders so importing this module stays cheap.
+"""
+import numpy as np
+
+from aggregates import group_means
+from utils import (
+    COL_ATTENDANCE, COL_DEPARTMENT, COL_GAMING, COL_GENDER, COL_LAST, COL_OVERALL,
+    COL_PREPARATION, COL_SEMESTER, GAMING_ORDER, PREP_ORDER
+)
+
+# --- Scatter Rendering Modes ---
+# Up to WEBGL_MAX_POINTS every row is drawn (SVG up to 1,000 points, WebGL beyond), up to
+# SAMPLE_MAX_ROWS a stratified sample of SAMPLE_POINTS is drawn, beyond that the
+# points are binned server-side into a DENSITY_BINS x DENSITY_BINS heatmap.
+# 'All points' is never drawn past WEBGL_MAX_POINTS, so the browser payload stays bounded.
+SCATTER_MODES = ['Auto', 'All points', 'Stratified sample', 'Density heatmap']
+WEBGL_MAX_POINTS = 50_000
+SAMPLE_MAX_ROWS = 2_000_000
+SAMPLE_POINTS = 20_000
+MIN_POINTS_PER_GROUP = 200
+DENSITY_BINS = 120
+
+
+def scatter_modes(n_rows):
+    """The rendering modes offered for a cohort of n_rows ('All points' only while it stays bounded)."""
+    return [mode for mode in SCATTER_MODES if mode != 'All points' or n_rows <= WEBGL_MAX_POINTS]
+
+
+def choose_scatter_mode(n_rows, requested='Auto'):
+    """Resolves 'Auto' to a concrete rendering mode from the row count ('All points' past the bound samples)."""
+    if requested == 'All points' and n_rows > WEBGL_MAX_POINTS:
+        requested = 'Auto'
+    if requested != 'Auto':
+        return requested
+    if n_rows <= WEBGL_MAX_POINTS:
+        return 'All points'
+    if n_rows <= SAMPLE_MAX_ROWS:
+        return 'Stratified sample'
+    return 'Density heatmap'
+
+
+def stratified_sample(df, group_col, n_points, min_per_group=MIN_POINTS_PER_GROUP, seed=0):
+    """Samples about n_points rows, keeping every group's share (and at least min_per_group rows each)."""
+    if len(df) <= n_points:
+        return df
+    if group_col is None or group_col not in df.columns:
+        return df.sample(n=n_points, random_state=seed)
+
+    positions = df.groupby(group_col, observed=True).indices
+    total = sum(len(rows) for rows in positions.values())
+    rng = np.random.default_rng(seed)
+    picked = []
+    for rows in positions.values():
+        k = max(round(len(rows) / total * n_points), min_per_group)
+        picked.append(rng.choice(rows, size=min(k, len(rows)), replace=False))
+    return df.iloc[np.sort(np.concatenate(picked))]
+
+
+def _density_figure(df, x, y, title, bins=DENSITY_BINS):
+    import plotly.graph_objects as go
+
+    data = df[[x, y]].dropna()
+    counts, x_edges, y_edges = np.histogram2d(data[x].to_numpy(), data[y].to_numpy(), bins=bins)
+    counts = np.where(counts > 0, counts, np.nan)  # leave empty bins transparent
+    fig = go.Figure(go.Heatmap(
+        z=counts.T, x=(x_edges[:-1] + x_edges[1:]) / 2, y=(y_edges[:-1] + y_edges[1:]) / 2,
+        colorscale='Viridis', colorbar=dict(title='Students'),
+        hovertemplate=f'{x}: %{{x:.2f}}<br>{y}: %{{y:.2f}}<br>Students: %{{z}}<extra></extra>'
+    ))
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title=y, template='plotly_white')
+    return fig
+
+
+def scatter_figure(df, x, y, color=None, title=None, mode='Auto'):
+    """Builds the x/y scatter in a rendering mode whose browser payload stays bounded.
+
+    Returns (figure, caption) where the caption states how many rows are drawn.
+    """
+    import plotly.express as px
+
+    n_rows = len(df)
+    mode = choose_scatter_mode(n_rows, mode)
+
+    if mode == 'Density heatmap':
+        caption = f"Density of all {n_rows:,} students, binned server-side into a {DENSITY_BINS}x{DENSITY_BINS} grid."
+        return _density_figure(df, x, y, title), caption
+
+    if mode == 'Stratified sample':
+        plotted = stratified_sample(df, color, SAMPLE_POINTS)
+        split = f" by {color}" if color else ""
+        caption = f"Showing a stratified sample{split} of {len(plotted):,} of {n_rows:,} students."
+    else:
+        plotted = df
+        caption = f"Showing all {n_rows:,} students."
+
+    fig = px.scatter(
+        plotted, x=x, y=y, color=color,
+        title=title, template='plotly_white',
+        render_mode='webgl' if len(plotted) > 1000 else 'svg'
+    )
+    return fig, caption
+
+
+# --- Distribution Plots From Summaries ---
+
+def _box_trace(summary, x, name, width=None, color=None):
+    import plotly.graph_objects as go
+
+    return go.Box(
+        x=x, q1=summary['q1'], median=summary['median'], q3=summary['q3'],
+        lowerfence=summary['lowerfence'], upperfence=summary['upperfence'], mean=summary['mean'],
+        name=name, width=width, boxpoints=False, marker_color=color, showlegend=False
+    )
+
+
+def _mean_interval_trace(summary, x, color):
+    """Mean markers with their 95% confidence intervals as error bars."""
+    import plotly.graph_objects as go
+
+    mean = summary['mean'].to_numpy(dtype='float64')
+    return go.Scatter(
+        x=x, y=mean, mode='markers', marker=dict(color=color, symbol='diamond', size=7),
+        error_y=dict(type='data', symmetric=False, array=summary['mean_high'].to_numpy() - mean,
+                     arrayminus=mean - summary['mean_low'].to_numpy(), thickness=1.5),
+        name='Mean (95% CI)', showlegend=False
+    )
+
+
+def violin_figure(distribution, group_col, value_col, title=None, color='#636efa'):
+    """Violin plot drawn from a stats.distribution_summary (mirrored KDE, inner box, capped outliers)."""
+    import plotly.graph_objects as go
+
+    summary = distribution['summary']
+    groups = list(summary.index)
+    positions = np.arange(len(groups), dtype=float)
+    fig = go.Figure()
+
+    for pos, group in zip(positions, groups):
+        grid, density = distribution['kde'][group]
+        if len(grid) == 0:
+            continue
+        half_width = density / density.max() * 0.4
+        fig.add_trace(go.Scatter(
+            x=np.concatenate([pos - half_width, (pos + half_width)[::-1]]),
+            y=np.concatenate([grid, grid[::-1]]),
+            fill='toself', mode='lines', line=dict(color=color, width=1),
+            name=str(group), showlegend=False, hoverinfo='skip'
+        ))
+
+    fig.add_trace(_box_trace(summary, positions, 'Summary', width=0.1, color='black'))
+    if 'mean_low' in summary:
+        fig.add_trace(_mean_interval_trace(summary, positions + 0.15, 'crimson'))
+
+    outliers = distribution['outliers']
+    if not outliers.empty:
+        index_of = {group: pos for pos, group in zip(positions, groups)}
+        fig.add_trace(go.Scatter(
+            x=outliers[group_col].map(index_of).astype(float), y=outliers[value_col],
+            mode='markers', marker=dict(color=color, size=4, opacity=0.6),
+            name='Outliers', showlegend=False
+        ))
+
+    fig.update_layout(
+        title=title, template='plotly_white', xaxis_title=group_col, yaxis_title=value_col,
+        xaxis=dict(tickmode='array', tickvals=positions, ticktext=[str(g) for g in groups])
+    )
+    return fig
+
+
+def box_figure(distribution, group_col, value_col, title=None):
+    """Box plot drawn from a stats.distribution_summary with a capped outlier sample."""
+    import plotly.graph_objects as go
+
+    summary = distribution['summary']
+    labels = [str(g) for g in summary.index]
+    fig = go.Figure(_box_trace(summary, labels, value_col, color='#636efa'))
+    if 'mean_low' in summary:
+        fig.add_trace(_mean_interval_trace(summary, labels, 'crimson'))
+
+    outliers = distribution['outliers']
+    if not outliers.empty:
+        fig.add_trace(go.Scatter(
+            x=outliers[group_col].astype(str), y=outliers[value_col],
+            mode='markers', marker=dict(color='#636efa', size=4),
+            name='Outliers', showlegend=False
+        ))
+
+    fig.update_layout(title=title, template='plotly_white', xaxis_title=group_col, yaxis_title=value_col)
+    fig.update_xaxes(categoryorder='array', categoryarray=labels)
+    return fig
+
+
+# --- Paired Comparisons (Dumbbell) ---
+# Orderings offered for dumbbell charts: label -> how groups are ranked (largest first)
+DUMBBELL_SORTS = {
+    'Mean Overall CGPA': 'right',
+    'Gap size': 'gap',
+}
+DUMBBELL_PAGE_SIZE = 30
+
+
+def paired_page(frame, left_col, right_col, sort_by='right', top_n=None, page=0):
+    """Ranks groups (largest first) by the right value or the absolute gap and returns one page.
+
+    Returns (rows, page_count); rows are in plotting order, so the top-ranked
+    group ends up at the top of a categorical y axis.
+    """
+    gap = (frame[right_col] - frame[left_col]).abs().to_numpy()
+    key = gap if sort_by == 'gap' else frame[right_col].to_numpy()
+    ranked = frame.iloc[np.argsort(-key, kind='stable')]
+    if not top_n or top_n >= len(ranked):
+        return ranked.iloc[::-1], 1
+    page_count = -(-len(ranked) // top_n)
+    page = min(max(page, 0), page_count - 1)
+    return ranked.iloc[page * top_n:(page + 1) * top_n].iloc[::-1], page_count
+
+
+def _interval_bars(rows, values, interval):
+    """Asymmetric Plotly error bars from a (low column, high column) pair of rows (None without one)."""
+    if interval is None:
+        return None
+    low, high = (rows[col].to_numpy(dtype='float64') for col in interval)
+    return dict(type='data', symmetric=False, array=high - values, arrayminus=values - low, thickness=1)
+
+
+def paired_dumbbell_figure(rows, label_col, left_col, right_col, left_name, right_name,
+                           title=None, xaxis_title='Score', yaxis_title=None, left_interval=None, right_interval=None):
+    """Dumbbell chart with every connector in one gap-separated trace, so the trace count stays at three.
+
+    left_interval/right_interval name the (low, high) columns of a confidence interval to draw around each marker.
+    """
+    import plotly.graph_objects as go
+
+    labels = rows[label_col].astype(str).to_numpy(dtype=object)
+    left = rows[left_col].to_numpy(dtype='float64')
+    right = rows[right_col].to_numpy(dtype='float64')
+
+    # left, right, gap for each group: the None/NaN third point breaks the line between groups
+    connector_x = np.full(len(rows) * 3, np.nan)
+    connector_x[0::3], connector_x[1::3] = left, right
+    connector_y = np.full(len(rows) * 3, None, dtype=object)
+    connector_y[0::3], connector_y[1::3] = labels, labels
+
+    fig = go.Figure([
+        go.Scatter(x=connector_x, y=connector_y, mode='lines', line=dict(color='gray', width=1),
+                   showlegend=False, hoverinfo='skip'),
+        go.Scatter(x=left, y=labels, mode='markers', marker=dict(color='blue', size=10), name=left_name,
+                   error_x=_interval_bars(rows, left, left_interval)),
+        go.Scatter(x=right, y=labels, mode='markers', marker=dict(color='red', size=10), name=right_name,
+                   error_x=_interval_bars(rows, right, right_interval)),
+    ])
+    fig.update_layout(
+        title=title, xaxis_title=xaxis_title, yaxis_title=yaxis_title or label_col,
+        height=max(600, 22 * len(rows) + 150), template='plotly_white'
+    )
+    fig.update_yaxes(type='category', categoryorder='array', categoryarray=labels)
+    return fig
+
+
+# --- Page Charts From The Aggregate Cube ---
+# Each chart takes optional 95% intervals of its means (stats.get_mean_intervals,
+# aligned with the cube grouping) and draws them as error bars.
+
+def _add_error_columns(frame, value_col, intervals):
+    """Adds the upper and lower error-bar lengths ('ci_plus', 'ci_minus') of value_col's intervals to frame."""
+    frame['ci_plus'] = intervals['high'].to_numpy() - frame[value_col].to_numpy()
+    frame['ci_minus'] = frame[value_col].to_numpy() - intervals['low'].to_numpy()
+    return dict(error_y='ci_plus', error_y_minus='ci_minus')
+
+
+def attendance_bar_figure(cube, intervals=None):
+    """Objective 1: mean Overall CGPA per attendance level."""
+    import plotly.express as px
+
+    mean_overall_by_attendance = group_means(cube, 'attendance', [COL_OVERALL])
+    mean_overall_by_attendance.columns = [COL_ATTENDANCE, 'Mean Overall CGPA']
+    errors = {} if intervals is None else _add_error_columns(mean_overall_by_attendance, 'Mean Overall CGPA', intervals)
+
+    fig_bar = px.bar(
+        mean_overall_by_attendance, x=COL_ATTENDANCE, y='Mean Overall CGPA',
+        color='Mean Overall CGPA', color_continuous_scale=px.colors.sequential.Viridis,
+        text='Mean Overall CGPA', title='Mean Overall CGPA by Class Attendance Level', **errors
+    )
+    fig_bar.update_traces(texttemplate='%{text:.2f}', textposition='outside')
+    return fig_bar
+
+
+def correlation_heatmap_figure(correlation_matrix, title='Correlation Matrix of Academic and Habit Variables'):
+    """Objective 1: annotated heatmap of a (rounded) correlation matrix."""
+    import plotly.graph_objects as go
+
+    fig_corr = go.Figure(data=go.Heatmap(
+        z=correlation_matrix.values, x=correlation_matrix.columns, y=correlation_matrix.index,
+        colorscale='RdBu', zmin=-1, zmax=1, text=correlation_matrix.values, texttemplate="%{text}",
+        textfont={"size": 10}
+    ))
+    fig_corr.update_layout(title=title, height=600)
+    return fig_corr
+
+
+def dept_gender_bar_figure(cube, intervals=None):
+    """Objective 2: grouped bars of mean Overall CGPA by department and gender."""
+    import plotly.express as px
+
+    dept_gender_overall = group_means(cube, 'dept_gender', [COL_OVERALL])
+    errors = {} if intervals is None else _add_error_columns(dept_gender_overall, COL_OVERALL, intervals)
+    fig_bar_dept_gender = px.bar(
+        dept_gender_overall, x=COL_DEPARTMENT, y=COL_OVERALL,
+        color=COL_GENDER, barmode='group',
+        title='Average Overall CGPA by Department and Gender',
+        template='plotly_white', **errors
+    )
+    fig_bar_dept_gender.update_xaxes(tickangle=45)
+    return fig_bar_dept_gender
+
+
+def semester_line_figure(cube, intervals=None):
+    """Objective 3: mean Overall CGPA per semester, in semester order."""
+    import plotly.express as px
+
+    semester_overall = group_means(cube, 'semester', [COL_OVERALL, 'Semester_sort']).rename(
+        columns={COL_OVERALL: 'Mean_Overall', 'Semester_sort': 'Sort_Order'}
+    )
+    errors = {} if intervals is None else _add_error_columns(semester_overall, 'Mean_Overall', intervals)
+    semester_overall = semester_overall.sort_values(by='Sort_Order')
+
+    fig_line = px.line(
+        semester_overall, x=COL_SEMESTER, y='Mean_Overall',
+        markers=True, title='Average Overall CGPA by Semester',
+        template='plotly_white', **errors
+    )
+    fig_line.update_traces(line=dict(color='orange', width=3))
+    return fig_line
+
+
+def dumbbell_figure(cube, sort_by='right', top_n=None, page=0, intervals=None):
+    """Objective 3: mean Last score vs mean Overall CGPA per department.
+
+    intervals, when given, maps COL_LAST and COL_OVERALL to their per-department intervals.
+    """
+    mean_scores_by_dept = group_means(cube, 'department', [COL_LAST, COL_OVERALL])
+    errors = {}
+    for measure in (intervals or {}):
+        mean_scores_by_dept[f'{measure} low'] = intervals[measure]['low'].to_numpy()
+        mean_scores_by_dept[f'{measure} high'] = intervals[measure]['high'].to_numpy()
+        errors[measure] = (f'{measure} low', f'{measure} high')
+    rows, _ = paired_page(mean_scores_by_dept, COL_LAST, COL_OVERALL, sort_by=sort_by, top_n=top_n, page=page)
+    return paired_dumbbell_figure(
+        rows, COL_DEPARTMENT, COL_LAST, COL_OVERALL, 'Mean Last Score', 'Mean Overall CGPA',
+        title='Comparison of Mean Last Score and Mean Overall CGPA by Department',
+        yaxis_title='Department', left_interval=errors.get(COL_LAST), right_interval=errors.get(COL_OVERALL)
+    )
+
+
+def prep_gaming_bar_figure(cube, intervals=None):
+    """Objective 3: grouped bars of mean Overall CGPA by preparation and gaming time."""
+    import plotly.express as px
+
+    prep_gaming_overall = group_means(cube, 'prep_gaming', [COL_OVERALL])
+    errors = {} if intervals is None else _add_error_columns(prep_gaming_overall, COL_OVERALL, intervals)
+    fig_prep_gaming = px.bar(
+        prep_gaming_overall, x=COL_PREPARATION, y=COL_OVERALL,
+        color=COL_GAMING, barmode='group',
+        category_orders={COL_PREPARATION: PREP_ORDER, COL_GAMING: GAMING_ORDER},
+        title='Mean Overall CGPA by Preparation and Gaming Time',
+        template='plotly_white', **errors
+    )
+    fig_prep_gaming.update_xaxes(tickangle=45)
+    return fig_prep_gaming
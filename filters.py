@@ -0,0 +1,139 @@
+"""Cohort filters shared by the objective pages.
+
+Every filterable column is categorical, so the index built once per dataset
+version holds, for each column, the category codes of every row and the
+sorted row positions of every category. A filter combination is resolved by
+starting from the rows of the most selective column and checking the
+remaining columns' codes at only those rows, so a change of filter costs
+O(matching rows) and never compares strings across the whole frame.
+
+The selections live in session state, so one choice applies to every page.
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils import COL_DEPARTMENT, COL_GENDER, COL_HOMETOWN, COL_INCOME, COL_SEMESTER, freeze, shared_view
+
+FILTER_COLUMNS = [COL_DEPARTMENT, COL_GENDER, COL_SEMESTER, COL_INCOME, COL_HOMETOWN]
+
+_STATE_KEY = '_cohort_filters'
+
+
+def build_filter_index(df, columns=FILTER_COLUMNS):
+    """Per-column category labels, row codes and per-category sorted row positions."""
+    index = {'rows': len(df), 'columns': {}}
+    for col in columns:
+        if col not in df.columns or not isinstance(df[col].dtype, pd.CategoricalDtype):
+            continue
+        codes = df[col].cat.codes.to_numpy()
+        order = np.argsort(codes, kind='stable')  # rows grouped by code, ascending within each
+        bounds = np.searchsorted(codes[order], np.arange(len(df[col].cat.categories) + 1))
+        positions = [order[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+        index['columns'][col] = {
+            'categories': list(df[col].cat.categories),
+            'codes': codes,
+            'positions': positions,
+        }
+    return index
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _cached_index(dataset_version, _df):
+    return build_filter_index(_df)
+
+
+def get_filter_index(df):
+    """The filter index for a dataset, built once per dataset version and shared by every session."""
+    version = df.attrs.get('dataset_version')
+    return build_filter_index(df) if version is None else _cached_index(version, df)
+
+
+def select_rows(index, selections):
+    """Sorted row positions matching every selection ({column: [labels]}), or None when nothing is filtered."""
+    active = {}
+    for col, labels in selections.items():
+        entry = index['columns'].get(col)
+        if entry is None or not labels:
+            continue
+        wanted = [entry['categories'].index(label) for label in labels if label in entry['categories']]
+        active[col] = wanted
+    if not active:
+        return None
+
+    # Start from the smallest candidate set, then probe the other columns' codes at those rows only
+    sizes = {col: sum(len(index['columns'][col]['positions'][code]) for code in codes) for col, codes in active.items()}
+    first = min(sizes, key=sizes.get)
+    entry = index['columns'][first]
+    rows = np.sort(np.concatenate([entry['positions'][code] for code in active[first]] or [np.empty(0, dtype=np.intp)]))
+
+    for col, codes in active.items():
+        if col == first or not len(rows):
+            continue
+        entry = index['columns'][col]
+        allowed = np.zeros(len(entry['categories']) + 1, dtype=bool)  # trailing slot for code -1 (missing)
+        allowed[codes] = True
+        rows = rows[allowed[entry['codes'][rows]]]
+    return rows
+
+
+def _filter_key(selections):
+    return '|'.join(f"{col}={','.join(map(str, labels))}" for col, labels in sorted(selections.items()) if labels)
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _filtered_frame(dataset_version, filter_key, _df, _rows):
+    filtered = _df.iloc[_rows]
+    attrs = {k: v for k, v in _df.attrs.items() if k != 'memory_report'}
+    attrs['dataset_version'] = hashlib.sha256(f"{dataset_version}|{filter_key}".encode()).hexdigest()
+    attrs['base_rows'] = len(_df)
+    attrs['filters'] = filter_key
+    if attrs.get('ingest_mode') == 'stream':
+        attrs['ingest_mode'] = 'sample'  # the streamed summaries cover all rows, so slices use the sample
+    filtered.attrs = attrs
+    return freeze(filtered)  # shared by every session with the same filters
+
+
+def apply_filters(df, selections):
+    """The rows of df matching the selections, as a frame with its own dataset version."""
+    rows = select_rows(get_filter_index(df), selections)
+    if rows is None:
+        return df
+    version = df.attrs.get('dataset_version')
+    if version is None:
+        return df.iloc[rows]
+    return shared_view(_filtered_frame(version, _filter_key(selections), df, rows))
+
+
+def filter_sidebar(df):
+    """Renders the cohort filters in the sidebar and returns the filtered frame.
+
+    Selections are kept in session state under their own key (widget state
+    is dropped on a page switch), so they carry over between pages.
+    """
+    index = get_filter_index(df)
+    stored = st.session_state.setdefault(_STATE_KEY, {})
+
+    def remember(col, key):
+        stored[col] = st.session_state[key]
+
+    st.sidebar.subheader("🔎 Cohort Filters")
+    for col, entry in index['columns'].items():
+        key = f'filter_{col}'
+        options = [str(c) for c in entry['categories']]
+        # Widget state does not survive a page switch, so re-seed it from the stored selection
+        st.session_state[key] = [v for v in stored.get(col, []) if v in options]
+        st.sidebar.multiselect(col, options, key=key, placeholder="All", on_change=remember, args=(col, key))
+
+    labels = {col: dict(zip(map(str, e['categories']), e['categories'])) for col, e in index['columns'].items()}
+    selections = {
+        col: [labels[col][v] for v in values if v in labels[col]] for col, values in stored.items() if col in labels
+    }
+    filtered = apply_filters(df, selections)
+    if filtered is not df:
+        st.sidebar.caption(f"{len(filtered):,} of {len(df):,} students match the filters.")
+        if filtered.attrs.get('ingest_mode') == 'sample':
+            st.sidebar.caption("Filtered views are computed from the streamed row sample.")
+    return filtered
@@ -1,5 +1,5 @@
 import streamlit as st
-from utils import DF  # Import DF to check data status
+from utils import available_datasets, dataset_cache_stats, dataset_selector, format_bytes, load_in_background, peek_data
 
 # --- Page Content ---
 st.title("🔬 Introduction to Scientific Visualization")
@@ -31,6 +31,39 @@ It combines **numerical data** (such as examination marks and CGPA) with **categ
 This diversity allows for an in-depth exploration of how different factors contribute to overall academic success.
 """)
 
+# Report data status without waiting for a load, so the homepage renders immediately. The homepage
+# may start the load in the background but never waits for it (tests/test_startup.py enforces this).
+dataset_selector()
+DF = peek_data()
+if DF is None:
+    load_in_background()  # start it now, so the objective pages find it loaded (or further along)
+    st.caption("The dataset is loading in the background; the objective pages fill in once it is ready.")
+elif not DF.empty and 'memory_report' in DF.attrs:
+    report = DF.attrs['memory_report']
+    st.caption(
+        f"Loaded {len(DF):,} student records using {format_bytes(report['compact_bytes'])} in memory "
+        f"({format_bytes(report['saved_bytes'])} saved by compact categorical/float32 columns)."
+    )
+
+datasets = available_datasets()
+cache = dataset_cache_stats()
+st.caption(
+    f"Dataset cache: {len(cache['entries'])} of {len(datasets)} datasets loaded, "
+    f"{format_bytes(cache['bytes'])} of a {format_bytes(cache['budget_bytes'])} budget "
+    f"({cache['hits']} hits, {cache['misses']} loads, {cache['evictions']} evictions)."
+)
+if cache['entries']:
+    with st.expander("Loaded datasets"):
+        labels = {source: label for label, source in datasets.items()}
+        st.dataframe(
+            [
+                {'Dataset': labels.get(e['source'], e['source']), 'Rows': e['rows'],
+                 'Memory': format_bytes(e['bytes']), 'Version': e['version']}
+                for e in cache['entries']
+            ],
+            hide_index=True, use_container_width=True
+        )
+
 # --- Section 3: Why Visualization Matters ---
 st.markdown("""
 ### 🎨 Why Visualization Matters
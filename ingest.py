@@ -0,0 +1,441 @@
+"""Local columnar ingestion for the student dataset.
+
+The CSV source is parsed once and written to an Arrow IPC (Feather) artifact
+named after the source's content hash. Later starts memory-map that artifact
+instead of fetching and re-parsing the CSV, and a changed source gets a new
+hash and therefore a fresh artifact. A remote source with a recorded
+artifact opens it straight away, with no network round trip, and is
+revalidated on a background thread with a conditional request (ETag /
+Last-Modified); a changed remote file is picked up on the next load.
+
+The artifact can also be laid out as a directory partitioned by Semester and
+Department (hive style: Semester=2nd/Department=.../part-0.arrow). A slice
+read (read_partitions) then opens only the partitions its filter selects,
+and only the columns it asks for, so reading one department costs I/O in
+proportion to that department's size. Rows missing any REQUIRED_COLUMNS
+value, which every load drops, are left out of the layout, so a slice needs
+none of those columns unless it asks for them.
+
+Build the artifact (and the partitioned layout) ahead of time with:
+
+    python ingest.py [SOURCE] [--force] [--partitioned]
+
+With --partitioned, --where COL=V1,V2 and --columns A,B report how much of
+the layout a slice read touches.
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow is optional; without it we parse the CSV every time
+    pa = None
+    pc = None
+    ds = None
+    feather = None
+
+# --- Constants ---
+BASE_DIR = Path(__file__).resolve().parent
+LOCAL_DATA_PATH = BASE_DIR / 'processed_data.csv'
+CACHE_DIR = Path(os.environ.get('STUDENT_DATA_CACHE_DIR', BASE_DIR / '.data_cache'))
+MANIFEST_NAME = 'manifest.json'
+PARTITION_COLUMNS = ['Semester', 'Department']
+REQUIRED_COLUMNS = ['HSC', 'Last', 'Overall']  # rows missing any of these are dropped on load
+_COLUMNS_FILE = '_columns.json'  # column order of the source; '_' files are not read as data
+
+# Bump whenever the artifact (or partitioned) layout changes so stale files are never reused
+ARTIFACT_VERSION = 1
+PARTITION_VERSION = 2
+
+_HASH_CHUNK = 1 << 20
+_TAIL_BYTES = 1 << 16  # bytes re-checked to confirm a grown file was only appended to
+
+
+# --- Source helpers ---
+
+def is_remote(source):
+    """True when the source is an HTTP(S) URL rather than a local path."""
+    return str(source).startswith(('http://', 'https://'))
+
+
+def _fetch(url, etag=None, last_modified=None):
+    """(body, validators) for a URL; body is None when the conditional request says it is unchanged."""
+    request = urllib.request.Request(url)
+    if etag:
+        request.add_header('If-None-Match', etag)
+    if last_modified:
+        request.add_header('If-Modified-Since', last_modified)
+    try:
+        with urllib.request.urlopen(request, timeout=30) as resp:
+            body, headers = resp.read(), resp.headers
+    except urllib.error.HTTPError as exc:
+        if exc.code != 304:
+            raise
+        body, headers = None, exc.headers
+    return body, {'etag': headers.get('ETag') or etag, 'last_modified': headers.get('Last-Modified') or last_modified}
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(_HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_manifest():
+    try:
+        with open(CACHE_DIR / MANIFEST_NAME) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def _temp_path(suffix=''):
+    """A fresh scratch file in the cache directory, so concurrent writers never share one."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, prefix='.tmp-', suffix=suffix)
+    os.close(fd)
+    return Path(tmp)
+
+
+_manifest_lock = threading.Lock()
+
+
+def _record_manifest(key, entry):
+    """Sets one manifest entry, re-reading the manifest so entries written meanwhile are kept."""
+    with _manifest_lock:
+        manifest = _load_manifest()
+        manifest[key] = entry
+        tmp = _temp_path('.json')
+        try:
+            with open(tmp, 'w') as fh:
+                json.dump(manifest, fh, indent=2, sort_keys=True)
+            os.replace(tmp, CACHE_DIR / MANIFEST_NAME)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
+
+def _artifact_path(source, content_hash):
+    stem = Path(str(source).split('?')[0]).stem or 'dataset'
+    return CACHE_DIR / f"{stem}-{content_hash[:16]}.v{ARTIFACT_VERSION}.feather"
+
+
+def source_fingerprint(source):
+    """Returns the sha256 of a local source, reusing the manifest when size and mtime are unchanged."""
+    path = Path(source)
+    stat = path.stat()
+    entry = _load_manifest().get(str(path.resolve()))
+    if entry and entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns:
+        return entry['sha256']
+    return _hash_file(path)
+
+
+# --- Artifact build and read ---
+
+def _write_artifact(df, path):
+    tmp = _temp_path('.feather')
+    try:
+        feather.write_feather(df, tmp, compression='uncompressed')  # uncompressed keeps it mmap-able
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _read_artifact(path):
+    return feather.read_table(path, memory_map=True).to_pandas()
+
+
+def build_artifact(source, force=False):
+    """Parses the source once and writes its columnar artifact. Returns (path, content_hash)."""
+    if feather is None:
+        raise RuntimeError("pyarrow is required to build the columnar dataset cache.")
+
+    if is_remote(source):
+        return _build_remote_artifact(source, force)
+
+    path = Path(source).resolve()
+    stat = path.stat()
+    content_hash = source_fingerprint(path)
+    artifact = _artifact_path(source, content_hash)
+    if force or not artifact.exists():
+        _write_artifact(pd.read_csv(path), artifact)
+
+    _record_manifest(str(path), {
+        'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+        'sha256': content_hash, 'artifact': artifact.name, 'version': ARTIFACT_VERSION,
+    })
+    return artifact, content_hash
+
+
+def _cached_artifact(source):
+    """(artifact, content hash, manifest entry) last recorded for a source; Nones when there is none."""
+    entry = _load_manifest().get(source)
+    if not entry or entry.get('version') != ARTIFACT_VERSION:
+        return None, None, None
+    artifact = CACHE_DIR / entry['artifact']
+    return (artifact, entry['sha256'], entry) if artifact.exists() else (None, None, None)
+
+
+def _build_remote_artifact(source, force=False):
+    """Downloads a remote source unless a conditional request shows the recorded artifact is current."""
+    artifact, content_hash, entry = (None, None, None) if force else _cached_artifact(source)
+    validators = {k: entry.get(k) for k in ('etag', 'last_modified')} if entry else {}
+    raw, validators = _fetch(source, **validators)
+    if raw is None:  # 304 Not Modified
+        _record_manifest(source, dict(entry, **validators))
+        return artifact, content_hash
+
+    content_hash = hashlib.sha256(raw).hexdigest()
+    artifact = _artifact_path(source, content_hash)
+    if force or not artifact.exists():
+        _write_artifact(pd.read_csv(io.BytesIO(raw)), artifact)
+    _record_manifest(source, dict(validators, sha256=content_hash, artifact=artifact.name, version=ARTIFACT_VERSION))
+    return artifact, content_hash
+
+
+_revalidating = set()
+_revalidate_lock = threading.Lock()
+
+
+def revalidate_in_background(source):
+    """Checks a remote source for changes on a daemon thread (once per process) and caches any new version."""
+    with _revalidate_lock:
+        if source in _revalidating:
+            return
+        _revalidating.add(source)
+
+    def revalidate():
+        try:
+            _build_remote_artifact(source)
+        except OSError:  # offline or unreachable: keep serving the recorded artifact
+            pass
+
+    threading.Thread(target=revalidate, name='revalidate-source', daemon=True).start()
+
+
+def read_source(source):
+    """Returns (raw DataFrame, content hash) for a source, going through the columnar cache when possible."""
+    if feather is None:
+        df = pd.read_csv(source)
+        return df, hashlib.sha256(pd.util.hash_pandas_object(df).values.tobytes()).hexdigest()
+
+    if is_remote(source):
+        artifact, content_hash, _ = _cached_artifact(source)
+        if artifact is not None:  # start from the recorded artifact; any newer version is fetched meanwhile
+            revalidate_in_background(source)
+            return _read_artifact(artifact), content_hash
+    artifact, content_hash = build_artifact(source)
+    return _read_artifact(artifact), content_hash
+
+
+# --- Partitioned Layout ---
+
+def can_partition(source):
+    """True when slices of the source can be read from a partitioned layout (local source, pyarrow datasets)."""
+    return ds is not None and not is_remote(source)
+
+
+def _partition_dir(artifact):
+    return artifact.with_name(f"{artifact.stem}.parts{PARTITION_VERSION}")
+
+
+def _partitioning():
+    return ds.partitioning(pa.schema([(col, pa.string()) for col in PARTITION_COLUMNS]), flavor='hive')
+
+
+def build_partitions(source, force=False):
+    """Writes the source's artifact as a Semester/Department-partitioned directory. Returns (path, content_hash)."""
+    if ds is None:
+        raise RuntimeError("pyarrow is required to build the partitioned dataset layout.")
+
+    artifact, content_hash = build_artifact(source)
+    target = _partition_dir(artifact)
+    if force or not target.exists():
+        table = feather.read_table(artifact, memory_map=True)
+        table = table.filter(_complete_rows(table))
+        for col in PARTITION_COLUMNS:  # partition values are directory names, so store them as strings
+            table = table.set_column(table.schema.get_field_index(col), col, pc.cast(table[col], pa.string()))
+        tmp = Path(tempfile.mkdtemp(dir=CACHE_DIR, prefix='.tmp-', suffix='.parts'))
+        try:
+            ds.write_dataset(
+                table, tmp, format='ipc', partitioning=_partitioning(),
+                max_rows_per_group=1 << 20, existing_data_behavior='overwrite_or_ignore'
+            )
+            (tmp / _COLUMNS_FILE).write_text(json.dumps(table.column_names))
+            _swap_directory(tmp, target)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+    return target, content_hash
+
+
+def _complete_rows(table):
+    """Mask of the rows with a numeric value in every REQUIRED_COLUMNS column (unparseable text counts as missing)."""
+    mask = np.ones(table.num_rows, dtype=bool)
+    for col in REQUIRED_COLUMNS:
+        if col in table.column_names:
+            mask &= pd.to_numeric(table[col].to_pandas(), errors='coerce').notna().to_numpy()
+    return pa.array(mask)
+
+
+def _swap_directory(new, target):
+    """Moves the finished directory new to target, renaming any existing target aside first.
+
+    A partly deleted layout is never visible. Between the two renames target
+    is missing, and a reader arriving then builds the layout itself. When
+    another writer puts its layout in place meanwhile, that one is kept: it
+    was built from the same content hash.
+    """
+    aside = new.with_name(f"{new.name}.old")
+    try:
+        os.replace(target, aside)
+    except FileNotFoundError:
+        pass
+    try:
+        os.replace(new, target)
+    except OSError:
+        if not target.is_dir():
+            raise
+    finally:
+        shutil.rmtree(aside, ignore_errors=True)
+
+
+def _slice_dataset(source, where=None):
+    """(dataset, filter expression, content hash, column order) for a slice of the partitioned layout."""
+    path, content_hash = build_partitions(source)
+    dataset = ds.dataset(path, format='ipc', partitioning=_partitioning())
+    expression = None
+    for col, values in (where or {}).items():
+        term = ds.field(col).isin([str(v) for v in values])
+        expression = term if expression is None else expression & term
+    return dataset, expression, content_hash, json.loads((path / _COLUMNS_FILE).read_text())
+
+
+def read_partitions(source, where=None, columns=None):
+    """Returns (raw DataFrame, content hash of the whole source) for the rows matching `where`.
+
+    where maps columns to the values to keep ({'Department': ['Law']});
+    conditions on PARTITION_COLUMNS skip whole partitions unread, others are
+    applied to the rows read. Only `columns` (all when None) are loaded.
+    """
+    dataset, expression, content_hash, order = _slice_dataset(source, where)
+    names = [col for col in order if columns is None or col in columns]
+    table = dataset.to_table(columns=names, filter=expression)
+    return table.to_pandas(), content_hash
+
+
+def partition_values(source, column):
+    """Values of a partition column, read from the layout's directory names alone."""
+    dataset, _, _, _ = _slice_dataset(source)
+    values = set()
+    for fragment in dataset.get_fragments():
+        values.update(str(v) for k, v in ds.get_partition_keys(fragment.partition_expression).items() if k == column)
+    return sorted(values)
+
+
+def slice_io(source, where=None, columns=None):
+    """Files and bytes a read_partitions call touches, next to the layout's totals."""
+    dataset, expression, _, order = _slice_dataset(source, where)
+    names = [col for col in order if columns is None or col in columns]
+    total = [Path(f.path).stat().st_size for f in dataset.get_fragments()]
+    selected = [Path(f.path).stat().st_size for f in dataset.get_fragments(filter=expression)]
+    return {
+        'files': len(selected), 'total_files': len(total),
+        'bytes': sum(selected), 'total_bytes': sum(total),
+        'columns': len(names), 'total_columns': len(order),
+    }
+
+
+# --- Append Detection ---
+
+def _tail_hash(fh, end):
+    fh.seek(max(0, end - _TAIL_BYTES))
+    return hashlib.sha256(fh.read(end - fh.tell())).hexdigest()
+
+
+def file_state(path):
+    """Size, mtime and a hash of the last bytes of a local source, for spotting appends."""
+    stat = Path(path).stat()
+    with open(path, 'rb') as fh:
+        tail = _tail_hash(fh, stat.st_size)
+        fh.seek(max(0, stat.st_size - 1))
+        ends_with_newline = fh.read(1) == b'\n'
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'tail_sha256': tail,
+            'ends_with_newline': ends_with_newline}
+
+
+def read_appended(path, state):
+    """Complete rows appended to a local CSV since `state` was taken.
+
+    Returns (delta DataFrame, delta bytes, new state), with an empty delta when
+    no full line was added. A partly written last line is left out of both the
+    delta and the new state, so it is read once the writer finishes it.
+    Returns None when the file was rewritten rather than appended to, in which
+    case the caller should reload it fully.
+    """
+    stat = Path(path).stat()
+    if stat.st_size == state['size'] and stat.st_mtime_ns == state['mtime_ns']:
+        return pd.DataFrame(), b'', state
+    if stat.st_size <= state['size'] or not state['ends_with_newline']:
+        return None
+
+    with open(path, 'rb') as fh:
+        if _tail_hash(fh, state['size']) != state['tail_sha256']:
+            return None
+        fh.seek(state['size'])
+        appended = fh.read(stat.st_size - state['size'])
+        # A writer may be partway through the last line: stop at the last full one, the rest comes next poll
+        appended = appended[:appended.rfind(b'\n') + 1]
+        if not appended:
+            return pd.DataFrame(), b'', state
+        end = state['size'] + len(appended)
+        current = {'size': end, 'mtime_ns': stat.st_mtime_ns, 'tail_sha256': _tail_hash(fh, end),
+                   'ends_with_newline': True}
+
+    columns = pd.read_csv(path, nrows=0).columns
+    delta = pd.read_csv(io.BytesIO(appended), header=None, names=columns)
+    return delta, appended, current
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('source', nargs='?', default=str(LOCAL_DATA_PATH), metavar='SOURCE')
+    parser.add_argument('--force', action='store_true', help="rebuild even when an artifact exists")
+    parser.add_argument('--partitioned', action='store_true', help="also build the partitioned layout")
+    parser.add_argument('--where', default='', metavar='COL=V1,V2[;COL=V]', help="slice to report on")
+    parser.add_argument('--columns', metavar='A,B', help="columns of the slice to report on")
+    args = parser.parse_args()
+    target = args.source
+    out, digest = build_artifact(target, force=args.force)
+    print(f"{target} -> {out} (sha256 {digest[:16]})")
+
+    if args.partitioned:
+        parts, _ = build_partitions(target, force=args.force)
+        where = {}
+        for condition in filter(None, args.where.split(';')):
+            col, _, values = condition.partition('=')
+            where[col] = values.split(',')
+        columns = args.columns.split(',') if args.columns else None
+        io_stats = slice_io(target, where, columns)
+        print(f"{target} -> {parts}/ ({io_stats['total_files']} partitions)")
+        if where or columns:
+            print(f"Slice reads {io_stats['files']} of {io_stats['total_files']} partitions, "
+                  f"{io_stats['bytes'] / max(io_stats['total_bytes'], 1):.1%} of the bytes "
+                  f"(before column projection: {io_stats['columns']} of {io_stats['total_columns']} columns).")
@@ -0,0 +1,116 @@
+"""Lightweight per-section instrumentation for the dashboard pages.
+
+Pages wrap their sections in ``section(...)`` and send figures through
+``plotly_chart(...)``. Each rerun collects wall time, rows touched and, for
+charts, the bytes of compact figure JSON sent to the browser (payload.py).
+Records are emitted as one JSON log line each on the ``dashboard.perf``
+logger and, when enabled, shown in a debug panel in the sidebar.
+
+Enable with the ``STUDENT_DASHBOARD_PERF=1`` environment variable or by
+adding ``?perf=1`` to the page URL.
+"""
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+from figure_cache import cache_stats, cached_payload_bytes
+from payload import PAGE_PAYLOAD_BUDGETS, compact_figure, payload_size
+
+logger = logging.getLogger('dashboard.perf')
+
+_STATE_KEY = '_perf_records'
+
+
+def enabled():
+    """True when the debug panel is switched on."""
+    if os.environ.get('STUDENT_DASHBOARD_PERF') == '1':
+        return True
+    try:
+        return st.query_params.get('perf') == '1'
+    except Exception:  # no Streamlit session (e.g. bare scripts)
+        return False
+
+
+def _records():
+    try:
+        return st.session_state.setdefault(_STATE_KEY, {'page': None, 'records': []})
+    except Exception:
+        return {'page': None, 'records': []}
+
+
+def start_page(page):
+    """Starts a fresh set of records for this rerun of `page`."""
+    state = _records()
+    state['page'] = page
+    state['records'] = []
+
+
+def _emit(record):
+    level = logging.INFO if enabled() else logging.DEBUG
+    if logger.isEnabledFor(level):
+        logger.log(level, json.dumps(record, default=str))
+
+
+@contextmanager
+def section(name, rows=None):
+    """Times a block of page code. The yielded record's 'rows' can be set inside the block."""
+    state = _records()
+    record = {'page': state['page'], 'section': name, 'rows': rows}
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record['seconds'] = time.perf_counter() - started
+        state['records'].append(record)
+        _emit(record)
+
+
+def plotly_chart(fig, name, **kwargs):
+    """st.plotly_chart of the compacted figure, recording the call's time and the figure's payload bytes.
+
+    Figures from cached_figure are already compact and measured, so only other figures are compacted here.
+    """
+    state = _records()
+    record = {'page': state['page'], 'section': f'{name} render', 'rows': None}
+    started = time.perf_counter()
+    size = cached_payload_bytes(fig)
+    if size is None:
+        fig = compact_figure(fig)
+        size = payload_size(fig)
+    record['payload_bytes'] = size
+    result = st.plotly_chart(fig, **kwargs)
+    record['seconds'] = time.perf_counter() - started
+    state['records'].append(record)
+    _emit(record)
+    return result
+
+
+def render_panel():
+    """Shows this rerun's section records in a sidebar expander (only when enabled)."""
+    if not enabled():
+        return
+    import pandas as pd
+
+    records = _records()['records']
+    with st.sidebar.expander("⏱️ Performance (this rerun)", expanded=True):
+        if not records:
+            st.caption("No sections recorded yet.")
+            return
+        table = pd.DataFrame(records).drop(columns='page')
+        table['ms'] = (table.pop('seconds') * 1000).round(1)
+        st.dataframe(table, hide_index=True, use_container_width=True)
+        total_bytes = table['payload_bytes'].sum() if 'payload_bytes' in table else 0
+        budget = PAGE_PAYLOAD_BUDGETS.get(_records()['page'])
+        limit = f" (budget {budget / 1024:.0f} KB)" if budget is not None else ""
+        st.caption(
+            f"Total {table['ms'].sum():.0f} ms across {len(table)} sections, {total_bytes / 1024:.0f} KB of figures{limit}."
+        )
+        cache = cache_stats()
+        st.caption(
+            f"Figure cache: {cache['hits']} hits, {cache['misses']} misses, {cache['evictions']} evictions, "
+            f"{cache['entries']} figures in {cache['bytes'] / 2**20:.1f} of {cache['budget_bytes'] / 2**20:.0f} MB."
+        )
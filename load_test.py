@@ -0,0 +1,180 @@
+"""Concurrent-session load test for main.py's multipage app, headless and offline.
+
+Each simulated user is an AppTest session of main.py running on its own
+thread. All users share this one process and its caches, as sessions on one
+server replica do. Every user navigates home -> objective1 -> objective2 ->
+objective3, for --rounds rounds, and every page rerun is timed. The report
+gives, per page:
+
+- p50, p95 and p99 rerun latency;
+- how many reruns raised;
+- how many rendered before the data had loaded (loading notes only).
+
+It also reports the peak process RSS, sampled while the users run.
+
+    python load_test.py [--sessions 1,4,16] [--rounds N] [--think SECONDS] [--rows N]
+                        [--json PATH] [--check]
+
+Several session counts (comma-separated) run one after another, which shows
+where latency starts to degrade. The dataset is loaded once before the first
+level. --check exits non-zero when a page's p95 exceeds P95_BUDGET_SECONDS
+at any level, or when a rerun raised.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from session_memory import current_rss
+from synthetic import parse_size, synthetic_source
+
+BASE_DIR = Path(__file__).resolve().parent
+
+PAGES = ['home.py', 'objective1.py', 'objective2.py', 'objective3.py']
+DEFAULT_SESSIONS = '1,4,8'
+DEFAULT_ROUNDS = 3
+P95_BUDGET_SECONDS = 5.0
+RSS_SAMPLE_SECONDS = 0.05
+
+_LOADING_NOTE = "⏳ Loading data…"
+
+
+@contextmanager
+def peak_rss(interval=RSS_SAMPLE_SECONDS):
+    """Samples this process's RSS on a thread while the block runs; the yielded dict's 'peak' holds the maximum."""
+    record = {'peak': current_rss()}
+    stop = threading.Event()
+
+    def sample():
+        while not stop.wait(interval):
+            record['peak'] = max(record['peak'], current_rss())
+
+    sampler = threading.Thread(target=sample, name='rss-sampler', daemon=True)
+    sampler.start()
+    try:
+        yield record
+    finally:
+        stop.set()
+        sampler.join()
+        record['peak'] = max(record['peak'], current_rss())
+
+
+def _user(user, rounds, think, start, results):
+    """One simulated user: a session of main.py navigating every page, `rounds` times."""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(str(BASE_DIR / 'main.py'), default_timeout=300)
+    rng = random.Random(user)
+    start.wait()  # every user starts together
+    for _ in range(rounds):
+        for page in PAGES:
+            app.switch_page(page)
+            started = time.perf_counter()
+            try:
+                app.run()
+                error = str(app.exception[0].value) if app.exception else None
+            except Exception as exc:  # a rerun that timed out or broke the test driver
+                error = repr(exc)
+            seconds = time.perf_counter() - started
+            partial = any(caption.value == _LOADING_NOTE for caption in app.caption)
+            results.append({'user': user, 'page': page, 'seconds': seconds, 'error': error, 'partial': partial})
+            if think:
+                time.sleep(rng.uniform(0, 2 * think))  # mean think time between page views
+
+
+def _summarize(runs):
+    seconds = np.array([run['seconds'] for run in runs])
+    p50, p95, p99 = np.percentile(seconds, [50, 95, 99])
+    return {
+        'runs': len(runs), 'p50': p50, 'p95': p95, 'p99': p99, 'max': seconds.max(),
+        'errors': sum(run['error'] is not None for run in runs),
+        'partial': sum(run['partial'] for run in runs),
+    }
+
+
+def load_test(sessions, rounds=DEFAULT_ROUNDS, think=0.0):
+    """Runs `sessions` concurrent users; returns per-page latency percentiles, errors and peak RSS."""
+    results = []
+    start = threading.Barrier(sessions)
+    users = [
+        threading.Thread(target=_user, args=(user, rounds, think, start, results), name=f'user-{user}')
+        for user in range(sessions)
+    ]
+    began = time.perf_counter()
+    with peak_rss() as rss:
+        for thread in users:
+            thread.start()
+        for thread in users:
+            thread.join()
+    wall = time.perf_counter() - began
+    return {
+        'sessions': sessions,
+        'rounds': rounds,
+        'wall_seconds': wall,
+        'reruns_per_second': len(results) / wall,
+        'peak_rss_bytes': rss['peak'],
+        'pages': {page: _summarize([r for r in results if r['page'] == page]) for page in PAGES},
+        'errors': sorted({r['error'] for r in results if r['error']}),
+    }
+
+
+def check(reports):
+    """Budget violations and errors across load levels (empty when all is well)."""
+    problems = []
+    for report in reports:
+        for page, stats in report['pages'].items():
+            if stats['p95'] > P95_BUDGET_SECONDS:
+                problems.append(
+                    f"{report['sessions']} sessions: {page} p95 {stats['p95']:.2f}s (budget {P95_BUDGET_SECONDS:.1f}s)"
+                )
+        problems += [f"{report['sessions']} sessions: {error}" for error in report['errors']]
+    return problems
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', default=DEFAULT_SESSIONS, help="comma-separated concurrent session counts")
+    parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS, help="navigation rounds per user")
+    parser.add_argument('--think', type=float, default=0.0, metavar='SECONDS', help="pause between page views")
+    parser.add_argument('--rows', type=parse_size, help="use a synthetic cohort of this many rows")
+    parser.add_argument('--json', metavar='PATH', help="also write the reports as JSON")
+    parser.add_argument('--check', action='store_true', help="exit non-zero on a p95 over budget or an error")
+    args = parser.parse_args()
+    if args.rows:
+        os.environ['STUDENT_DATA_SOURCE'] = synthetic_source(args.rows)  # read by utils at import
+    from utils import format_bytes, get_data
+
+    levels = [int(n) for n in args.sessions.split(',')]
+    rounds, think = args.rounds, args.think
+
+    rows = len(get_data())  # load once up front: the test measures reruns, not the first load
+    print(f"{rows:,} students; {rounds} round(s) of {' -> '.join(PAGES)} per user, think time {think:.1f}s")
+    reports = []
+    for sessions in levels:
+        report = load_test(sessions, rounds, think)
+        reports.append(report)
+        print(f"\n{sessions} concurrent session(s): {report['wall_seconds']:.1f}s, "
+              f"{report['reruns_per_second']:.1f} reruns/s, peak RSS {format_bytes(report['peak_rss_bytes'])}")
+        print(f"  {'page':<16}{'runs':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'errors':>8}{'partial':>9}")
+        for page, stats in report['pages'].items():
+            print(f"  {page:<16}{stats['runs']:>6}{stats['p50'] * 1000:>10.1f}{stats['p95'] * 1000:>10.1f}"
+                  f"{stats['p99'] * 1000:>10.1f}{stats['max'] * 1000:>10.1f}{stats['errors']:>8}{stats['partial']:>9}")
+        for error in report['errors']:
+            print(f"  error: {error}")
+
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump(reports, fh, indent=2, default=float)
+
+    if args.check:
+        failures = check(reports)
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1 if failures else 0)
@@ -0,0 +1,328 @@
+"""Summary metrics shown at the top of each objective page.
+
+They are derived from the aggregate cube (plus one quantile), so the pages
+and the headless report export (export_reports.py) show the same numbers.
+
+For large cohorts whose cube is not built yet, the pages first show
+estimates from a stratified sample (Department x Semester, proportional
+allocation, weighted back to the cohort) with 95% confidence intervals,
+while the exact cube is built on a worker thread. The summary then swaps in
+the exact values on its own. Set STUDENT_APPROX_MIN_ROWS to change the
+cohort size from which estimates are shown first.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from aggregates import (
+    CUBE_DIMENSIONS, MEASURES, build_cube_in_background, column_quantile, cube_ready, get_cube,
+    group_stats, total_stats
+)
+from stats import get_mean_intervals, overlapping_runner_up
+from utils import COL_DEPARTMENT, COL_OVERALL, COL_SEMESTER
+
+
+def objective1_metrics(cube):
+    """Average CGPA, attendance and study time, and the top CGPA."""
+    overall_stats = total_stats(cube, COL_OVERALL)
+    return {
+        'avg_cgpa': overall_stats['mean'].round(2),
+        'avg_attendance': total_stats(cube, 'Attendance_numeric')['mean'].round(1),
+        'avg_study': total_stats(cube, 'Preparation_numeric')['mean'].round(1),
+        'top_score': overall_stats['max'].round(2),
+    }
+
+
+def objective2_metrics(df, cube, median=None):
+    """Mean, median, minimum and maximum Overall CGPA (the median is read from df unless given)."""
+    overall_stats = total_stats(cube, COL_OVERALL)
+    if median is None:
+        median = column_quantile(df, COL_OVERALL, 0.5)
+    return {
+        'avg_cgpa': overall_stats['mean'].round(2),
+        'median_cgpa': round(float(median), 2),
+        'min_cgpa': overall_stats['min'].round(2),
+        'max_cgpa': overall_stats['max'].round(2),
+    }
+
+
+def objective3_metrics(cube):
+    """Best/worst semester, their gap, and the best preparation and gaming categories."""
+    semester_avg = group_stats(cube, 'semester', COL_OVERALL)['mean']
+    metrics = {
+        'best_semester': semester_avg.idxmax(),
+        'best_avg': semester_avg.max().round(2),
+        'worst_semester': semester_avg.idxmin(),
+        'worst_avg': semester_avg.min().round(2),
+        'overall_mean': total_stats(cube, COL_OVERALL)['mean'].round(2),
+    }
+    metrics['sem_diff'] = (metrics['best_avg'] - metrics['worst_avg']).round(2)
+
+    # Best preparation & gaming group (N/A when the column is missing)
+    for key, name in [('prep', 'preparation'), ('gaming', 'gaming')]:
+        if name in cube:
+            means = group_stats(cube, name, COL_OVERALL)['mean']
+            metrics[f'best_{key}'], metrics[f'best_{key}_val'] = means.idxmax(), means.max().round(2)
+        else:
+            metrics[f'best_{key}'], metrics[f'best_{key}_val'] = "N/A", 0
+    return metrics
+
+
+# --- Uncertain Leaders ---
+# Objective 3 metrics that name a top group: metric key -> (cube grouping, label)
+_LEADERS = {
+    'best_semester': ('semester', 'Best semester'),
+    'best_prep': ('preparation', 'Top preparation category'),
+    'best_gaming': ('gaming', 'Top gaming category'),
+}
+
+
+def _interval_text(row):
+    if np.isnan(row['low']):
+        return f"n = {row['count']:.0f}, too few students for an interval"
+    return f"n = {row['count']:.0f}, 95% CI {row['low']:.2f}–{row['high']:.2f}"
+
+
+def leader_notes(df, cube, metrics):
+    """Warnings for objective 3's top groups whose CGPA interval overlaps the runner-up's (they may lead by chance)."""
+    notes = []
+    for key, (name, label) in _LEADERS.items():
+        if name not in cube or metrics.get(key) == "N/A":
+            continue
+        intervals = get_mean_intervals(df, cube, name, COL_OVERALL)
+        runner_up = overlapping_runner_up(intervals)
+        if runner_up is not None:
+            leader = intervals['mean'].idxmax()
+            notes.append(
+                f"⚠️ {label} **{leader}** ({_interval_text(intervals.loc[leader])}) is not clearly ahead of "
+                f"**{runner_up}** ({_interval_text(intervals.loc[runner_up])}): the gap may be noise."
+            )
+    return notes
+
+
+_PAGE_METRICS = {
+    'objective1': lambda df, cube: objective1_metrics(cube),
+    'objective2': objective2_metrics,
+    'objective3': lambda df, cube: objective3_metrics(cube),
+}
+
+
+# --- Approximate Metrics ---
+
+APPROX_MIN_ROWS = int(float(os.environ.get('STUDENT_APPROX_MIN_ROWS', 1_000_000)))
+APPROX_SAMPLE_ROWS = 50_000
+APPROX_STRATA = [COL_DEPARTMENT, COL_SEMESTER]
+CONFIDENCE_Z = 1.96  # 95% intervals
+REFINE_SECONDS = 1  # how often an estimated summary checks whether the exact cube is ready
+
+# Cube groupings and measures that get confidence intervals
+_INTERVALS = {
+    'total': [COL_OVERALL, 'Attendance_numeric', 'Preparation_numeric'],
+    'semester': [COL_OVERALL],
+    'preparation': [COL_OVERALL],
+    'gaming': [COL_OVERALL],
+}
+
+
+def stratified_sample(df, strata=APPROX_STRATA, n=APPROX_SAMPLE_ROWS, seed=0):
+    """Proportional stratified sample: (row positions, stratum of each row, rows per stratum, rows drawn per stratum).
+
+    Every stratum keeps at least two rows, so each has a variance estimate.
+    """
+    strata = [col for col in strata if col in df.columns]
+    stratum = np.zeros(len(df), dtype=np.int64)
+    for col in strata:
+        codes = df[col].cat.codes.to_numpy().astype(np.int64) + 1  # 0 for missing
+        stratum = stratum * (len(df[col].cat.categories) + 1) + codes
+    # Ids span only the product of the category counts, so count with bincount and sort with a radix sort
+    stratum = stratum.astype(np.min_scalar_type(int(stratum.max(initial=0))))
+    sizes = np.bincount(stratum)
+    stratum = (np.cumsum(sizes > 0) - 1).astype(stratum.dtype)[stratum]  # renumber the occupied strata
+    sizes = sizes[sizes > 0]
+    drawn = np.minimum(sizes, np.maximum(2, np.round(sizes * min(1.0, n / max(len(df), 1))).astype(np.int64)))
+
+    rng = np.random.default_rng(seed)
+    order = np.argsort(stratum, kind='stable')
+    bounds = np.concatenate([[0], np.cumsum(sizes)])
+    positions = np.concatenate([
+        rng.choice(order[start:end], take, replace=False)
+        for start, end, take in zip(bounds[:-1], bounds[1:], drawn)
+    ])
+    positions.sort()
+    return positions, stratum[positions], sizes, drawn
+
+
+def weighted_cube(sample, weights):
+    """A cube estimated from a weighted sample: counts, sums and sums of squares scaled up to the cohort.
+
+    Min and max are the sample's own, so they are bounds from inside the true range.
+    """
+    measures = [m for m in MEASURES if m in sample.columns]
+    values = sample[measures].astype('float64')
+    weighted = pd.concat({
+        'count': values.notna().mul(weights, axis=0),
+        'sum': values.fillna(0).mul(weights, axis=0),
+        'sumsq': (values ** 2).fillna(0).mul(weights, axis=0),
+    }, axis=1)
+    cube = {}
+    for name, dims in CUBE_DIMENSIONS.items():
+        if not all(d in sample.columns for d in dims):
+            continue
+        keys = [sample[d] for d in dims] if dims else np.zeros(len(sample), dtype=np.int8)
+        additive = weighted.groupby(keys, observed=True, sort=True).sum().swaplevel(axis=1)
+        grouped = values.groupby(keys, observed=True, sort=True)
+        bounds = pd.concat({'min': grouped.min(), 'max': grouped.max()}, axis=1).swaplevel(axis=1)
+        cube[name] = pd.concat([additive, bounds], axis=1).sort_index(axis=1)
+    return cube
+
+
+def mean_half_widths(sample, weights, stratum, sizes, drawn, measure, dims):
+    """95% confidence half-widths of the estimated mean of a measure, per group of dims (or overall).
+
+    Uses the linearized variance of a ratio estimator under stratified sampling.
+    """
+    y = sample[measure].to_numpy(dtype='float64')
+    present = ~np.isnan(y)
+    if dims:
+        group = sample.groupby(list(dims), observed=True, sort=True).ngroup().to_numpy()
+        index = sample.groupby(list(dims), observed=True, sort=True).size().index
+    else:
+        group, index = np.zeros(len(sample), dtype=np.int64), pd.Index([0])
+    in_group = (group[:, None] == np.arange(len(index))[None, :]) & present[:, None]
+
+    w = np.asarray(weights)[:, None] * in_group
+    totals = w.sum(axis=0)
+    means = (w * np.nan_to_num(y)[:, None]).sum(axis=0) / totals
+    residuals = in_group * (np.nan_to_num(y)[:, None] - means) / totals
+    within = pd.DataFrame(residuals).groupby(stratum).var(ddof=1).fillna(0).to_numpy()
+    factor = sizes ** 2 * (1 - drawn / sizes) / drawn
+    return pd.Series(CONFIDENCE_Z * np.sqrt(factor @ within), index=index)
+
+
+def weighted_quantile(values, weights, q):
+    """Quantile(s) q of weighted values (midpoint interpolation of the weighted ECDF)."""
+    values, weights = np.asarray(values, dtype='float64'), np.asarray(weights, dtype='float64')
+    keep = ~np.isnan(values)
+    values, weights = values[keep], weights[keep]
+    order = np.argsort(values)
+    values, weights = values[order], weights[order]
+    cumulative = (np.cumsum(weights) - weights / 2) / weights.sum()
+    return np.interp(q, cumulative, values)
+
+
+def sample_estimate(df, n=APPROX_SAMPLE_ROWS, seed=0):
+    """Cube, median and confidence half-widths estimated from a stratified sample of df."""
+    positions, stratum, sizes, drawn = stratified_sample(df, n=n, seed=seed)
+    sample = df.iloc[positions]
+    weights = pd.Series((sizes / drawn)[stratum], index=sample.index)
+
+    half_widths = {}
+    for name, measures in _INTERVALS.items():
+        dims = CUBE_DIMENSIONS[name]
+        if all(d in sample.columns for d in dims):
+            for measure in measures:
+                if measure in sample.columns:
+                    half_widths[(name, measure)] = mean_half_widths(sample, weights, stratum, sizes, drawn, measure, dims)
+
+    # Woodruff interval for the median: the weighted quantiles at 0.5 -/+ z * sqrt(p(1-p)/n_eff)
+    effective_n = weights.sum() ** 2 / (weights ** 2).sum()
+    spread = CONFIDENCE_Z * np.sqrt(0.25 / effective_n)
+    median = weighted_quantile(sample[COL_OVERALL], weights, [0.5, 0.5 - spread, 0.5 + spread])
+    return {
+        'cube': weighted_cube(sample, weights),
+        'half_widths': half_widths,
+        'median': median,
+        'rows': len(df),
+        'sample_rows': len(sample),
+    }
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _cached_estimate(dataset_version, _df):
+    return sample_estimate(_df)
+
+
+def start_refinement(df):
+    """True when df's summary starts from a sample estimate; the exact cube is then being built in the background.
+
+    That is the case for cohorts of APPROX_MIN_ROWS rows or more whose cube is not available yet.
+    """
+    if len(df) < APPROX_MIN_ROWS or df.attrs.get('dataset_version') is None or cube_ready(df):
+        return False
+    build_cube_in_background(df)
+    return True
+
+
+def _estimated_intervals(page, estimate, metrics):
+    half_widths = estimate['half_widths']
+
+    def total(measure):
+        return half_widths.get(('total', measure), pd.Series([np.nan])).iloc[0]
+
+    def group(name, label):
+        return half_widths.get((name, COL_OVERALL), pd.Series(dtype='float64')).get(label, np.nan)
+
+    if page == 'objective1':
+        return {
+            'avg_cgpa': total(COL_OVERALL),
+            'avg_attendance': total('Attendance_numeric'),
+            'avg_study': total('Preparation_numeric'),
+        }
+    if page == 'objective2':
+        median, low, high = estimate['median']
+        return {'avg_cgpa': total(COL_OVERALL), 'median_cgpa': (high - low) / 2}
+    best, worst = group('semester', metrics['best_semester']), group('semester', metrics['worst_semester'])
+    return {
+        'best_avg': best,
+        'worst_avg': worst,
+        'sem_diff': np.hypot(best, worst),  # Semester is a stratum, so the two estimates are independent
+        'overall_mean': total(COL_OVERALL),
+        'best_prep_val': group('preparation', metrics['best_prep']),
+        'best_gaming_val': group('gaming', metrics['best_gaming']),
+    }
+
+
+def summary_metrics(df, page):
+    """(metrics, intervals) for a page's summary block.
+
+    intervals is None when the metrics are exact; otherwise the metrics are
+    sample estimates and intervals maps metric names to 95% half-widths.
+    """
+    if len(df) < APPROX_MIN_ROWS or df.attrs.get('dataset_version') is None or cube_ready(df):
+        return _PAGE_METRICS[page](df, get_cube(df)), None
+
+    estimate = _cached_estimate(df.attrs['dataset_version'], df)
+    if page == 'objective2':
+        metrics = objective2_metrics(df, estimate['cube'], median=estimate['median'][0])
+    else:
+        metrics = _PAGE_METRICS[page](df, estimate['cube'])
+    return metrics, _estimated_intervals(page, estimate, metrics)
+
+
+def metric_value(metrics, intervals, key, decimals=2, suffix=''):
+    """A metric formatted for display, as '≈value ±half-width' while it is an estimate.
+
+    Half-widths are rounded up, so a shown interval is never narrower than the computed one.
+    """
+    value = metrics[key]
+    text = (f"{value:.{decimals}f}" if isinstance(value, (int, float, np.number)) else str(value)) + suffix
+    if intervals is None:
+        return text
+    half_width = intervals.get(key)
+    if half_width is None or not np.isfinite(half_width):
+        return f"≈{text}"
+    return f"≈{text} ±{np.ceil(half_width * 10 ** decimals) / 10 ** decimals:.{decimals}f}"
+
+
+def estimate_caption(df, intervals):
+    """Notes under an estimated summary: how it was estimated and that exact values follow."""
+    if intervals is None:
+        return
+    estimate = _cached_estimate(df.attrs['dataset_version'], df)
+    st.caption(
+        f"≈ Estimated from a stratified sample of {estimate['sample_rows']:,} of {estimate['rows']:,} students "
+        "(± is a 95% confidence interval; minimum and maximum are sample values). "
+        "Exact values replace these as soon as they are computed."
+    )
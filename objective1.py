@@ -1,92 +1,138 @@
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-from utils import DF, COL_HSC, COL_LAST, COL_GENDER, COL_ATTENDANCE, COL_OVERALL, COL_SSC
+from utils import await_data, dataset_selector, loading_note, COL_HSC, COL_LAST, COL_GENDER, COL_ATTENDANCE, COL_OVERALL
+from aggregates import get_cube
+from correlation import HEATMAP_COLUMNS, METHODS as CORRELATION_METHODS, get_correlation, numeric_columns
+from figures import attendance_bar_figure, correlation_heatmap_figure, scatter_figure, scatter_modes
+from figure_cache import cached_figure
+from filters import filter_sidebar
+from stats import get_mean_intervals
+from prediction import AT_RISK_CGPA, PREDICTORS, coefficient_table, get_at_risk, get_model
+from metrics import REFINE_SECONDS, estimate_caption, metric_value, start_refinement, summary_metrics
+from instrument import plotly_chart, render_panel, section, start_page
 
 # --- Page Setup ---
 st.title("🎯 Objective 1: Prior Academic & Habits")
 st.header("Visualizing the relationship between academic history, study habits, and performance.", divider="blue")
+start_page('objective1')
 
-if DF.empty:
+dataset_selector()
+with section('load data') as timing:
+    DF = await_data()  # None while the selected dataset is still loading in the background
+    timing['rows'] = None if DF is None else len(DF)
+LOADING = DF is None  # static content renders now; data sections show a loading note until the rerun
+
+if not LOADING and DF.empty:
     st.warning("Data is not available. Check the homepage for data status.")
     st.stop()
 
+if not LOADING:
+    COHORT = DF  # the unfiltered dataset, which the prediction model is fitted on
+    with section('filters') as timing:
+        DF = filter_sidebar(DF)
+        timing['rows'] = len(DF)
+
+    if DF.empty:
+        st.warning("No students match the selected filters.")
+        st.stop()
+
+VERSION = None if LOADING else DF.attrs.get('dataset_version')
+
 # =========================================================================
 # 📢 SUMMARY METRICS SECTION: STUDENT PERFORMANCE OVERVIEW (Enhanced)
 # =========================================================================
-st.subheader("📈 Summary Metrics Overview")
-
-required_cols = [COL_OVERALL, 'Attendance_numeric', 'Preparation_numeric']
-if all(col in DF.columns for col in required_cols):
-
-    # Compute metrics
-    avg_cgpa = DF[COL_OVERALL].mean().round(2)
-    avg_attendance = DF['Attendance_numeric'].mean().round(1)
-    avg_study = DF['Preparation_numeric'].mean().round(1)
-    top_score = DF[COL_OVERALL].max().round(2)
-
-    # Interpretations for display
-    def interpret_cgpa(cgpa):
-        if cgpa >= 3.50:
-            return "🌟 Excellent"
-        elif cgpa >= 3.00:
-            return "👍 Good"
-        else:
-            return "⚠️ Needs Improvement"
-
-    def interpret_attendance(att):
-        if att >= 85:
-            return "🟢 Very Consistent"
-        elif att >= 70:
-            return "🟡 Moderate"
-        else:
-            return "🔴 Low"
-
-    def interpret_study(hours):
-        if hours >= 3:
-            return "📘 Dedicated"
-        elif hours >= 1.5:
-            return "📗 Average"
-        else:
-            return "📕 Minimal Effort"
-
-    # Create layout
-    col1, col2, col3, col4 = st.columns(4)
-
-    # --- Metric 1: Average CGPA ---
-    col1.metric(
-        label="Average Overall CGPA 🎓",
-        value=f"{avg_cgpa:.2f}",
-        delta=interpret_cgpa(avg_cgpa),
-        help="Mean of all students' CGPA in the dataset."
-    )
+APPROXIMATE = not LOADING and start_refinement(DF)  # large cohort: estimates first, exact cube in the background
 
-    # --- Metric 2: Average Attendance ---
-    col2.metric(
-        label="Average Attendance (%) 🏫",
-        value=f"{avg_attendance}%",
-        delta=interpret_attendance(avg_attendance),
-        help="Shows the average attendance percentage among students."
-    )
 
-    # --- Metric 3: Average Study Time ---
-    col3.metric(
-        label="Average Study Time (hrs/day) ⏰",
-        value=f"{avg_study}",
-        delta=interpret_study(avg_study),
-        help="Indicates the average daily preparation or study time."
-    )
+@st.fragment(run_every=REFINE_SECONDS if APPROXIMATE else None)
+def summary_section():
+    st.subheader("📈 Summary Metrics Overview")
 
-    # --- Metric 4: Top CGPA ---
-    col4.metric(
-        label="Top Student CGPA 🏅",
-        value=f"{top_score:.2f}",
-        delta="🏆 Outstanding Achievement" if top_score >= 3.80 else "🎖️ High Performer",
-        help="Displays the highest CGPA recorded in this dataset."
-    )
+    required_cols = [COL_OVERALL, 'Attendance_numeric', 'Preparation_numeric']
+    if LOADING:
+        loading_note()
+    elif all(col in DF.columns for col in required_cols):
 
-else:
-    st.warning("Some required numeric columns are missing. Please verify 'utils.py' or data preparation steps.")
+        # Compute metrics
+        with section('summary metrics'):
+            metrics, intervals = summary_metrics(DF, 'objective1')
+        if APPROXIMATE and intervals is None:
+            st.rerun()  # the exact cube is ready: redraw the page without estimates
+        avg_cgpa, avg_attendance = metrics['avg_cgpa'], metrics['avg_attendance']
+        avg_study, top_score = metrics['avg_study'], metrics['top_score']
+
+        # Interpretations for display
+        def interpret_cgpa(cgpa):
+            if cgpa >= 3.50:
+                return "🌟 Excellent"
+            elif cgpa >= 3.00:
+                return "👍 Good"
+            else:
+                return "⚠️ Needs Improvement"
+
+        def interpret_attendance(att):
+            if att >= 85:
+                return "🟢 Very Consistent"
+            elif att >= 70:
+                return "🟡 Moderate"
+            else:
+                return "🔴 Low"
+
+        def interpret_study(hours):
+            if hours >= 3:
+                return "📘 Dedicated"
+            elif hours >= 1.5:
+                return "📗 Average"
+            else:
+                return "📕 Minimal Effort"
+
+        # Create layout
+        col1, col2, col3, col4 = st.columns(4)
+
+        # --- Metric 1: Average CGPA ---
+        col1.metric(
+            label="Average Overall CGPA 🎓",
+            value=metric_value(metrics, intervals, 'avg_cgpa'),
+            delta=interpret_cgpa(avg_cgpa),
+            help="Mean of all students' CGPA in the dataset."
+        )
+
+        # --- Metric 2: Average Attendance ---
+        col2.metric(
+            label="Average Attendance (%) 🏫",
+            value=metric_value(metrics, intervals, 'avg_attendance', 1, '%'),
+            delta=interpret_attendance(avg_attendance),
+            help="Shows the average attendance percentage among students."
+        )
+
+        # --- Metric 3: Average Study Time ---
+        col3.metric(
+            label="Average Study Time (hrs/day) ⏰",
+            value=metric_value(metrics, intervals, 'avg_study', 1),
+            delta=interpret_study(avg_study),
+            help="Indicates the average daily preparation or study time."
+        )
+
+        # --- Metric 4: Top CGPA ---
+        col4.metric(
+            label="Top Student CGPA 🏅",
+            value=metric_value(metrics, intervals, 'top_score'),
+            delta="🏆 Outstanding Achievement" if top_score >= 3.80 else "🎖️ High Performer",
+            help="Displays the highest CGPA recorded in this dataset."
+        )
+        estimate_caption(DF, intervals)
+
+    else:
+        st.warning("Some required numeric columns are missing. Please verify 'utils.py' or data preparation steps.")
+
+
+summary_section()
+
+# While the summary shows estimates the exact cube is still being built off the script thread:
+# the charts drawn from it wait for the rerun the summary triggers once it is ready
+CUBE_PENDING = LOADING or APPROXIMATE
+if not CUBE_PENDING:
+    with section('aggregate cube', rows=len(DF)):
+        CUBE = get_cube(DF)
 
 st.markdown("---")  # Separation line before summary
 
@@ -114,75 +160,137 @@ col1, col2 = st.columns(2)
 with col1:
     # --- 1A. Scatter Plot: Last Score vs. HSC Score ---
     st.subheader("1. Last Score vs. HSC Score (Scatter)")
-    if all(col in DF.columns for col in [COL_HSC, COL_LAST]):
-        fig_scatter = px.scatter(
-            DF, x=COL_HSC, y=COL_LAST, 
-            color=COL_GENDER if COL_GENDER in DF.columns else None,
-            title="Last Semester Score vs. Higher Secondary Score (HSC)",
-            template='plotly_white'
+    if LOADING:
+        loading_note()
+    elif all(col in DF.columns for col in [COL_HSC, COL_LAST]):
+        scatter_mode = st.selectbox(
+            "Rendering mode", scatter_modes(len(DF)), index=0,
+            help="Auto draws every point for small cohorts and switches to sampling or a density heatmap for large ones."
         )
-        st.plotly_chart(fig_scatter, use_container_width=True)
+        scatter_color = COL_GENDER if COL_GENDER in DF.columns else None
+        with section('fig_scatter build', rows=len(DF)) as timing:
+            fig_scatter, scatter_caption = cached_figure(
+                'fig_scatter', VERSION,
+                lambda: scatter_figure(
+                    DF, COL_HSC, COL_LAST,
+                    color=scatter_color,
+                    title="Last Semester Score vs. Higher Secondary Score (HSC)",
+                    mode=scatter_mode
+                ),
+                params={'mode': scatter_mode, 'color': scatter_color}, record=timing
+            )
+        plotly_chart(fig_scatter, 'fig_scatter', use_container_width=True)
+        st.caption(scatter_caption)
         
-        # SHORT INTERPRETATION 1.1
-        with st.expander("📝 Interpretation 1.1: Academic Continuity"):
-            st.markdown(
-                """
-                **Pattern:** A **positive trend** shows past achievement (HSC) generally predicts current achievement (Last Score).
+    # SHORT INTERPRETATION 1.1
+    with st.expander("📝 Interpretation 1.1: Academic Continuity"):
+        st.markdown(
+            """
+            **Pattern:** A **positive trend** shows past achievement (HSC) generally predicts current achievement (Last Score).
                 
-                **Meaning:** **Prior academic success is foundational**, but outliers show that university-specific factors can significantly change a student's trajectory.
-                """
-            )
+            **Meaning:** **Prior academic success is foundational**, but outliers show that university-specific factors can significantly change a student's trajectory.
+            """
+        )
 
 with col2:
     # --- 1B. Mean Overall CGPA by Attendance (Bar Chart) ---
     st.subheader("2. Mean Overall CGPA by Attendance (Bar Chart)")
-    if COL_ATTENDANCE in DF.columns and COL_OVERALL in DF.columns:
-        mean_overall_by_attendance = DF.groupby(COL_ATTENDANCE, observed=True)[COL_OVERALL].mean().reset_index()
-        mean_overall_by_attendance.columns = [COL_ATTENDANCE, 'Mean Overall CGPA']
-
-        fig_bar = px.bar(
-            mean_overall_by_attendance, x=COL_ATTENDANCE, y='Mean Overall CGPA',
-            color='Mean Overall CGPA', color_continuous_scale=px.colors.sequential.Viridis,
-            text='Mean Overall CGPA', title='Mean Overall CGPA by Class Attendance Level'
-        )
-        fig_bar.update_traces(texttemplate='%{text:.2f}', textposition='outside')
-        st.plotly_chart(fig_bar, use_container_width=True)
+    if CUBE_PENDING:
+        loading_note(computing=APPROXIMATE)
+    elif COL_ATTENDANCE in DF.columns and COL_OVERALL in DF.columns:
+        with section('fig_bar build', rows=len(CUBE['attendance'])) as timing:
+            fig_bar = cached_figure(
+                'fig_bar', VERSION,
+                lambda: attendance_bar_figure(CUBE, get_mean_intervals(DF, CUBE, 'attendance', COL_OVERALL)),
+                record=timing
+            )
+        plotly_chart(fig_bar, 'fig_bar', use_container_width=True)
         
-        # SHORT INTERPRETATION 1.2
-        with st.expander("📝 Interpretation 1.2: Behavioral Impact"):
-            st.markdown(
-                """
-                **Pattern:** CGPA shows a **clear, positive increase** as class attendance levels rise.
+    # SHORT INTERPRETATION 1.2
+    with st.expander("📝 Interpretation 1.2: Behavioral Impact"):
+        st.markdown(
+            """
+            **Pattern:** CGPA shows a **clear, positive increase** as class attendance levels rise.
                 
-                **Meaning:** **Attendance is a critical behavioral determinant.** Regular class presence maximizes material exposure and discipline, translating directly to higher cumulative performance.
-                """
-            )
+            **Meaning:** **Attendance is a critical behavioral determinant.** Regular class presence maximizes material exposure and discipline, translating directly to higher cumulative performance.
+            """
+        )
 
 st.markdown("---")
 
 # --- 1C. Correlation Matrix Heatmap ---
 st.subheader("3. Correlation Matrix of Key Numerical Variables (Heatmap)")
-numerical_cols_corr = [COL_HSC, COL_SSC, 'Preparation_numeric', 'Attendance_numeric', COL_LAST, COL_OVERALL]
-available_cols_corr = [col for col in numerical_cols_corr if col in DF.columns]
+if LOADING:
+    loading_note()
+else:
+    numeric_cols_corr = numeric_columns(DF)
+    method_col, columns_col = st.columns([1, 3])
+    corr_method = method_col.radio("Correlation", list(CORRELATION_METHODS), horizontal=True)
+    available_cols_corr = columns_col.multiselect(
+        "Variables", numeric_cols_corr, default=[col for col in HEATMAP_COLUMNS if col in numeric_cols_corr]
+    )
+
+    if len(available_cols_corr) >= 2:
+        with section('correlation', rows=len(available_cols_corr)):
+            correlation_matrix = get_correlation(DF, available_cols_corr, CORRELATION_METHODS[corr_method]).round(2)
+
+        with section('fig_corr build', rows=len(correlation_matrix)) as timing:
+            fig_corr = cached_figure(
+                'fig_corr', VERSION,
+                lambda: correlation_heatmap_figure(
+                    correlation_matrix, title=f'{corr_method} Correlation Matrix of Academic and Habit Variables'
+                ),
+                params={'columns': available_cols_corr, 'method': corr_method}, record=timing
+            )
+        plotly_chart(fig_corr, 'fig_corr', use_container_width=True)
+    else:
+        st.caption("Select at least two variables to draw the correlation matrix.")
 
-if len(available_cols_corr) >= 2:
-    correlation_matrix = DF[available_cols_corr].corr().round(2)
+# SHORT INTERPRETATION 1.3 (Full width)
+with st.expander("📝 Interpretation 1.3: Predictor Strength"):
+    st.markdown(
+        """
+        **Pattern:** **Last Score** has the **highest correlation** with **Overall CGPA**. Habits (Preparation, Attendance) show positive but moderate correlations.
+        
+        **Meaning:** **Past university performance is the best predictor.** Habits are important **contributing factors**, but the *quality* of study time and inherent academic ability are ultimately more influential than simply logging hours.
+        """
+    )
 
-    fig_corr = go.Figure(data=go.Heatmap(
-        z=correlation_matrix.values, x=correlation_matrix.columns, y=correlation_matrix.index,
-        colorscale='RdBu', zmin=-1, zmax=1, text=correlation_matrix.values, texttemplate="%{text}",
-        textfont={"size": 10}
-    ))
+st.markdown("---")
 
-    fig_corr.update_layout(title='Correlation Matrix of Academic and Habit Variables', height=600)
-    st.plotly_chart(fig_corr, use_container_width=True)
+# --- 1D. Overall CGPA Prediction & At-Risk Students ---
+st.subheader("4. Predicted Overall CGPA & At-Risk Students")
+if LOADING:
+    loading_note()
+elif all(col in DF.columns for col in PREDICTORS + [COL_OVERALL]):
+    with section('prediction model', rows=len(COHORT)):
+        model = get_model(COHORT)
+    threshold = st.slider("Flag students with a predicted Overall CGPA below", 1.0, 3.5, AT_RISK_CGPA, 0.05)
+    with section('at-risk scoring', rows=len(DF)):
+        n_at_risk, lowest = get_at_risk(DF, model, threshold)
 
-    # SHORT INTERPRETATION 1.3 (Full width)
-    with st.expander("📝 Interpretation 1.3: Predictor Strength"):
-        st.markdown(
-            """
-            **Pattern:** **Last Score** has the **highest correlation** with **Overall CGPA**. Habits (Preparation, Attendance) show positive but moderate correlations.
-            
-            **Meaning:** **Past university performance is the best predictor.** Habits are important **contributing factors**, but the *quality* of study time and inherent academic ability are ultimately more influential than simply logging hours.
-            """
-        )
+    st.markdown(
+        f"**{n_at_risk:,}** of {len(DF):,} students ({n_at_risk / len(DF):.1%}) "
+        f"have a predicted Overall CGPA below **{threshold:.2f}**."
+    )
+    model_col, list_col = st.columns([2, 3])
+    model_col.dataframe(coefficient_table(model), use_container_width=True)
+    model_col.caption(
+        f"Linear model (ridge) fitted on {model['rows']:,} students: R² = {model['r2']:.2f}, "
+        f"typical error ±{model['residual_std']:.2f} CGPA."
+    )
+    list_col.dataframe(lowest, use_container_width=True)
+    if n_at_risk > len(lowest):
+        list_col.caption(f"Showing the {len(lowest)} lowest predictions.")
+
+# SHORT INTERPRETATION 1.4 (Full width)
+with st.expander("📝 Interpretation 1.4: Early Warning"):
+    st.markdown(
+        """
+        **Pattern:** The model leans almost entirely on the **Last score**, in line with the correlation matrix; prior school results and habits add little once it is known.
+        
+        **Meaning:** A student's latest semester is an **early warning signal**. Students predicted below the threshold are candidates for **advising or academic support** before their cumulative CGPA falls further.
+        """
+    )
+
+render_panel()
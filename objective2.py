@@ -1,38 +1,78 @@
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-from utils import DF, COL_DEPARTMENT, COL_GENDER, COL_OVERALL, COL_HOMETOWN, COL_INCOME
+from utils import await_data, dataset_selector, loading_note, COL_DEPARTMENT, COL_GENDER, COL_OVERALL, COL_HOMETOWN, COL_INCOME, INCOME_ORDER
+from aggregates import get_cube
+from figures import box_figure, dept_gender_bar_figure, violin_figure
+from stats import get_distribution, get_mean_intervals
+from figure_cache import cached_figure
+from filters import filter_sidebar
+from metrics import REFINE_SECONDS, estimate_caption, metric_value, start_refinement, summary_metrics
+from instrument import plotly_chart, render_panel, section, start_page
 
 # --- Page Setup ---
 st.title("👤 Objective 2: Demographic & Socioeconomic Factors")
 st.header("Analyzing performance variations across different demographic and socioeconomic groups.", divider="red")
+start_page('objective2')
 
-if DF.empty:
+dataset_selector()
+with section('load data') as timing:
+    DF = await_data()  # None while the selected dataset is still loading in the background
+    timing['rows'] = None if DF is None else len(DF)
+LOADING = DF is None  # static content renders now; data sections show a loading note until the rerun
+
+if not LOADING and DF.empty:
     st.warning("Data is not available. Check the homepage for data status.")
     st.stop()
 
+if not LOADING:
+    with section('filters') as timing:
+        DF = filter_sidebar(DF)
+        timing['rows'] = len(DF)
+
+    if DF.empty:
+        st.warning("No students match the selected filters.")
+        st.stop()
+
+VERSION = None if LOADING else DF.attrs.get('dataset_version')
 
 # =========================================================================
 # 📢 SUMMARY METRICS SECTION: DEMOGRAPHIC PERFORMANCE OVERVIEW
 # =========================================================================
-st.subheader("📈 Overall Performance Snapshot")
+APPROXIMATE = not LOADING and start_refinement(DF)  # large cohort: estimates first, exact cube in the background
+
+
+@st.fragment(run_every=REFINE_SECONDS if APPROXIMATE else None)
+def summary_section():
+    st.subheader("📈 Overall Performance Snapshot")
+
+    if LOADING:
+        loading_note()
+    elif COL_OVERALL in DF.columns:
+        # Compute basic descriptive statistics for the main performance metric
+        with section('summary metrics', rows=len(DF)):  # the exact median still reads every row
+            metrics, intervals = summary_metrics(DF, 'objective2')
+        if APPROXIMATE and intervals is None:
+            st.rerun()  # the exact cube is ready: redraw the page without estimates
+
+        col1, col2, col3, col4 = st.columns(4)
+
+        col1.metric("Average Overall CGPA 🎓", metric_value(metrics, intervals, 'avg_cgpa'), help="Mean of all students' CGPA.")
+        col2.metric("Median Overall CGPA 📊", metric_value(metrics, intervals, 'median_cgpa'), help="The middle value of all CGPA scores.")
+        col3.metric("Minimum CGPA 📉", metric_value(metrics, intervals, 'min_cgpa'), help="Lowest CGPA recorded.")
+        col4.metric("Maximum CGPA 🏆", metric_value(metrics, intervals, 'max_cgpa'), help="Highest CGPA recorded.")
+        estimate_caption(DF, intervals)
 
-if COL_OVERALL in DF.columns:
-    # Compute basic descriptive statistics for the main performance metric
-    avg_cgpa = DF[COL_OVERALL].mean().round(2)
-    median_cgpa = DF[COL_OVERALL].median().round(2)
-    min_cgpa = DF[COL_OVERALL].min().round(2)
-    max_cgpa = DF[COL_OVERALL].max().round(2)
+    else:
+        st.warning("Overall CGPA column is missing for summary statistics.")
 
-    col1, col2, col3, col4 = st.columns(4)
 
-    col1.metric("Average Overall CGPA 🎓", f"{avg_cgpa:.2f}", help="Mean of all students' CGPA.")
-    col2.metric("Median Overall CGPA 📊", f"{median_cgpa:.2f}", help="The middle value of all CGPA scores.")
-    col3.metric("Minimum CGPA 📉", f"{min_cgpa:.2f}", help="Lowest CGPA recorded.")
-    col4.metric("Maximum CGPA 🏆", f"{max_cgpa:.2f}", help="Highest CGPA recorded.")
+summary_section()
 
-else:
-    st.warning("Overall CGPA column is missing for summary statistics.")
+# While the summary shows estimates the exact cube is still being built off the script thread:
+# the charts drawn from it wait for the rerun the summary triggers once it is ready
+CUBE_PENDING = LOADING or APPROXIMATE
+if not CUBE_PENDING:
+    with section('aggregate cube', rows=len(DF)):
+        CUBE = get_cube(DF)
 
 st.markdown("---")
 
@@ -57,27 +97,26 @@ st.markdown("---") # Separation line before charts
 
 # --- 2A. Average Overall CGPA by Department and Gender (Grouped Bar Chart) ---
 st.subheader("1. Average Overall CGPA by Department and Gender")
-if all(col in DF.columns for col in [COL_DEPARTMENT, COL_GENDER, COL_OVERALL]):
-    dept_gender_overall = DF.groupby([COL_DEPARTMENT, COL_GENDER])[COL_OVERALL].mean().reset_index()
-
-    fig_bar_dept_gender = px.bar(
-        dept_gender_overall, x=COL_DEPARTMENT, y=COL_OVERALL, 
-        color=COL_GENDER, barmode='group',
-        title='Average Overall CGPA by Department and Gender',
-        template='plotly_white',
-    )
-    fig_bar_dept_gender.update_xaxes(tickangle=45)
-    st.plotly_chart(fig_bar_dept_gender, use_container_width=True)
+if CUBE_PENDING:
+    loading_note(computing=APPROXIMATE)
+elif all(col in DF.columns for col in [COL_DEPARTMENT, COL_GENDER, COL_OVERALL]):
+    with section('fig_bar_dept_gender build', rows=len(CUBE['dept_gender'])) as timing:
+        fig_bar_dept_gender = cached_figure(
+            'fig_bar_dept_gender', VERSION,
+            lambda: dept_gender_bar_figure(CUBE, get_mean_intervals(DF, CUBE, 'dept_gender', COL_OVERALL)),
+            record=timing
+        )
+    plotly_chart(fig_bar_dept_gender, 'fig_bar_dept_gender', use_container_width=True)
 
-    # SHORT INTERPRETATION 2A
-    with st.expander("📝 Interpretation A: Departmental & Gender Influence"):
-        st.markdown(
-            """
-            **Pattern:** Significant variations in average CGPA are observed both **across departments** and **between genders** within the same department.
+# SHORT INTERPRETATION 2A
+with st.expander("📝 Interpretation A: Departmental & Gender Influence"):
+    st.markdown(
+        """
+        **Pattern:** Significant variations in average CGPA are observed both **across departments** and **between genders** within the same department.
             
-            **Meaning:** This suggests that academic performance is influenced by **departmental differences in curriculum difficulty, grading policies, or internal competition**. Gender gaps highlight areas where specific support or bias might exist.
-            """
-        )
+        **Meaning:** This suggests that academic performance is influenced by **departmental differences in curriculum difficulty, grading policies, or internal competition**. Gender gaps highlight areas where specific support or bias might exist.
+        """
+    )
 
 
 st.markdown("---")
@@ -87,50 +126,59 @@ col3, col4 = st.columns(2)
 with col3:
     # --- 2B. Overall CGPA Distribution by Hometown (Violin Plot) ---
     st.subheader("2. Overall CGPA Distribution by Hometown (Violin)")
-    if all(col in DF.columns for col in [COL_HOMETOWN, COL_OVERALL]):
-        fig_violin = px.violin(
-            DF, x=COL_HOMETOWN, y=COL_OVERALL,
-            box=True, points="all",
-            title='Overall CGPA Distribution by Hometown',
-            template='plotly_white'
-        )
-        st.plotly_chart(fig_violin, use_container_width=True)
+    if LOADING:
+        loading_note()
+    elif all(col in DF.columns for col in [COL_HOMETOWN, COL_OVERALL]):
+        with section('fig_violin build', rows=len(DF)) as timing:
+            fig_violin = cached_figure(
+                'fig_violin', VERSION,
+                lambda: violin_figure(
+                    get_distribution(DF, COL_HOMETOWN, COL_OVERALL), COL_HOMETOWN, COL_OVERALL,
+                    title='Overall CGPA Distribution by Hometown'
+                ),
+                record=timing
+            )
+        plotly_chart(fig_violin, 'fig_violin', use_container_width=True)
 
-        # SHORT INTERPRETATION 2B
-        with st.expander("📝 Interpretation B: Hometown Distribution"):
-            st.markdown(
-                """
-                **Pattern:** Differences in the **density and width** of the violin shapes across hometown categories. For instance, urban areas might show a narrower, higher distribution.
+    # SHORT INTERPRETATION 2B
+    with st.expander("📝 Interpretation B: Hometown Distribution"):
+        st.markdown(
+            """
+            **Pattern:** Differences in the **density and width** of the violin shapes across hometown categories. For instance, urban areas might show a narrower, higher distribution.
                 
-                **Meaning:** The consistency and median CGPA are potentially linked to the quality of pre-university education or the level of exposure and resources available in different residential backgrounds. **Hometown can influence academic readiness.**
-                """
-            )
+            **Meaning:** The consistency and median CGPA are potentially linked to the quality of pre-university education or the level of exposure and resources available in different residential backgrounds. **Hometown can influence academic readiness.**
+            """
+        )
 
 with col4:
     # --- 2C. Overall CGPA Distribution by Income Level (Box Plot) ---
     st.subheader("3. Overall CGPA Distribution by Income Level (Box)")
-    if all(col in DF.columns for col in [COL_INCOME, COL_OVERALL]):
-        income_order = [
-            'Low (Below 15,000)', 'Lower middle (15,000-30,000)', 
-            'Upper middle (30,000-50,000)', 'High (Above 50,000)'
-        ]
-        valid_income_order = [inc for inc in income_order if inc in DF[COL_INCOME].unique()]
-
-        fig_box = px.box(
-            DF, x=COL_INCOME, y=COL_OVERALL,
-            category_orders={COL_INCOME: valid_income_order},
-            title='Overall CGPA Distribution by Income Level',
-            template='plotly_white'
-        )
-        fig_box.update_xaxes(tickangle=45)
-        st.plotly_chart(fig_box, use_container_width=True)
-
-        # SHORT INTERPRETATION 2C
-        with st.expander("📝 Interpretation C: Income Level Impact"):
-            st.markdown(
-                """
-                **Pattern:** Compare the **median line** (50th percentile) and the **interquartile range** (box height) across income groups. Often, higher income groups show higher medians and smaller variability.
-                
-                **Meaning:** Higher income may correlate with **increased stability and access to academic resources** (e.g., technology, books, tutoring), reducing performance risk. This highlights socioeconomic factors as a significant influence on academic achievement.
-                """
+    if LOADING:
+        loading_note()
+    elif all(col in DF.columns for col in [COL_INCOME, COL_OVERALL]):
+        valid_income_order = [inc for inc in INCOME_ORDER if inc in DF[COL_INCOME].unique()]
+
+        def build_box():
+            income_distribution = get_distribution(DF, COL_INCOME, COL_OVERALL, order=valid_income_order)
+            fig = box_figure(
+                income_distribution, COL_INCOME, COL_OVERALL,
+                title='Overall CGPA Distribution by Income Level'
             )
+            fig.update_xaxes(tickangle=45)
+            return fig
+
+        with section('fig_box build', rows=len(DF)) as timing:
+            fig_box = cached_figure('fig_box', VERSION, build_box, params={'order': valid_income_order}, record=timing)
+        plotly_chart(fig_box, 'fig_box', use_container_width=True)
+
+    # SHORT INTERPRETATION 2C
+    with st.expander("📝 Interpretation C: Income Level Impact"):
+        st.markdown(
+            """
+            **Pattern:** Compare the **median line** (50th percentile) and the **interquartile range** (box height) across income groups. Often, higher income groups show higher medians and smaller variability.
+                
+            **Meaning:** Higher income may correlate with **increased stability and access to academic resources** (e.g., technology, books, tutoring), reducing performance risk. This highlights socioeconomic factors as a significant influence on academic achievement.
+            """
+        )
+
+render_panel()
@@ -1,86 +1,115 @@
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
 from utils import (
-    DF, COL_SEMESTER, COL_OVERALL, COL_DEPARTMENT, COL_LAST, 
-    COL_PREPARATION, COL_GAMING, PREP_ORDER, GAMING_ORDER
+    await_data, dataset_selector, loading_note, COL_SEMESTER, COL_OVERALL, COL_DEPARTMENT, COL_LAST,
+    COL_PREPARATION, COL_GAMING
 )
+from aggregates import get_cube
+from stats import get_mean_intervals
+from figures import (
+    DUMBBELL_PAGE_SIZE, DUMBBELL_SORTS, dumbbell_figure, prep_gaming_bar_figure, semester_line_figure
+)
+from figure_cache import cached_figure
+from filters import filter_sidebar
+from metrics import (
+    REFINE_SECONDS, estimate_caption, leader_notes, metric_value, start_refinement, summary_metrics
+)
+from instrument import plotly_chart, render_panel, section, start_page
 
 # --- Page Setup ---
 st.title("📈 Objective 3: Temporal & Habit Interaction")
 st.header("Exploring trends over semesters and the interaction between study habits.", divider="green")
+start_page('objective3')
+
+dataset_selector()
+with section('load data') as timing:
+    DF = await_data()  # None while the selected dataset is still loading in the background
+    timing['rows'] = None if DF is None else len(DF)
+LOADING = DF is None  # static content renders now; data sections show a loading note until the rerun
 
-if DF.empty:
+if not LOADING and DF.empty:
     st.warning("Data is not available. Check the homepage for data status.")
     st.stop()
 
+if not LOADING:
+    with section('filters') as timing:
+        DF = filter_sidebar(DF)
+        timing['rows'] = len(DF)
+
+    if DF.empty:
+        st.warning("No students match the selected filters.")
+        st.stop()
+
+VERSION = None if LOADING else DF.attrs.get('dataset_version')
+
 # =========================================================================
 # 📢 SUMMARY METRICS SECTION
 # =========================================================================
-st.subheader("📊 Summary of Key Trends and Habit Insights")
-
-if COL_SEMESTER in DF.columns and COL_OVERALL in DF.columns:
-    semester_avg = DF.groupby(COL_SEMESTER)[COL_OVERALL].mean()
-
-    # Calculate metrics
-    best_semester = semester_avg.idxmax()
-    best_avg = semester_avg.max().round(2)
-    worst_semester = semester_avg.idxmin()
-    worst_avg = semester_avg.min().round(2)
-    sem_diff = (best_avg - worst_avg).round(2)
-    overall_mean = DF[COL_OVERALL].mean().round(2)
-
-    # Determine best preparation & gaming group
-    if all(col in DF.columns for col in [COL_PREPARATION, COL_OVERALL]):
-        prep_avg = DF.groupby(COL_PREPARATION)[COL_OVERALL].mean()
-        best_prep = prep_avg.idxmax()
-        best_prep_val = prep_avg.max().round(2)
-    else:
-        best_prep, best_prep_val = "N/A", 0
+APPROXIMATE = not LOADING and start_refinement(DF)  # large cohort: estimates first, exact cube in the background
+
+
+@st.fragment(run_every=REFINE_SECONDS if APPROXIMATE else None)
+def summary_section():
+    st.subheader("📊 Summary of Key Trends and Habit Insights")
+
+    if LOADING:
+        loading_note()
+    elif COL_SEMESTER in DF.columns and COL_OVERALL in DF.columns:
+        with section('summary metrics'):
+            metrics, intervals = summary_metrics(DF, 'objective3')
+        if APPROXIMATE and intervals is None:
+            st.rerun()  # the exact cube is ready: redraw the page without estimates
+        best_semester, worst_semester = metrics['best_semester'], metrics['worst_semester']
+
+        # Layout for metrics
+        col1, col2, col3, col4 = st.columns(4)
+
+        # 1️⃣ Best Semester
+        col1.metric(
+            label="Best Performing Semester 🏆",
+            value=metric_value(metrics, intervals, 'best_semester'),
+            delta=metric_value(metrics, intervals, 'best_avg'),
+            help="Semester with the highest mean CGPA."
+        )
 
-    if all(col in DF.columns for col in [COL_GAMING, COL_OVERALL]):
-        gaming_avg = DF.groupby(COL_GAMING)[COL_OVERALL].mean()
-        best_gaming = gaming_avg.idxmax()
-        best_gaming_val = gaming_avg.max().round(2)
-    else:
-        best_gaming, best_gaming_val = "N/A", 0
+        # 2️⃣ CGPA Variation Across Semesters
+        col2.metric(
+            label="Semester CGPA Gap 📉",
+            value=metric_value(metrics, intervals, 'sem_diff'),
+            delta=f"{worst_semester} - {best_semester}",
+            help="Difference between best and worst semester performance."
+        )
 
-    # Layout for metrics
-    col1, col2, col3, col4 = st.columns(4)
+        # 3️⃣ Best Preparation Time
+        col3.metric(
+            label="Top Preparation Time Category 📚",
+            value=metric_value(metrics, intervals, 'best_prep'),
+            delta=metric_value(metrics, intervals, 'best_prep_val'),
+            help="Preparation habit associated with the highest mean CGPA."
+        )
 
-    # 1️⃣ Best Semester
-    col1.metric(
-        label="Best Performing Semester 🏆",
-        value=f"{best_semester}",
-        delta=f"{best_avg}",
-        help="Semester with the highest mean CGPA."
-    )
+        # 4️⃣ Top Gaming Time Group
+        col4.metric(
+            label="Top Gaming Category 🎮",
+            value=metric_value(metrics, intervals, 'best_gaming'),
+            delta=metric_value(metrics, intervals, 'best_gaming_val'),
+            help="Gaming frequency linked to the highest performance average."
+        )
 
-    # 2️⃣ CGPA Variation Across Semesters
-    col2.metric(
-        label="Semester CGPA Gap 📉",
-        value=f"{sem_diff:.2f}",
-        delta=f"{worst_semester} - {best_semester}",
-        help="Difference between best and worst semester performance."
-    )
+        st.caption(f"Overall Mean CGPA across all records: **{metric_value(metrics, intervals, 'overall_mean')}**")
+        estimate_caption(DF, intervals)
+        if intervals is None:  # exact metrics: flag leaders that are within noise of the runner-up
+            for note in leader_notes(DF, get_cube(DF), metrics):
+                st.caption(note)
 
-    # 3️⃣ Best Preparation Time
-    col3.metric(
-        label="Top Preparation Time Category 📚",
-        value=f"{best_prep}",
-        delta=f"{best_prep_val}",
-        help="Preparation habit associated with the highest mean CGPA."
-    )
 
-    # 4️⃣ Top Gaming Time Group
-    col4.metric(
-        label="Top Gaming Category 🎮",
-        value=f"{best_gaming}",
-        delta=f"{best_gaming_val}",
-        help="Gaming frequency linked to the highest performance average."
-    )
+summary_section()
 
-    st.caption(f"Overall Mean CGPA across all records: **{overall_mean:.2f}**")
+# While the summary shows estimates the exact cube is still being built off the script thread:
+# the charts drawn from it wait for the rerun the summary triggers once it is ready
+CUBE_PENDING = LOADING or APPROXIMATE
+if not CUBE_PENDING:
+    with section('aggregate cube', rows=len(DF)):
+        CUBE = get_cube(DF)
 
 st.markdown("---")  # Visual separation before Box Summary
 
@@ -102,98 +131,91 @@ st.markdown("---") # Visual separation before charts
 
 # --- 3A. Average Overall CGPA by Semester (Line Chart) ---
 st.subheader("1. Average Overall CGPA Trend by Semester (Line Chart)")
-if all(col in DF.columns for col in [COL_SEMESTER, COL_OVERALL, 'Semester_sort']):
-    
-    semester_overall = DF.groupby(COL_SEMESTER).agg(
-        Mean_Overall=(COL_OVERALL, 'mean'),
-        Sort_Order=('Semester_sort', 'mean')
-    ).sort_values(by='Sort_Order').reset_index()
-
-    fig_line = px.line(
-        semester_overall, x=COL_SEMESTER, y='Mean_Overall',
-        markers=True, title='Average Overall CGPA by Semester',
-        template='plotly_white',
-    )
-    fig_line.update_traces(line=dict(color='orange', width=3))
-    st.plotly_chart(fig_line, use_container_width=True)
+if CUBE_PENDING:
+    loading_note(computing=APPROXIMATE)
+elif all(col in DF.columns for col in [COL_SEMESTER, COL_OVERALL, 'Semester_sort']):
+    with section('fig_line build', rows=len(CUBE['semester'])) as timing:
+        fig_line = cached_figure(
+            'fig_line', VERSION,
+            lambda: semester_line_figure(CUBE, get_mean_intervals(DF, CUBE, 'semester', COL_OVERALL)), record=timing
+        )
+    plotly_chart(fig_line, 'fig_line', use_container_width=True)
     
-    # SHORT INTERPRETATION 3.1
-    with st.expander("📝 Interpretation 3.1: Temporal Trends"):
-        st.markdown(
-            """
-            **Pattern:** Performance tends to **stabilize or slightly increase** after the initial semester.
+# SHORT INTERPRETATION 3.1
+with st.expander("📝 Interpretation 3.1: Temporal Trends"):
+    st.markdown(
+        """
+        **Pattern:** Performance tends to **stabilize or slightly increase** after the initial semester.
             
-            **Meaning:** Students generally **adapt** to university life over time, but minor dips often correspond to the introduction of more **complex, specialized coursework**.
-            """
-        )
+        **Meaning:** Students generally **adapt** to university life over time, but minor dips often correspond to the introduction of more **complex, specialized coursework**.
+        """
+    )
 
 st.markdown("---")
 
 # --- 3B. Comparison of Mean Last Score and Mean Overall CGPA by Department (Dumbbell Plot) ---
 st.subheader("2. Comparison of Mean Last Score and Mean Overall CGPA (Dumbbell Plot)")
-if all(col in DF.columns for col in [COL_DEPARTMENT, COL_LAST, COL_OVERALL]):
-    mean_scores_by_dept = DF.groupby(COL_DEPARTMENT)[[COL_LAST, COL_OVERALL]].mean().reset_index()
-    mean_scores_by_dept = mean_scores_by_dept.sort_values(by=COL_OVERALL, ascending=True)
-
-    fig_dumbbell = go.Figure()
-
-    for index, row in mean_scores_by_dept.iterrows():
-        fig_dumbbell.add_trace(go.Scatter(
-            x=[row[COL_LAST], row[COL_OVERALL]], y=[row[COL_DEPARTMENT], row[COL_DEPARTMENT]],
-            mode='lines', line=dict(color='gray', width=1), showlegend=False, hoverinfo='none' 
-        ))
-
-    fig_dumbbell.add_trace(go.Scatter(
-        x=mean_scores_by_dept[COL_LAST], y=mean_scores_by_dept[COL_DEPARTMENT],
-        mode='markers', marker=dict(color='blue', size=10), name='Mean Last Score'
-    ))
-
-    fig_dumbbell.add_trace(go.Scatter(
-        x=mean_scores_by_dept[COL_OVERALL], y=mean_scores_by_dept[COL_DEPARTMENT],
-        mode='markers', marker=dict(color='red', size=10), name='Mean Overall CGPA'
-    ))
-
-    fig_dumbbell.update_layout(
-        title='Comparison of Mean Last Score and Mean Overall CGPA by Department',
-        xaxis_title='Score', yaxis_title='Department', height=600,
-        template='plotly_white'
-    )
-    st.plotly_chart(fig_dumbbell, use_container_width=True)
+if CUBE_PENDING:
+    loading_note(computing=APPROXIMATE)
+elif all(col in DF.columns for col in [COL_DEPARTMENT, COL_LAST, COL_OVERALL]):
+    n_departments = len(CUBE['department'])
+    sort_col, size_col, page_col = st.columns(3)
+    dumbbell_sort = sort_col.selectbox("Sort departments by", list(DUMBBELL_SORTS))
+    # Top-N and paging only matter once there are more groups than fit on one chart
+    if n_departments > DUMBBELL_PAGE_SIZE:
+        dumbbell_top_n = size_col.number_input(
+            "Departments per page (top N)", min_value=5, max_value=n_departments, value=DUMBBELL_PAGE_SIZE, step=5
+        )
+        dumbbell_page = page_col.number_input(
+            "Page", min_value=1, max_value=-(-n_departments // dumbbell_top_n), value=1
+        ) - 1
+    else:
+        dumbbell_top_n, dumbbell_page = None, 0
+
+    with section('fig_dumbbell build', rows=n_departments) as timing:
+        fig_dumbbell = cached_figure(
+            'fig_dumbbell', VERSION,
+            lambda: dumbbell_figure(
+                CUBE, sort_by=DUMBBELL_SORTS[dumbbell_sort], top_n=dumbbell_top_n, page=dumbbell_page,
+                intervals={m: get_mean_intervals(DF, CUBE, 'department', m) for m in (COL_LAST, COL_OVERALL)}
+            ),
+            params={'sort': dumbbell_sort, 'top_n': dumbbell_top_n, 'page': dumbbell_page}, record=timing
+        )
+    plotly_chart(fig_dumbbell, 'fig_dumbbell', use_container_width=True)
 
-    # SHORT INTERPRETATION 3.2
-    with st.expander("📝 Interpretation 3.2: Consistency Check"):
-        st.markdown(
-            """
-            **Pattern:** If markers are clustered, performance is **consistent**. Large gaps mean recent performance (blue) has shifted significantly from the historical average (red).
+# SHORT INTERPRETATION 3.2
+with st.expander("📝 Interpretation 3.2: Consistency Check"):
+    st.markdown(
+        """
+        **Pattern:** If markers are clustered, performance is **consistent**. Large gaps mean recent performance (blue) has shifted significantly from the historical average (red).
             
-            **Meaning:** This plot helps **identify departmental performance shifts**. Large gaps signal a significant change that requires immediate administrative review.
-            """
-        )
+        **Meaning:** This plot helps **identify departmental performance shifts**. Large gaps signal a significant change that requires immediate administrative review.
+        """
+    )
 
 st.markdown("---")
 
 # --- 3C. Mean Overall CGPA by Preparation and Gaming (Grouped Bar Chart) ---
 st.subheader("3. Mean Overall CGPA by Preparation and Gaming")
-if all(col in DF.columns for col in [COL_PREPARATION, COL_GAMING, COL_OVERALL]):
-    
-    prep_gaming_overall = DF.groupby([COL_PREPARATION, COL_GAMING], observed=True)[COL_OVERALL].mean().reset_index()
-
-    fig_prep_gaming = px.bar(
-        prep_gaming_overall, x=COL_PREPARATION, y=COL_OVERALL,
-        color=COL_GAMING, barmode='group',
-        category_orders={COL_PREPARATION: PREP_ORDER, COL_GAMING: GAMING_ORDER},
-        title='Mean Overall CGPA by Preparation and Gaming Time',
-        template='plotly_white'
-    )
-    fig_prep_gaming.update_xaxes(tickangle=45)
-    st.plotly_chart(fig_prep_gaming, use_container_width=True)
-
-    # SHORT INTERPRETATION 3.3
-    with st.expander("📝 Interpretation 3.3: Study-Leisure Trade-Off"):
-        st.markdown(
-            """
-            **Pattern:** High **Preparation** minimizes the negative effect of **Gaming**. Low preparation combined with high gaming yields the worst results.
-            
-            **Meaning:** **Study commitment is the most important factor.** Moderate gaming is fine for dedicated students (likely acting as a needed break), but for those who study minimally, gaming becomes a major performance detractor.
-            """
+if CUBE_PENDING:
+    loading_note(computing=APPROXIMATE)
+elif all(col in DF.columns for col in [COL_PREPARATION, COL_GAMING, COL_OVERALL]):
+    with section('fig_prep_gaming build', rows=len(CUBE['prep_gaming'])) as timing:
+        fig_prep_gaming = cached_figure(
+            'fig_prep_gaming', VERSION,
+            lambda: prep_gaming_bar_figure(CUBE, get_mean_intervals(DF, CUBE, 'prep_gaming', COL_OVERALL)),
+            record=timing
         )
+    plotly_chart(fig_prep_gaming, 'fig_prep_gaming', use_container_width=True)
+
+# SHORT INTERPRETATION 3.3
+with st.expander("📝 Interpretation 3.3: Study-Leisure Trade-Off"):
+    st.markdown(
+        """
+        **Pattern:** High **Preparation** minimizes the negative effect of **Gaming**. Low preparation combined with high gaming yields the worst results.
+            
+        **Meaning:** **Study commitment is the most important factor.** Moderate gaming is fine for dedicated students (likely acting as a needed break), but for those who study minimally, gaming becomes a major performance detractor.
+        """
+    )
+
+render_panel()
@@ -0,0 +1,246 @@
+"""Mergeable online accumulators for chunked ingestion.
+
+Each accumulator is updated one chunk at a time with vectorized NumPy and
+can be merged with another accumulator of the same kind, so summaries of
+sources larger than memory (or of independently processed pieces) combine
+exactly, except for the quantile sketch, which is approximate by design.
+"""
+import numpy as np
+import pandas as pd
+
+
+class RunningMoments:
+    """Count, mean, variance (Welford/Chan), min and max of a stream of values."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        chunk = RunningMoments()
+        chunk.count = len(values)
+        chunk.mean = float(values.mean())
+        chunk.m2 = float(((values - chunk.mean) ** 2).sum())
+        chunk.min = float(values.min())
+        chunk.max = float(values.max())
+        return self.merge(chunk)
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self):
+        return float(np.sqrt(self.variance))
+
+
+class CorrelationStats:
+    """Pairwise-complete sufficient statistics for a Pearson correlation matrix.
+
+    For every column pair it keeps the number of rows where both are present
+    and the sums, sums of squares and cross-products over those rows, which
+    reproduces pandas' ``DataFrame.corr()`` and merges by addition.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.n = np.zeros((k, k))
+        self.sx = np.zeros((k, k))
+        self.sxx = np.zeros((k, k))
+        self.sxy = np.zeros((k, k))
+
+    def update(self, frame):
+        values = frame[self.columns].to_numpy(dtype='float64')
+        present = (~np.isnan(values)).astype('float64')
+        filled = np.where(present > 0, values, 0.0)
+        self.n += present.T @ present
+        self.sx += filled.T @ present   # sx[i, j]: sum of column i over rows where j is present too
+        self.sxx += (filled ** 2).T @ present
+        self.sxy += filled.T @ filled
+        return self
+
+    def merge(self, other):
+        if other.columns != self.columns:
+            raise ValueError("Cannot merge correlation statistics over different columns.")
+        self.n += other.n
+        self.sx += other.sx
+        self.sxx += other.sxx
+        self.sxy += other.sxy
+        return self
+
+    def corr(self):
+        """Pearson correlation matrix as a labelled DataFrame."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = self.n * self.sxy - self.sx * self.sx.T
+            var_i = self.n * self.sxx - self.sx ** 2
+            matrix = cov / np.sqrt(var_i * var_i.T)
+        np.fill_diagonal(matrix, np.where(np.diag(self.n) > 1, 1.0, np.nan))
+        return pd.DataFrame(np.clip(matrix, -1, 1), index=self.columns, columns=self.columns)
+
+
+class RegressionStats:
+    """Complete-case sufficient statistics for a linear regression of a target on feature columns.
+
+    Over the rows where every feature and the target are present, it keeps
+    Z'Z for Z = [1, features, target]: the row count, sums and every
+    cross-product, which is all the normal equations need. Merges by addition.
+    """
+
+    def __init__(self, features, target):
+        self.features = list(features)
+        self.target = target
+        k = len(self.features) + 2
+        self.zz = np.zeros((k, k))
+
+    def update(self, frame):
+        values = frame[self.features + [self.target]].to_numpy(dtype='float64')
+        values = values[~np.isnan(values).any(axis=1)]
+        z = np.column_stack([np.ones(len(values)), values])
+        self.zz += z.T @ z
+        return self
+
+    def merge(self, other):
+        if other.features != self.features or other.target != self.target:
+            raise ValueError("Cannot merge regression statistics over different columns.")
+        self.zz += other.zz
+        return self
+
+    @property
+    def count(self):
+        return int(self.zz[0, 0])
+
+    def moments(self):
+        """Means and the (population) covariance matrix of [features, target]."""
+        n = self.zz[0, 0]
+        means = self.zz[0, 1:] / n
+        return means, self.zz[1:, 1:] / n - np.outer(means, means)
+
+
+class QuantileSketch:
+    """Mergeable approximate quantile sketch (a compacting buffer hierarchy, KLL-style).
+
+    Level h holds items that each stand for 2**h input values; whenever a
+    level exceeds ``k`` items it is sorted and every other item is promoted.
+    Memory stays O(k log(n / k)) and rank error is roughly O(1 / k).
+    """
+
+    def __init__(self, k=256, seed=0):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        for h, items in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self.k:
+                items = np.sort(items)
+                leftover = items[-1:] if len(items) % 2 else items[:0]
+                paired = items[:len(items) - len(leftover)]
+                promoted = paired[self._rng.integers(2)::2]
+                self.levels[h] = leftover
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def _weighted(self):
+        """Retained items in sorted order with their cumulative weights."""
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(l), 2.0 ** h) for h, l in enumerate(self.levels)])
+        order = np.argsort(items)
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """Approximate q-quantile(s); q may be a scalar or an array in [0, 1]."""
+        if self.count == 0:
+            return np.nan
+        items, cumulative = self._weighted()
+        ranks = np.asarray(q) * cumulative[-1]
+        idx = np.minimum(np.searchsorted(cumulative, ranks, side='left'), len(items) - 1)
+        return items[idx]
+
+    def rank(self, values):
+        """Approximate mid-rank of each value as a fraction in [0, 1]; ties share their average rank."""
+        values = np.asarray(values, dtype='float64')
+        if self.count == 0:
+            return np.full(values.shape, np.nan)
+        items, cumulative = self._weighted()
+        below = np.concatenate([[0.0], cumulative]) / cumulative[-1]
+
+        def mid_rank(x):
+            return (below[np.searchsorted(items, x, side='left')] + below[np.searchsorted(items, x, side='right')]) / 2
+
+        # Score and habit columns repeat a few hundred values across millions of rows: rank each once
+        if len(pd.unique(values[:10_000])) < 1_000:
+            codes, uniques = pd.factorize(values)
+            return np.append(mid_rank(uniques), np.nan)[codes]  # code -1 (NaN) picks the trailing NaN
+        return np.where(np.isnan(values), np.nan, mid_rank(values))
+
+
+class BottomKSample:
+    """Uniform row sample of fixed size, kept as the k rows with the smallest random keys.
+
+    Because the keys are independent of chunking, merging two samples gives
+    the same distribution as sampling the combined stream.
+    """
+
+    def __init__(self, k, seed=0):
+        self.k = k
+        self.rows = None
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, frame):
+        return self._keep(frame.assign(_sample_key=self._rng.random(len(frame))))
+
+    def merge(self, other):
+        return self._keep(other.rows) if other.rows is not None else self
+
+    def _keep(self, keyed):
+        combined = keyed if self.rows is None else pd.concat([self.rows, keyed], ignore_index=True)
+        self.rows = combined.nsmallest(self.k, '_sample_key')
+        return self
+
+    @property
+    def frame(self):
+        if self.rows is None:
+            return None
+        return self.rows.drop(columns='_sample_key').reset_index(drop=True)
@@ -0,0 +1,101 @@
+"""Compact browser payloads for Plotly figures, and per-page byte budgets.
+
+st.plotly_chart sends each figure to the browser as JSON. Plotly encodes
+numpy arrays as base64 typed arrays ("bdata"), but only at the dtype they
+already have, and Python lists stay JSON text. compact_figure rewrites a
+figure so its payload is as small as the chart allows:
+
+- float data arrays of COMPACT_MIN_VALUES or more values (numpy or list)
+  are rounded to PAYLOAD_DECIMALS and sent as float32 typed arrays, half
+  the bytes of float64 (Plotly already narrows integer arrays itself);
+- text-like arrays (text, customdata, hovertext, ids) are left exactly as
+  built, since the browser shows them verbatim;
+- the template keeps its layout (Streamlit's theme merges into it) but only
+  the trace defaults of the trace types the figure actually draws.
+
+Every score, CGPA, count and axis position the pages plot is far coarser
+than 4 decimals, so the charts look and hover the same.
+
+instrument.plotly_chart records each chart's compact payload size and shows
+it against the page's PAGE_PAYLOAD_BUDGETS entry; tests/test_page_payloads.py
+runs the pages headlessly and asserts they stay within those budgets.
+"""
+import base64
+
+import numpy as np
+
+COMPACT_MIN_VALUES = 32  # shorter arrays cost little either way and keep full float64 precision
+PAYLOAD_DECIMALS = 4
+# Trace properties the browser displays as-is, so their values are never rounded or retyped
+_VERBATIM_KEYS = {'text', 'hovertext', 'customdata', 'ids', 'meta', 'texttemplate', 'hovertemplate'}
+
+# Bytes of Plotly JSON per page rerun. Objective 1 carries the scatter, whose point arrays
+# grow with the cohort up to figures.WEBGL_MAX_POINTS rows (then a capped sample or heatmap).
+PAGE_PAYLOAD_BUDGETS = {
+    'objective1': 640 * 2**10,
+    'objective2': 48 * 2**10,
+    'objective3': 32 * 2**10,
+}
+
+
+# --- Compaction ---
+
+def _decode(spec):
+    """The numpy array behind a Plotly typed-array spec ({'dtype', 'bdata'[, 'shape']})."""
+    values = np.frombuffer(base64.b64decode(spec['bdata']), dtype=spec['dtype'])
+    if 'shape' in spec:
+        values = values.reshape([int(n) for n in str(spec['shape']).split(',')])
+    return values
+
+
+def compact_array(values, decimals=PAYLOAD_DECIMALS, min_values=COMPACT_MIN_VALUES):
+    """values as rounded float32 when it is a long enough float array, otherwise unchanged.
+
+    Accepts numpy arrays, numeric lists and Plotly typed-array specs (what
+    Figure.to_plotly_json returns for numpy data).
+    """
+    if isinstance(values, dict) and 'bdata' in values and 'dtype' in values:
+        if values['dtype'] != 'f8':
+            return values
+        values = _decode(values)
+    elif isinstance(values, (list, tuple)):
+        if len(values) < min_values or not all(isinstance(v, float) for v in values):
+            return values
+        values = np.asarray(values)
+    if not isinstance(values, np.ndarray) or values.dtype.kind != 'f' or values.size < min_values:
+        return values
+    return np.round(values, decimals).astype(np.float32)
+
+
+def _compact_properties(props, decimals):
+    for key, value in props.items():
+        if key in _VERBATIM_KEYS:
+            continue
+        if isinstance(value, dict) and 'bdata' not in value:
+            _compact_properties(value, decimals)
+        else:
+            props[key] = compact_array(value, decimals)
+    return props
+
+
+def compact_figure(fig, decimals=PAYLOAD_DECIMALS):
+    """A copy of fig whose browser payload uses float32 typed arrays and a trimmed template."""
+    import plotly.graph_objects as go
+
+    spec = fig.to_plotly_json()
+    for trace in spec.get('data', []):
+        _compact_properties(trace, decimals)
+    template = spec.get('layout', {}).get('template')
+    if isinstance(template, dict) and isinstance(template.get('data'), dict):
+        drawn = {trace.get('type', 'scatter') for trace in spec.get('data', [])}
+        template['data'] = {kind: traces for kind, traces in template['data'].items() if kind in drawn}
+    # The spec comes from a validated figure, so re-validating it is wasted work
+    return go.Figure(spec, _validate=False)
+
+
+def payload_size(fig):
+    """Bytes of the JSON st.plotly_chart sends for fig."""
+    import plotly.io as pio
+
+    return len(pio.to_json(fig, validate=False))
+
@@ -0,0 +1,261 @@
+"""Overall CGPA prediction from the objective 1 predictors, with at-risk flags.
+
+A ridge-regularized linear model of Overall CGPA on HSC, SSC, Last score,
+Preparation_numeric and Attendance_numeric. It is fitted once per dataset
+version from sufficient statistics (online.RegressionStats, solved through
+the normal equations), and the coefficients are saved as JSON in the data
+cache directory, so restarts and other processes reuse them without reading
+the rows again. Appended rows are folded into the saved statistics.
+
+Scoring a cohort is one matrix-vector product. Missing predictor values are
+filled with their training means. Students whose predicted CGPA falls below
+the at-risk threshold are flagged.
+
+Score a CSV offline, chunk by chunk, so million-row uploads never sit in
+memory at once:
+
+    python prediction.py INPUT.csv [OUTPUT.csv] [--source SRC] [--threshold 2.5]
+                         [--chunksize N] [--refit]
+
+OUTPUT.csv (INPUT_scored.csv by default) is the input with Predicted_Overall
+and At_risk columns added. The model is the one fitted on --source (the
+configured dataset by default).
+"""
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow is optional; pandas writes the scored CSV instead (several times slower)
+    pa = None
+    pa_csv = None
+
+from ingest import CACHE_DIR
+from online import RegressionStats
+from utils import COL_DEPARTMENT, COL_HSC, COL_LAST, COL_OVERALL, COL_SEMESTER, COL_SSC, apply_schema
+
+PREDICTORS = [COL_HSC, COL_SSC, COL_LAST, 'Preparation_numeric', 'Attendance_numeric']
+TARGET = COL_OVERALL
+RIDGE_ALPHA = 1e-3  # penalty relative to each predictor's variance, i.e. ridge on standardized predictors
+CGPA_SCALE = (0.0, 4.0)  # predictions are clipped to the grading scale
+AT_RISK_CGPA = 2.5
+AT_RISK_LIST_ROWS = 100
+CHUNK_ROWS = 1_000_000  # bounds the float64 working copy while accumulating
+SCORE_CHUNK_ROWS = 200_000
+
+MODEL_DIR = CACHE_DIR / 'models'
+# Bump whenever the saved model layout or the fitting method changes so stale files are never reused
+MODEL_VERSION = 1
+
+
+# --- Fitting ---
+
+def regression_stats(df, predictors=PREDICTORS, target=TARGET):
+    """Sufficient statistics of the regression over df's complete rows."""
+    stats = RegressionStats(predictors, target)
+    for start in range(0, len(df), CHUNK_ROWS):
+        stats.update(df.iloc[start:start + CHUNK_ROWS])
+    return stats
+
+
+def fit_model(stats, ridge=RIDGE_ALPHA, dataset_version=None):
+    """Solves the (ridge) normal equations from regression statistics; returns the model as a JSON-able dict."""
+    k = len(stats.features)
+    if stats.count <= k + 1:
+        raise ValueError(f"Need more than {k + 1} complete rows to fit the CGPA model; got {stats.count}.")
+    means, cov = stats.moments()
+    cxx, cxy, cyy = cov[:k, :k], cov[:k, k], cov[k, k]
+    coefficients = np.linalg.lstsq(cxx + ridge * np.diag(np.diag(cxx)), cxy, rcond=None)[0]
+    residual_var = max(cyy - 2 * coefficients @ cxy + coefficients @ cxx @ coefficients, 0.0)
+    return {
+        'model_version': MODEL_VERSION,
+        'dataset_version': dataset_version,
+        'features': stats.features,
+        'target': stats.target,
+        'intercept': float(means[k] - coefficients @ means[:k]),
+        'coefficients': coefficients.tolist(),
+        'feature_means': means[:k].tolist(),
+        'feature_stds': np.sqrt(np.diag(cxx)).tolist(),
+        'rows': stats.count,
+        'r2': float(1 - residual_var / cyy) if cyy > 0 else float('nan'),
+        'residual_std': float(np.sqrt(residual_var * stats.count / (stats.count - k - 1))),
+        'ridge': ridge,
+        'stats': stats.zz.tolist(),  # kept so appended rows can be folded in without a rescan
+    }
+
+
+def model_stats(model):
+    """The regression statistics a model was fitted from."""
+    stats = RegressionStats(model['features'], model['target'])
+    stats.zz = np.array(model['stats'])
+    return stats
+
+
+# --- Persistence ---
+
+def _model_path(dataset_version):
+    return MODEL_DIR / f"cgpa-{dataset_version[:32]}.v{MODEL_VERSION}.json"
+
+
+def load_model(dataset_version):
+    """The saved model for a dataset version, or None when there is none (or it is stale)."""
+    try:
+        with open(_model_path(dataset_version)) as fh:
+            model = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if model.get('model_version') != MODEL_VERSION or model.get('features') != PREDICTORS:
+        return None
+    return model
+
+
+def save_model(model):
+    MODEL_DIR.mkdir(parents=True, exist_ok=True)
+    path = _model_path(model['dataset_version'])
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'w') as fh:
+        json.dump(model, fh)
+    os.replace(tmp, path)
+    return path
+
+
+def train_model(df, refit=False):
+    """The model for df's dataset version: loaded when saved, otherwise fitted (and saved when df has a version)."""
+    version = df.attrs.get('dataset_version')
+    model = None if version is None or refit else load_model(version)
+    if model is None:
+        model = fit_model(regression_stats(df), dataset_version=version)
+        if version is not None:
+            save_model(model)
+    return model
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _cached_model(dataset_version, _df):
+    return train_model(_df)
+
+
+def get_model(df):
+    """train_model cached per dataset version (fit df on the unfiltered dataset)."""
+    version = df.attrs.get('dataset_version')
+    if version is None:
+        return train_model(df)
+    return _cached_model(version, df)
+
+
+def appended_model(df, delta, combined):
+    """The model for `combined` = df + delta, folding delta into df's saved statistics (not yet saved).
+
+    None until a model for df has been fitted; the first page view fits one.
+    """
+    previous = load_model(df.attrs['dataset_version'])
+    if previous is None:
+        return None
+    stats = model_stats(previous).merge(regression_stats(delta))
+    return fit_model(stats, previous['ridge'], combined.attrs['dataset_version'])
+
+
+# --- Scoring ---
+
+def predict(model, df):
+    """Predicted Overall CGPA of every row, in one vectorized pass (missing predictors take their training means)."""
+    missing = [col for col in model['features'] if col not in df.columns]
+    if missing:
+        raise ValueError(f"Cannot score rows without the columns: {', '.join(missing)}")
+    x = df[model['features']].to_numpy(dtype='float64')
+    x = np.where(np.isnan(x), np.asarray(model['feature_means']), x)
+    return np.clip(x @ np.asarray(model['coefficients']) + model['intercept'], *CGPA_SCALE)
+
+
+def score(model, df, threshold=AT_RISK_CGPA):
+    """Predicted_Overall and At_risk columns for df's rows."""
+    predicted = predict(model, df)
+    return pd.DataFrame({'Predicted_Overall': predicted, 'At_risk': predicted < threshold}, index=df.index)
+
+
+def coefficient_table(model):
+    """Coefficients per predictor, with the CGPA change per standard deviation for comparing them."""
+    coefficients = np.asarray(model['coefficients'])
+    return pd.DataFrame({
+        'Coefficient': coefficients,
+        'Per std. dev.': coefficients * np.asarray(model['feature_stds']),
+    }, index=pd.Index(model['features'], name='Predictor')).round(3)
+
+
+def at_risk_students(df, model, threshold=AT_RISK_CGPA, limit=AT_RISK_LIST_ROWS):
+    """(number of at-risk students, the `limit` lowest predictions among them with their key columns)."""
+    predicted = predict(model, df)
+    flagged = np.flatnonzero(predicted < threshold)
+    if len(flagged) > limit:
+        flagged = flagged[np.argpartition(predicted[flagged], limit)[:limit]]
+    flagged = flagged[np.argsort(predicted[flagged], kind='stable')]
+    columns = [col for col in [COL_DEPARTMENT, COL_SEMESTER, COL_HSC, COL_LAST, COL_OVERALL] if col in df.columns]
+    lowest = df.iloc[flagged][columns].assign(Predicted_Overall=predicted[flagged].round(2))
+    return int((predicted < threshold).sum()), lowest
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_at_risk(dataset_version, model_version, threshold, _df, _model):
+    return at_risk_students(_df, _model, threshold)
+
+
+def get_at_risk(df, model, threshold=AT_RISK_CGPA):
+    """at_risk_students cached per dataset version (or filter slice), model and threshold."""
+    version = df.attrs.get('dataset_version')
+    if version is None:
+        return at_risk_students(df, model, threshold)
+    return _cached_at_risk(version, model['dataset_version'], threshold, df, model)
+
+
+def score_csv(model, input_path, output_path, threshold=AT_RISK_CGPA, chunksize=SCORE_CHUNK_ROWS):
+    """Scores a raw CSV chunk by chunk into output_path; returns (rows scored, rows flagged at risk)."""
+    rows = flagged = 0
+    with open(output_path, 'wb') as out:
+        for i, raw in enumerate(pd.read_csv(input_path, chunksize=chunksize)):
+            scored = score(model, apply_schema(raw.copy()), threshold)  # derives the *_numeric predictors
+            raw['Predicted_Overall'] = scored['Predicted_Overall'].round(3)
+            raw['At_risk'] = scored['At_risk']
+            if pa_csv is not None:
+                options = pa_csv.WriteOptions(include_header=i == 0)
+                pa_csv.write_csv(pa.Table.from_pandas(raw, preserve_index=False), out, write_options=options)
+            else:
+                out.write(raw.to_csv(header=i == 0, index=False).encode())
+            rows += len(raw)
+            flagged += int(scored['At_risk'].sum())
+    return rows, flagged
+
+
+if __name__ == '__main__':
+    from synthetic import parse_size
+    from utils import DATA_SOURCE, prepare_data
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', type=Path, metavar='INPUT.csv')
+    parser.add_argument('output', type=Path, nargs='?', metavar='OUTPUT.csv')
+    parser.add_argument('--source', default=DATA_SOURCE, help="dataset the model is fitted on")
+    parser.add_argument('--threshold', type=float, default=AT_RISK_CGPA, help="at-risk predicted CGPA")
+    parser.add_argument('--chunksize', type=parse_size, default=SCORE_CHUNK_ROWS)
+    parser.add_argument('--refit', action='store_true', help="refit instead of loading the saved model")
+    args = parser.parse_args()
+    input_path, threshold = args.input, args.threshold
+    output_path = args.output or input_path.with_name(f'{input_path.stem}_scored.csv')
+
+    started = time.perf_counter()
+    model = train_model(prepare_data(args.source), refit=args.refit)
+    print(f"Model: {model['rows']:,} students, R² {model['r2']:.3f}, residual SD {model['residual_std']:.3f} "
+          f"({time.perf_counter() - started:.2f}s)")
+    print(coefficient_table(model).to_string())
+
+    started = time.perf_counter()
+    rows, flagged = score_csv(model, input_path, output_path, threshold, args.chunksize)
+    seconds = time.perf_counter() - started
+    print(f"Scored {rows:,} rows in {seconds:.1f}s ({rows / max(seconds, 1e-9):,.0f} rows/s); "
+          f"{flagged:,} ({flagged / max(rows, 1):.1%}) predicted below {threshold:.2f} -> {output_path}")
@@ -0,0 +1,219 @@
+"""Pluggable query backends for the dashboard's group-by, filter and quantile work.
+
+Every backend answers the same three calls on the compact in-memory frame:
+
+- group_stats(df, dims, measures, where) returns the count, sum, sum of
+  squares, min and max of each measure per group, in the aggregate-cube
+  layout.
+- quantile(df, column, q, where) returns a linearly interpolated quantile.
+- count(df, where) returns the number of matching rows.
+
+``where`` maps a column to the labels to keep. 'pandas' is the default and
+needs nothing extra. 'duckdb' and 'polars' run the same queries on their
+multithreaded engines: DuckDB scans the pandas/Arrow buffers in place and
+Polars converts once per frame. Select one with STUDENT_QUERY_BACKEND. An
+engine that is not installed falls back to pandas.
+
+tests/test_query_parity.py checks that the backends agree (exactly on
+counts, min and max, and to rounding on sums and quantiles).
+"""
+import importlib
+import os
+import threading
+from importlib.util import find_spec
+
+import numpy as np
+import pandas as pd
+
+QUERY_BACKEND = os.environ.get('STUDENT_QUERY_BACKEND', 'pandas')
+
+_MAX_POLARS_FRAMES = 4  # converted frames kept (the dataset plus recent filter slices)
+
+
+def _as_cube_frame(df, result, dims, measures):
+    """Puts an engine's flat result (dims + measure__stat columns) into the cube layout."""
+    if dims:
+        keys = [
+            pd.Categorical(result[d], dtype=df[d].dtype) if isinstance(df[d].dtype, pd.CategoricalDtype)
+            else result[d].to_numpy()
+            for d in dims
+        ]
+        index = pd.MultiIndex.from_arrays(keys, names=list(dims)) if len(dims) > 1 else pd.Index(keys[0], name=dims[0])
+    else:
+        index = pd.Index(np.zeros(len(result), dtype=np.int8))
+    columns = {}
+    for m in measures:
+        for stat in ('count', 'sum', 'sumsq', 'min', 'max'):
+            values = result[f'{m}__{stat}'].to_numpy()
+            columns[(m, stat)] = values.astype('int64') if stat == 'count' else values.astype('float64')
+    frame = pd.DataFrame(columns, index=index)
+    frame.columns = pd.MultiIndex.from_tuples(frame.columns)
+    return frame.sort_index().sort_index(axis=1)
+
+
+class PandasBackend:
+    """Single-threaded pandas, the reference implementation."""
+
+    name = 'pandas'
+
+    def _where(self, df, where):
+        if not where:
+            return df
+        mask = np.ones(len(df), dtype=bool)
+        for col, labels in where.items():
+            mask &= df[col].isin(labels).to_numpy()
+        return df[mask]
+
+    def group_stats(self, df, dims, measures, where=None):
+        from aggregates import _group_frame
+
+        return _group_frame(self._where(df, where), dims, measures)
+
+    def quantile(self, df, column, q, where=None):
+        return float(self._where(df, where)[column].quantile(q))
+
+    def count(self, df, where=None):
+        return len(self._where(df, where))
+
+
+class DuckDBBackend:
+    """DuckDB SQL over the frame's buffers (no copy), using every core."""
+
+    name = 'duckdb'
+
+    def __init__(self):
+        self.duckdb = importlib.import_module('duckdb')  # optional engine, imported only when chosen
+        self._local = threading.local()  # DuckDB connections are not shared across threads
+
+    def _connection(self):
+        if not hasattr(self._local, 'con'):
+            self._local.con = self.duckdb.connect()
+        return self._local.con
+
+    @staticmethod
+    def _quote(name):
+        return '"' + name.replace('"', '""') + '"'
+
+    def _run(self, df, columns, sql, where):
+        """Runs sql against the given columns of df plus those the where filter needs."""
+        con = self._connection()
+        df = df[list(dict.fromkeys(list(columns) + list(where or {})))]
+        clauses, params = [], []
+        for col, labels in (where or {}).items():
+            clauses.append(f"CAST({self._quote(col)} AS VARCHAR) IN ({', '.join('?' * len(labels)) or 'NULL'})")
+            params.extend(str(label) for label in labels)
+        sql = sql.format(where=('WHERE ' + ' AND '.join(clauses)) if clauses else '')
+        con.register('frame', df)
+        try:
+            return con.execute(sql, params).df()
+        finally:
+            con.unregister('frame')
+
+    def group_stats(self, df, dims, measures, where=None):
+        aggregates = []
+        for m in measures:
+            x = f"CAST({self._quote(m)} AS DOUBLE)"
+            aggregates += [
+                f"COUNT({x}) AS {self._quote(m + '__count')}",
+                f"COALESCE(SUM({x}), 0) AS {self._quote(m + '__sum')}",
+                f"COALESCE(SUM({x} * {x}), 0) AS {self._quote(m + '__sumsq')}",
+                f"MIN({x}) AS {self._quote(m + '__min')}",
+                f"MAX({x}) AS {self._quote(m + '__max')}",
+            ]
+        keys = ', '.join(self._quote(d) for d in dims)
+        not_null = ' AND '.join(f"{self._quote(d)} IS NOT NULL" for d in dims)
+        if dims:
+            sql = (f"SELECT {keys}, {', '.join(aggregates)} FROM (SELECT * FROM frame {{where}}) "
+                   f"WHERE {not_null} GROUP BY {keys}")
+        else:
+            sql = f"SELECT {', '.join(aggregates)} FROM frame {{where}}"
+        return _as_cube_frame(df, self._run(df, list(dims) + list(measures), sql, where), dims, measures)
+
+    def quantile(self, df, column, q, where=None):
+        sql = f"SELECT QUANTILE_CONT(CAST({self._quote(column)} AS DOUBLE), {float(q)}) AS q FROM frame {{where}}"
+        value = self._run(df, [column], sql, where)['q'].iloc[0]
+        return float('nan') if pd.isna(value) else float(value)
+
+    def count(self, df, where=None):
+        return int(self._run(df, df.columns[:1], "SELECT COUNT(*) AS n FROM frame {where}", where)['n'].iloc[0])
+
+
+class PolarsBackend:
+    """Polars lazy queries, using every core; each dataset version is converted once and reused."""
+
+    name = 'polars'
+
+    def __init__(self):
+        self.pl = importlib.import_module('polars')  # optional engine, imported only when chosen
+        self._frames = {}  # dataset version -> Polars frame
+
+    def _frame(self, df):
+        version = df.attrs.get('dataset_version')
+        if version is None:
+            return self.pl.from_pandas(df)
+        if version not in self._frames:
+            self._frames[version] = self.pl.from_pandas(df)
+            while len(self._frames) > _MAX_POLARS_FRAMES:
+                self._frames.pop(next(iter(self._frames)))
+        return self._frames[version]
+
+    def _where(self, frame, where):
+        pl = self.pl
+        for col, labels in (where or {}).items():
+            frame = frame.filter(pl.col(col).cast(pl.Utf8).is_in([str(label) for label in labels]))
+        return frame
+
+    def group_stats(self, df, dims, measures, where=None):
+        pl = self.pl
+        frame = self._where(self._frame(df).lazy(), where)
+        aggregates = []
+        for m in measures:
+            x = pl.col(m).cast(pl.Float64)
+            aggregates += [
+                x.count().cast(pl.Int64).alias(f'{m}__count'),
+                x.sum().alias(f'{m}__sum'),
+                (x * x).sum().alias(f'{m}__sumsq'),
+                x.min().alias(f'{m}__min'),
+                x.max().alias(f'{m}__max'),
+            ]
+        if dims:
+            frame = frame.drop_nulls(list(dims)).group_by(list(dims)).agg(aggregates)
+            frame = frame.with_columns([pl.col(d).cast(pl.Utf8) for d in dims if isinstance(df[d].dtype, pd.CategoricalDtype)])
+        else:
+            frame = frame.select(aggregates)
+        return _as_cube_frame(df, frame.collect().to_pandas(), dims, measures)
+
+    def quantile(self, df, column, q, where=None):
+        pl = self.pl
+        frame = self._where(self._frame(df).lazy(), where)
+        value = frame.select(pl.col(column).cast(pl.Float64).quantile(q, interpolation='linear')).collect().item()
+        return float('nan') if value is None else float(value)
+
+    def count(self, df, where=None):
+        return self._where(self._frame(df).lazy(), where).select(self.pl.len()).collect().item()
+
+
+# name -> (backend class, module it needs)
+_ENGINES = {
+    'pandas': (PandasBackend, None),
+    'duckdb': (DuckDBBackend, 'duckdb'),
+    'polars': (PolarsBackend, 'polars'),
+}
+_backends = {}
+
+
+def available_backends():
+    """Names of the backends whose engine is installed."""
+    return [name for name, (_, module) in _ENGINES.items() if module is None or find_spec(module) is not None]
+
+
+def get_backend(name=None):
+    """The named backend (default STUDENT_QUERY_BACKEND), falling back to pandas when its engine is missing."""
+    name = name or QUERY_BACKEND
+    if name not in _ENGINES:
+        raise ValueError(f"Unknown query backend {name!r}; choose from {', '.join(_ENGINES)}.")
+    if name not in available_backends():
+        name = 'pandas'
+    if name not in _backends:
+        _backends[name] = _ENGINES[name][0]()
+    return _backends[name]
@@ -0,0 +1,87 @@
+"""Memory cost of each additional dashboard session.
+
+Runs a page in one headless session after another (all kept open, as
+concurrent users would be) and records the process RSS after each one. The
+first session pays for the dataset, caches and imports. Every later session
+should add only its own widgets and figures, never another copy of the
+data.
+
+    python session_memory.py [--page objective1.py] [--sessions N] [--rows N]
+
+--rows runs against a synthetic cohort of N rows (written to a temporary
+CSV) instead of the configured source. tests/test_session_memory.py bounds
+the per-session cost and checks the shared-frame mutation guard.
+"""
+import argparse
+import os
+import sys
+import time
+from importlib.util import find_spec
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+
+
+def current_rss():
+    """Resident set size of this process in bytes."""
+    if find_spec('psutil') is not None:
+        import psutil
+
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as fh:
+            return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:  # not Linux: fall back to the peak, which is an upper bound
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+
+def session_memory(page='objective1.py', sessions=5):
+    """Runs `page` in that many sessions; returns [(session, seconds, rss_bytes)] plus the dataset's bytes."""
+    from streamlit.testing.v1 import AppTest
+
+    from utils import get_data
+
+    apps, rows = [], []
+    for session in range(1, sessions + 1):
+        app = AppTest.from_file(str(BASE_DIR / page), default_timeout=300)
+        started = time.perf_counter()
+        app.run()
+        if app.exception:
+            raise RuntimeError(f"{page} raised in session {session}: {app.exception[0].value}")
+        apps.append(app)  # keep every session alive, as concurrent users would
+        rows.append((session, time.perf_counter() - started, current_rss()))
+    df = get_data()
+    return rows, int(df.memory_usage(deep=True).sum())
+
+
+def additional_session_bytes(rows):
+    """Mean RSS growth per session after the first, from session_memory's rows."""
+    return (rows[-1][2] - rows[0][2]) / max(len(rows) - 1, 1)
+
+
+if __name__ == '__main__':
+    from synthetic import parse_size, synthetic_source
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--page', default='objective1.py')
+    parser.add_argument('--sessions', type=int, default=5)
+    parser.add_argument('--rows', type=parse_size, help="use a synthetic cohort of this many rows")
+    args = parser.parse_args()
+    if args.rows:
+        os.environ['STUDENT_DATA_SOURCE'] = synthetic_source(args.rows)  # read by utils at import
+    from utils import format_bytes
+
+    page = args.page
+    results, data_bytes = session_memory(page, args.sessions)
+    print(f"{page}: dataset holds {format_bytes(data_bytes)}")
+    previous = None
+    for session, seconds, rss in results:
+        growth = '' if previous is None else f"  +{format_bytes(rss - previous)}"
+        print(f"session {session:<3} {seconds * 1000:8.1f} ms  RSS {format_bytes(rss):>10}{growth}")
+        previous = rss
+    per_session = additional_session_bytes(results)
+    print(f"Each additional session: {format_bytes(per_session)} "
+          f"({per_session / data_bytes:.1%} of the dataset's in-memory size).")
+
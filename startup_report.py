@@ -0,0 +1,130 @@
+"""Cold-start timing report for the dashboard.
+
+Breaks startup into module import and data-load stages, then drives
+``main.py``'s navigation headlessly (homepage first, then each objective
+page in turn), all in a fresh interpreter so nothing is already cached.
+
+    python startup_report.py [--json PATH]
+
+The homepage's contract is that it starts the dataset load in the
+background (so the objective pages find it loaded, or further along) but
+never waits for it. A third fresh run checks that: every load is slowed by
+PREFETCH_PROBE_SECONDS, and the homepage must still finish well within that
+delay, with the load started.
+
+tests/test_startup.py asserts the BUDGETS stages and the homepage contract
+(the load started, not waited for, and no Plotly import), so cold-start
+regressions fail the test suite.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# Seconds allowed per stage (asserted by tests/test_startup.py)
+BUDGETS = {
+    'import utils': 2.0,
+    'page home.py': 3.0,
+}
+PREFETCH_PROBE_SECONDS = 5.0  # artificial load time in the prefetch probe; home must not wait for it
+
+_IMPORT_STAGES = """
+import json, time
+timings = {}
+
+def stage(name, fn):
+    started = time.perf_counter()
+    fn()
+    timings[name] = time.perf_counter() - started
+
+stage('import streamlit', lambda: __import__('streamlit'))
+stage('import numpy/pandas', lambda: (__import__('numpy'), __import__('pandas')))
+stage('import utils', lambda: __import__('utils'))
+import utils
+stage('load data', utils.get_data)
+stage('import plotly', lambda: (__import__('plotly.express'), __import__('plotly.graph_objects')))
+print(json.dumps(timings))
+"""
+
+_NAVIGATION = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+
+results = {}
+app = AppTest.from_file('main.py', default_timeout=300)
+for page in ['home.py', 'objective1.py', 'objective2.py', 'objective3.py']:
+    if page != 'home.py':
+        app.switch_page(page)
+    started = time.perf_counter()
+    app.run()
+    import utils
+    results[page] = {
+        'seconds': time.perf_counter() - started,
+        'load_started': bool(utils._LOADS),
+        'data_ready': utils.data_ready(),
+        'plotly_imported': 'plotly.express' in sys.modules,
+        'exceptions': [str(e.value) for e in app.exception],
+    }
+print(json.dumps(results))
+"""
+
+
+_PREFETCH_PROBE = """
+import json, time
+import utils
+from streamlit.testing.v1 import AppTest
+
+load = utils._dataset
+
+def slow_load(source):
+    time.sleep(%(delay)r)
+    return load(source)
+
+utils._dataset = slow_load  # background loads resolve the module global when they start
+started = time.perf_counter()
+app = AppTest.from_file('home.py', default_timeout=300).run()
+print(json.dumps({
+    'seconds': time.perf_counter() - started,
+    'load_started': bool(utils._LOADS),
+    'exceptions': [str(e.value) for e in app.exception],
+}))
+"""
+
+
+def _run_fresh(code):
+    """Runs a snippet in a new interpreter rooted at the app directory and returns its JSON output."""
+    out = subprocess.run(
+        [sys.executable, '-c', code], cwd=BASE_DIR, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def startup_report():
+    """Import/data-load breakdown plus per-page cold navigation timings."""
+    report = {
+        'stages': _run_fresh(_IMPORT_STAGES),
+        'pages': _run_fresh(_NAVIGATION),
+        'prefetch': _run_fresh(_PREFETCH_PROBE % {'delay': PREFETCH_PROBE_SECONDS}),
+    }
+    for page, result in report['pages'].items():
+        report['stages'][f'page {page}'] = result['seconds']
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--json', metavar='PATH', help="also write the report as JSON")
+    args = parser.parse_args()
+    result = startup_report()
+    for name, seconds in result['stages'].items():
+        print(f"{name:<24} {seconds * 1000:8.1f} ms")
+    prefetch = result['prefetch']
+    print(f"home.py with a {PREFETCH_PROBE_SECONDS:.0f}s load: {prefetch['seconds'] * 1000:.1f} ms, "
+          f"load {'started' if prefetch['load_started'] else 'not started'}")
+
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump(result, fh, indent=2)
@@ -0,0 +1,260 @@
+"""Server-side distribution summaries and confidence intervals for the objective pages.
+
+Violin and box plots are built from these summaries (quantiles, whiskers, a
+fixed-grid KDE and a capped outlier sample) instead of shipping every row to
+the browser and letting Plotly compute them client-side.
+
+Every plotted group mean also gets a 95% confidence interval: a Student t
+interval from the group's count, mean and standard deviation, or, for groups
+smaller than BOOTSTRAP_MAX_N, a percentile bootstrap interval. The bootstrap
+resamples of all small groups are drawn and averaged together in a few
+batched NumPy operations.
+"""
+import math
+from functools import lru_cache
+from statistics import NormalDist
+
+import numpy as np
+import streamlit as st
+
+from aggregates import CUBE_DIMENSIONS, group_stats
+
+KDE_GRID_POINTS = 100
+KDE_HISTOGRAM_BINS = 1024
+MAX_OUTLIERS_PER_GROUP = 50
+
+CONFIDENCE = 0.95
+BOOTSTRAP_MAX_N = 30  # smaller groups get bootstrap intervals; the t interval is reliable from here on
+BOOTSTRAP_RESAMPLES = 1000
+BOOTSTRAP_BATCH_VALUES = 4_000_000  # resampled values drawn per batch, which bounds the memory used
+T_EXACT_MAX_DOF = 30  # t quantiles are solved exactly below this; the expansion is within 1e-5 from here on
+
+
+def box_summary(df, group_col, value_col, order=None):
+    """Per-group n, mean, quartiles and Tukey whiskers (furthest points within 1.5 IQR)."""
+    data = df[[group_col, value_col]].dropna()
+    grouped = data.groupby(group_col, observed=True)[value_col]
+    summary = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    summary.columns = ['q1', 'median', 'q3']
+    summary['n'] = grouped.size()
+    summary['mean'] = grouped.mean()
+    summary['std'] = grouped.std()
+
+    iqr = summary['q3'] - summary['q1']
+    low_limit = data[group_col].map(summary['q1'] - 1.5 * iqr).astype(float)
+    high_limit = data[group_col].map(summary['q3'] + 1.5 * iqr).astype(float)
+    inside = data[value_col].between(low_limit, high_limit)
+    whiskers = data[inside].groupby(group_col, observed=True)[value_col].agg(['min', 'max'])
+    summary['lowerfence'] = whiskers['min']
+    summary['upperfence'] = whiskers['max']
+
+    if order is not None:
+        listed = [g for g in order if g in summary.index]
+        summary = summary.reindex(listed + [g for g in summary.index if g not in listed])
+    return summary
+
+
+def outlier_sample(df, group_col, value_col, summary, cap=MAX_OUTLIERS_PER_GROUP, seed=0):
+    """Rows outside each group's whiskers, at most `cap` per group."""
+    data = df[[group_col, value_col]].dropna()
+    low = data[group_col].map(summary['lowerfence']).astype(float)
+    high = data[group_col].map(summary['upperfence']).astype(float)
+    outliers = data[(data[value_col] < low) | (data[value_col] > high)]
+    if outliers.empty:
+        return outliers
+    shuffled = outliers.sample(frac=1, random_state=seed)
+    return shuffled.groupby(group_col, observed=True).head(cap)
+
+
+def _silverman_bandwidth(values):
+    std = values.std(ddof=1)
+    q1, q3 = np.percentile(values, [25, 75])
+    spread = min(std, (q3 - q1) / 1.349) or std
+    return 1.059 * spread * len(values) ** (-1 / 5) if spread > 0 else 0.1
+
+
+def kde_grid(values, grid_points=KDE_GRID_POINTS, bins=KDE_HISTOGRAM_BINS):
+    """Gaussian KDE on a fixed grid spanning min-2bw..max+2bw (Plotly's 'soft' violin span).
+
+    Values are first binned into a fine histogram, so the cost is
+    O(n + bins * grid_points) rather than O(n * grid_points).
+    """
+    values = np.asarray(values, dtype='float64')
+    values = values[~np.isnan(values)]
+    if len(values) < 2:
+        return np.array([]), np.array([])
+
+    bandwidth = _silverman_bandwidth(values)
+    grid = np.linspace(values.min() - 2 * bandwidth, values.max() + 2 * bandwidth, grid_points)
+    counts, edges = np.histogram(values, bins=bins, range=(grid[0], grid[-1]))
+    centers = (edges[:-1] + edges[1:]) / 2
+
+    z = (grid[:, None] - centers[None, :]) / bandwidth
+    density = (np.exp(-0.5 * z ** 2) @ counts) / (len(values) * bandwidth * np.sqrt(2 * np.pi))
+    return grid, density
+
+
+def distribution_summary(df, group_col, value_col, order=None, outlier_cap=MAX_OUTLIERS_PER_GROUP):
+    """Box statistics, per-group KDE curves and a capped outlier sample for one grouped column."""
+    summary = box_summary(df, group_col, value_col, order=order)
+    positions = df.groupby(group_col, observed=True).indices
+    values = df[value_col].to_numpy()
+    kde = {group: kde_grid(values[positions[group]]) for group in summary.index}
+    summary['mean_low'], summary['mean_high'] = mean_intervals(
+        summary['n'], summary['mean'], summary['std'], lambda i: values[positions[summary.index[i]]]
+    )
+    outliers = outlier_sample(df, group_col, value_col, summary, cap=outlier_cap)
+    return {'summary': summary, 'kde': kde, 'outliers': outliers}
+
+
+@st.cache_data(show_spinner=False)
+def _cached_distribution(dataset_version, group_col, value_col, order, _df):
+    return distribution_summary(_df, group_col, value_col, order=order)
+
+
+def get_distribution(df, group_col, value_col, order=None):
+    """distribution_summary cached per dataset version."""
+    version = df.attrs.get('dataset_version')
+    order = tuple(order) if order is not None else None
+    if version is None:
+        return distribution_summary(df, group_col, value_col, order=order)
+    return _cached_distribution(version, group_col, value_col, order, df)
+
+
+# --- Confidence Intervals For Group Means ---
+
+def _t_coverage(theta, dof):
+    """P(|T| <= sqrt(dof) * tan(theta)) for integer dof, from the finite series of A&S 26.7.3-4."""
+    c2 = math.cos(theta) ** 2
+    term = total = 1.0
+    if dof % 2:
+        for j in range(1, (dof - 1) // 2):
+            term *= 2 * j / (2 * j + 1) * c2
+            total += term
+        return 2 / math.pi * (theta + (math.sin(theta) * math.cos(theta) * total if dof > 1 else 0.0))
+    for j in range(1, dof // 2):
+        term *= (2 * j - 1) / (2 * j) * c2
+        total += term
+    return math.sin(theta) * total
+
+
+@lru_cache(maxsize=256)
+def _exact_t_quantile(p, dof):
+    """Student t quantile for a small integer dof, by bisection on the closed-form distribution."""
+    coverage, low, high = abs(2 * p - 1), 0.0, math.pi / 2
+    for _ in range(60):
+        mid = (low + high) / 2
+        low, high = (mid, high) if _t_coverage(mid, dof) < coverage else (low, mid)
+    return math.copysign(math.sqrt(dof) * math.tan((low + high) / 2), p - 0.5)
+
+
+def t_quantile(p, dof):
+    """Student t quantile: exact below T_EXACT_MAX_DOF (integer) degrees of freedom, else a Cornish-Fisher expansion."""
+    z = NormalDist().inv_cdf(p)
+    dof = np.asarray(dof, dtype='float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        quantile = np.array(
+            z + (z ** 3 + z) / (4 * dof) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * dof ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * dof ** 3)
+        )
+    small = (dof >= 1) & (dof < T_EXACT_MAX_DOF)
+    quantile[small] = [_exact_t_quantile(p, int(d)) for d in np.atleast_1d(dof[small])]
+    return quantile
+
+
+def bootstrap_mean_intervals(groups, confidence=CONFIDENCE, resamples=BOOTSTRAP_RESAMPLES, seed=0):
+    """Percentile bootstrap intervals of the mean of each array in groups, as (low, high) arrays.
+
+    All groups are resampled together: the draws for a batch of groups form one
+    (resamples x rows) index matrix, and np.add.reduceat sums each group's
+    segment of every resample at once.
+    """
+    sizes = np.array([len(g) for g in groups], dtype=np.int64)
+    values = np.concatenate(groups).astype('float64')
+    starts = np.cumsum(sizes) - sizes
+    tail = (1 - confidence) / 2
+    low, high = np.empty(len(groups)), np.empty(len(groups))
+
+    rng = np.random.default_rng(seed)
+    batch = (np.cumsum(sizes) - 1) // max(1, BOOTSTRAP_BATCH_VALUES // resamples)
+    edges = np.concatenate([[0], np.flatnonzero(np.diff(batch)) + 1, [len(groups)]])
+    for first, last in zip(edges[:-1], edges[1:]):
+        seg_sizes, seg_starts = sizes[first:last], starts[first:last]
+        row_start = np.repeat(seg_starts, seg_sizes).astype(np.intp)
+        row_size = np.repeat(seg_sizes, seg_sizes)
+        # float32 uniforms scaled in place; the minimum guards against a product rounding up to the size
+        uniforms = rng.random((resamples, len(row_start)), dtype=np.float32)
+        uniforms *= row_size.astype(np.float32)
+        draws = np.minimum(uniforms.astype(np.intp), row_size - 1)
+        draws += row_start
+        offsets = np.cumsum(seg_sizes) - seg_sizes
+        means = np.add.reduceat(values[draws], offsets, axis=1) / seg_sizes
+        low[first:last], high[first:last] = np.quantile(means, [tail, 1 - tail], axis=0)
+    return low, high
+
+
+def mean_intervals(count, mean, std, values_of=None, confidence=CONFIDENCE, resamples=BOOTSTRAP_RESAMPLES):
+    """Per-group (low, high) confidence bounds of a mean, as arrays aligned with the inputs.
+
+    Groups of BOOTSTRAP_MAX_N or more use the t interval. Smaller groups are
+    bootstrapped from values_of(i), the values of the i-th group, when given.
+    Groups with fewer than two values have no interval (NaN).
+    """
+    count = np.asarray(count, dtype='float64')
+    mean, std = np.asarray(mean, dtype='float64'), np.asarray(std, dtype='float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        half_width = t_quantile(1 - (1 - confidence) / 2, count - 1) * std / np.sqrt(count)
+    low, high = mean - half_width, mean + half_width
+
+    small = np.flatnonzero((count >= 2) & (count < BOOTSTRAP_MAX_N))
+    if values_of is not None and len(small):
+        groups = [np.asarray(values_of(i), dtype='float64') for i in small]
+        low[small], high[small] = bootstrap_mean_intervals([g[~np.isnan(g)] for g in groups], confidence, resamples)
+    low[count < 2] = high[count < 2] = np.nan
+    return low, high
+
+
+def group_mean_intervals(df, cube, name, measure):
+    """Per-group count, mean and 95% interval bounds (low, high) of a measure, aligned with cube[name].
+
+    Counts, means and t intervals come from the cube; only the rows of small
+    groups are read, to bootstrap them. Streamed datasets hold just a sample
+    of their rows, so they use t intervals throughout.
+    """
+    stats = group_stats(cube, name, measure)[['count', 'mean', 'std']]
+    dims = list(CUBE_DIMENSIONS[name])
+    values_of = None
+    if dims and df.attrs.get('ingest_mode') != 'stream':
+        positions = {}
+
+        def values_of(i):
+            if not positions:  # group the rows only once some group turns out to be small
+                positions.update(df.groupby(dims, observed=True).indices)
+            return df[measure].to_numpy()[positions[stats.index[i]]]
+
+    stats['low'], stats['high'] = mean_intervals(stats['count'], stats['mean'], stats['std'], values_of)
+    return stats
+
+
+@st.cache_data(show_spinner=False, max_entries=128)  # a few groupings per dataset version or filter slice
+def _cached_intervals(dataset_version, name, measure, _df, _cube):
+    return group_mean_intervals(_df, _cube, name, measure)
+
+
+def get_mean_intervals(df, cube, name, measure):
+    """group_mean_intervals cached per dataset version."""
+    version = df.attrs.get('dataset_version')
+    if version is None:
+        return group_mean_intervals(df, cube, name, measure)
+    return _cached_intervals(version, name, measure, df, cube)
+
+
+def overlapping_runner_up(intervals):
+    """The runner-up group when its interval overlaps the top group's (None when the top mean is clearly highest)."""
+    ranked = intervals.dropna(subset=['mean']).sort_values('mean', ascending=False, kind='stable')
+    if len(ranked) < 2:
+        return None
+    leader, runner_up = ranked.iloc[0], ranked.iloc[1]
+    if np.isnan(leader['low']) or np.isnan(runner_up['high']) or leader['low'] <= runner_up['high']:
+        return ranked.index[1]
+    return None
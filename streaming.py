@@ -0,0 +1,135 @@
+"""Chunked streaming ingestion for sources larger than memory.
+
+The source CSV is read in fixed-size chunks. Each chunk gets the same
+cleaning as ``utils.load_data`` and is folded into mergeable accumulators:
+the aggregate cube, Welford moments, correlation sufficient statistics,
+quantile sketches (overall and per group, for medians and box plots) and a
+bounded uniform row sample for the charts that need individual points.
+Peak memory therefore depends on the chunk size, not on the source size.
+
+    python streaming.py [SOURCE] [--chunksize N]
+"""
+import argparse
+import hashlib
+import resource
+import time
+import tracemalloc
+
+import pandas as pd
+
+from aggregates import CUBE_DIMENSIONS, MEASURES, _group_frame, merge_cubes
+from correlation import HEATMAP_COLUMNS
+from online import BottomKSample, CorrelationStats, QuantileSketch, RunningMoments
+from utils import (
+    COL_HOMETOWN, COL_HSC, COL_INCOME, COL_LAST, COL_OVERALL, COL_SSC,
+    DATA_SOURCE, apply_schema, format_bytes
+)
+
+DEFAULT_CHUNKSIZE = 100_000
+DEFAULT_SAMPLE_SIZE = 50_000
+CORR_COLUMNS = HEATMAP_COLUMNS
+SKETCH_GROUPS = [COL_HOMETOWN, COL_INCOME]
+
+
+class StreamSummary:
+    """Everything the dashboards need from a source, accumulated chunk by chunk."""
+
+    def __init__(self, sample_size=DEFAULT_SAMPLE_SIZE):
+        self.rows = 0
+        self.cube = {}
+        self.moments = {}
+        self.sketches = {}
+        self.group_sketches = {}
+        self.correlation = None
+        self.sample = BottomKSample(sample_size)
+        self.dataset_version = None
+        self.peak_memory_bytes = None
+        self.seconds = None
+
+    def update(self, chunk):
+        """Folds one cleaned chunk into every accumulator."""
+        self.rows += len(chunk)
+        measures = [m for m in MEASURES if m in chunk.columns]
+
+        chunk_cube = {
+            name: _group_frame(chunk, dims, measures)
+            for name, dims in CUBE_DIMENSIONS.items() if all(d in chunk.columns for d in dims)
+        }
+        self.cube = merge_cubes(self.cube, chunk_cube) if self.cube else chunk_cube
+
+        corr_cols = [c for c in CORR_COLUMNS if c in chunk.columns]
+        for col in measures:
+            self.moments.setdefault(col, RunningMoments()).update(chunk[col].to_numpy(dtype='float64'))
+        for col in dict.fromkeys(measures + corr_cols):  # sketches also give the approximate Spearman ranks
+            self.sketches.setdefault(col, QuantileSketch()).update(chunk[col].to_numpy(dtype='float64'))
+
+        for group_col in SKETCH_GROUPS:
+            if group_col not in chunk.columns:
+                continue
+            sketches = self.group_sketches.setdefault(group_col, {})
+            for label, positions in chunk.groupby(group_col, observed=True).indices.items():
+                values = chunk[COL_OVERALL].to_numpy(dtype='float64')[positions]
+                sketches.setdefault(label, QuantileSketch()).update(values)
+
+        if self.correlation is None:
+            self.correlation = CorrelationStats(corr_cols)
+        self.correlation.update(chunk)
+        return self
+
+    def quantile(self, column, q, group_col=None, group=None):
+        """Approximate quantile of a column, optionally within one group (e.g. median CGPA of one hometown)."""
+        if group_col is None:
+            return self.sketches[column].quantile(q)
+        return self.group_sketches[group_col][group].quantile(q)
+
+
+def clean_chunk(raw):
+    """The load_data cleaning applied to one raw chunk."""
+    chunk = apply_schema(raw.copy())
+    return chunk.dropna(subset=[COL_HSC, COL_LAST, COL_OVERALL])
+
+
+def stream_ingest(source, chunksize=DEFAULT_CHUNKSIZE, sample_size=DEFAULT_SAMPLE_SIZE, track_memory=False):
+    """Streams a CSV source into a StreamSummary without materializing the full frame."""
+    if track_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+
+    summary = StreamSummary(sample_size=sample_size)
+    digest = hashlib.sha256()
+    for raw in pd.read_csv(source, chunksize=chunksize):
+        digest.update(pd.util.hash_pandas_object(raw, index=False).to_numpy().tobytes())
+        chunk = clean_chunk(raw)
+        summary.update(chunk)
+        summary.sample.update(raw.loc[chunk.index])  # keep raw rows so the sample gets one consistent schema
+
+    summary.dataset_version = f"stream-{digest.hexdigest()}"
+    summary.seconds = time.perf_counter() - started
+    if track_memory:
+        summary.peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return summary
+
+
+def sample_frame(summary):
+    """The row sample with the full-load schema applied, for charts that need individual points."""
+    sample = summary.sample.frame
+    return clean_chunk(sample) if sample is not None else pd.DataFrame()
+
+
+if __name__ == '__main__':
+    from synthetic import parse_size
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('source', nargs='?', default=DATA_SOURCE, metavar='SOURCE')
+    parser.add_argument('--chunksize', type=parse_size, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args()
+    target, size = args.source, args.chunksize
+
+    result = stream_ingest(target, chunksize=size, track_memory=True)
+    overall = result.moments[COL_OVERALL]
+    print(f"Rows ingested:        {result.rows:,} in {result.seconds:.2f}s (chunks of {size:,})")
+    print(f"Overall CGPA:         mean {overall.mean:.3f}, std {overall.std:.3f}, "
+          f"min {overall.min:.2f}, max {overall.max:.2f}, median ~{result.quantile(COL_OVERALL, 0.5):.2f}")
+    print(f"Peak traced memory:   {format_bytes(result.peak_memory_bytes)}")
+    print(f"Peak process RSS:     {format_bytes(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)}")
@@ -0,0 +1,81 @@
+"""Synthetic student cohorts scaled up from processed_data.csv.
+
+Rows are drawn jointly from the template (so Department, Income bands,
+Attendance bins, Semester labels and the rest keep their observed
+distributions and their relationships with the scores), and the score
+columns get small clipped noise so large cohorts are not just repeats.
+
+    python synthetic.py ROWS OUTPUT.csv [--seed N]
+"""
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ingest import LOCAL_DATA_PATH
+
+SCORE_COLUMNS = {'HSC': 2, 'SSC': 2, 'Last': 3, 'Overall': 3}  # column -> decimals kept
+SCORE_NOISE = 0.05
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+
+def parse_size(text):
+    """'10k' -> 10_000, '1m' -> 1_000_000, '2500' -> 2500 (row counts on the command line)."""
+    text = text.strip().lower()
+    scale = {'k': 1_000, 'm': 1_000_000}.get(text[-1], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def load_template(path=LOCAL_DATA_PATH):
+    """The raw CSV the synthetic cohorts are modelled on."""
+    return pd.read_csv(path)
+
+
+def generate_cohort(n_rows, template=None, seed=0):
+    """A DataFrame of n_rows synthetic students with the template's raw CSV schema."""
+    template = load_template() if template is None else template
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(template), size=n_rows)
+    cohort = template.iloc[picks].reset_index(drop=True)
+
+    for col, decimals in SCORE_COLUMNS.items():
+        if col not in cohort.columns:
+            continue
+        values = pd.to_numeric(cohort[col], errors='coerce').to_numpy(dtype='float64')
+        low, high = np.nanmin(values), np.nanmax(values)
+        noisy = values + rng.normal(0, SCORE_NOISE, size=n_rows)
+        cohort[col] = np.round(np.clip(noisy, low, high), decimals)
+    return cohort
+
+
+def write_cohort_csv(path, n_rows, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Writes a synthetic cohort in chunks, so 10M-row files never sit in memory at once."""
+    template = load_template()
+    written = 0
+    chunk_index = 0
+    while written < n_rows:
+        size = min(chunk_rows, n_rows - written)
+        chunk = generate_cohort(size, template=template, seed=seed + chunk_index)
+        chunk.to_csv(path, mode='w' if written == 0 else 'a', header=written == 0, index=False)
+        written += size
+        chunk_index += 1
+    return path
+
+
+def synthetic_source(n_rows, seed=0):
+    """Path of a fresh temporary CSV holding a synthetic cohort of n_rows (for pointing STUDENT_DATA_SOURCE at)."""
+    path = Path(tempfile.mkdtemp(prefix='student-cohort-')) / f'cohort_{n_rows}.csv'
+    return str(write_cohort_csv(path, n_rows, seed=seed))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('rows', type=parse_size, metavar='ROWS')
+    parser.add_argument('output', metavar='OUTPUT.csv')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    rows, output = args.rows, args.output
+    write_cohort_csv(output, rows, seed=args.seed)
+    print(f"Wrote {rows:,} synthetic students to {output}")
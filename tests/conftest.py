@@ -0,0 +1,37 @@
+"""Shared fixtures for the dashboard tests.
+
+The modules live flat at the repository root, so the root goes on sys.path.
+The columnar cache is pointed at a scratch directory before any module
+reads STUDENT_DATA_CACHE_DIR, so tests never touch the working .data_cache.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault('STUDENT_DATA_CACHE_DIR', tempfile.mkdtemp(prefix='student-cache-'))
+
+SYNTHETIC_ROWS = 20_000
+
+
+@pytest.fixture(scope='session')
+def bundled_frame():
+    """The bundled processed_data.csv in the in-memory schema."""
+    from utils import LOCAL_DATA_PATH, prepare_data
+
+    return prepare_data(str(LOCAL_DATA_PATH))
+
+
+@pytest.fixture(scope='session')
+def synthetic_frame():
+    """A synthetic cohort of SYNTHETIC_ROWS students in the in-memory schema."""
+    from synthetic import generate_cohort
+    from utils import REQUIRED_COLUMNS, apply_schema
+
+    df = apply_schema(generate_cohort(SYNTHETIC_ROWS)).dropna(subset=REQUIRED_COLUMNS)
+    df.attrs['dataset_version'] = f'synthetic-{SYNTHETIC_ROWS}-rows'
+    return df
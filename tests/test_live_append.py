@@ -0,0 +1,93 @@
+"""Rows appended to a local CSV are folded in without a full reload."""
+import shutil
+
+import pandas as pd
+import pytest
+
+from ingest import file_state, read_appended
+from utils import LOCAL_DATA_PATH, LiveDataset, is_frozen
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'cohort.csv'
+    shutil.copy(LOCAL_DATA_PATH, path)
+    return path
+
+
+def _rows(count):
+    return LOCAL_DATA_PATH.read_bytes().splitlines(keepends=True)[1:count + 1]
+
+
+def test_append_is_read_as_a_delta(source):
+    state = file_state(source)
+    rows = _rows(3)
+    with open(source, 'ab') as fh:
+        fh.writelines(rows)
+    delta, delta_bytes, state = read_appended(source, state)
+    assert len(delta) == 3 and delta_bytes == b''.join(rows)
+    assert read_appended(source, state)[0].empty
+
+
+def test_partly_written_line_waits_for_the_writer(source):
+    state = file_state(source)
+    first, second = _rows(2)
+    with open(source, 'ab') as fh:
+        fh.write(first + second[:len(second) // 2])
+    delta, delta_bytes, state = read_appended(source, state)
+    assert len(delta) == 1 and delta_bytes == first
+
+    with open(source, 'ab') as fh:
+        fh.write(second[len(second) // 2:])
+    appended = read_appended(source, state)
+    assert appended is not None, "finishing the line forced a full reload"
+    delta, delta_bytes, _ = appended
+    assert len(delta) == 1 and delta_bytes == second
+    expected = pd.read_csv(LOCAL_DATA_PATH, skiprows=[1], nrows=1)
+    pd.testing.assert_frame_equal(delta, expected)
+
+
+def test_rewrite_forces_a_reload(source):
+    state = file_state(source)
+    source.write_bytes(source.read_bytes().replace(b'\n', b'\r\n', 1) + _rows(1)[0])
+    assert read_appended(source, state) is None
+
+
+def test_live_dataset_appends_each_row_once(source, monkeypatch):
+    import aggregates
+    import prediction
+
+    live = LiveDataset(str(source))
+    rows = len(live.current())
+    prediction.train_model(live.df)  # a saved model, so the append folds into it
+    with open(source, 'ab') as fh:
+        fh.writelines(_rows(2))
+
+    monkeypatch.setattr(aggregates, 'build_cube', _fail)
+    assert len(live.current()) == rows, "a failed append changed the served frame"
+    monkeypatch.undo()
+
+    monkeypatch.setattr(prediction, 'save_model', _fail_os)
+    df = live.current()
+    assert len(df) == rows + 2 and is_frozen(df)
+    assert len(live.current()) == rows + 2
+
+
+def test_failed_reload_keeps_the_previous_frame(source, monkeypatch):
+    import utils
+
+    live = LiveDataset(str(source))
+    before = live.current()
+    source.write_bytes(source.read_bytes().replace(b'\n', b'\r\n', 1))
+    monkeypatch.setattr(utils, 'prepare_data', _fail_os)
+    assert live.current() is before
+    monkeypatch.undo()
+    assert live.current() is not before
+
+
+def _fail(*args, **kwargs):
+    raise RuntimeError("boom")
+
+
+def _fail_os(*args, **kwargs):
+    raise OSError("read-only")
@@ -0,0 +1,69 @@
+"""Each objective page's Plotly payload stays within its PAGE_PAYLOAD_BUDGETS entry."""
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import utils
+from figures import WEBGL_MAX_POINTS
+from payload import PAGE_PAYLOAD_BUDGETS
+from synthetic import generate_cohort
+
+ROOT = Path(__file__).resolve().parent.parent
+# Just under the full-point scatter bound: objective 1's largest payload
+LARGE_COHORT_ROWS = WEBGL_MAX_POINTS - 5_000
+
+
+@pytest.fixture(scope='module')
+def large_cohort(tmp_path_factory):
+    path = tmp_path_factory.mktemp('payloads') / 'cohort.csv'
+    generate_cohort(LARGE_COHORT_ROWS).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture(params=['bundled', 'large cohort'])
+def source(request, monkeypatch):
+    if request.param == 'bundled':
+        return utils.DATA_SOURCE
+    path = request.getfixturevalue('large_cohort')
+    monkeypatch.setattr(utils, 'DATA_SOURCE', path)  # read when each session picks its dataset
+    return path
+
+
+def chart_payloads(page):
+    """{chart: payload bytes} from one headless run of page's instrumentation records."""
+    app = AppTest.from_file(str(ROOT / page), default_timeout=300)
+    app.run()
+    assert not app.exception, f"{page} raised: {app.exception[0].value}"
+    records = app.session_state['_perf_records']['records']
+    return {
+        record['section'].removesuffix(' render'): record['payload_bytes']
+        for record in records if 'payload_bytes' in record
+    }
+
+
+@pytest.mark.parametrize('page', sorted(PAGE_PAYLOAD_BUDGETS))
+def test_page_payload_within_budget(page, source):
+    utils.get_data(source)  # load up front, so the page renders its charts rather than loading notes
+    charts = chart_payloads(f'{page}.py')
+    assert charts, f"{page} recorded no chart payloads"
+    total, budget = sum(charts.values()), PAGE_PAYLOAD_BUDGETS[page]
+    assert total <= budget, (
+        f"{page}: {utils.format_bytes(total)} of figures (budget {utils.format_bytes(budget)}): "
+        + ", ".join(f"{chart} {utils.format_bytes(size)}" for chart, size in charts.items())
+    )
+
+
+def test_cached_figures_carry_their_payload_size():
+    import numpy as np
+    import plotly.graph_objects as go
+
+    from figure_cache import cached_figure, cached_payload_bytes
+    from payload import payload_size
+
+    x = np.linspace(0, 1, 1_000)
+    build = lambda: go.Figure(go.Scattergl(x=x, y=x ** 2))  # noqa: E731
+    assert cached_payload_bytes(build()) is None
+    for _ in ['miss', 'hit']:
+        fig = cached_figure('payload-size-test', 'payload-size-version', build)
+        assert cached_payload_bytes(fig) == payload_size(fig)
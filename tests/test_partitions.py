@@ -0,0 +1,39 @@
+"""Slices read from the partitioned layout match the same rows of a full load."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils
+from export_reports import OBJECTIVE_COLUMNS
+from ingest import can_partition
+from synthetic import generate_cohort
+
+pytestmark = pytest.mark.skipif(not can_partition('local.csv'), reason="pyarrow datasets are not installed")
+
+
+@pytest.fixture(scope='module')
+def source(tmp_path_factory):
+    cohort = generate_cohort(5_000).astype({'HSC': object})
+    cohort.loc[::7, 'HSC'] = np.nan
+    cohort.loc[3, 'HSC'] = 'n/a'  # unparseable values count as missing too
+    cohort.loc[::11, 'Overall'] = np.nan
+    path = tmp_path_factory.mktemp('partitions') / 'cohort.csv'
+    cohort.to_csv(path, index=False)
+    return str(path)
+
+
+def test_slice_matches_full_load_without_reading_required_columns(source, monkeypatch):
+    read = []
+    read_partitions = utils.read_partitions
+    monkeypatch.setattr(utils, 'read_partitions', lambda *args: read.append(args[2]) or read_partitions(*args))
+
+    columns = OBJECTIVE_COLUMNS[3]
+    full = utils.prepare_data(source)
+    department = full['Department'].iloc[0]
+    sliced = utils.prepare_data(source, where={'Department': [department]}, columns=columns)
+
+    assert read and 'HSC' not in read[0], "the slice read HSC only to drop incomplete rows"
+    expected = full.loc[full['Department'] == department, [c for c in full.columns if c in columns]]
+    assert len(sliced) == len(expected) > 0
+    for col in ['Overall', 'Last', 'Semester_sort']:
+        np.testing.assert_array_equal(np.sort(sliced[col].to_numpy()), np.sort(expected[col].to_numpy()))
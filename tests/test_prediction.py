@@ -0,0 +1,76 @@
+"""The CGPA model: normal-equations fit, incremental merges and chunked CSV scoring."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from prediction import (
+    PREDICTORS, RIDGE_ALPHA, TARGET, appended_model, fit_model, regression_stats, score, score_csv, train_model
+)
+from synthetic import generate_cohort
+from utils import apply_schema
+
+
+def _complete(df):
+    values = df[PREDICTORS + [TARGET]].to_numpy(dtype='float64')
+    values = values[~np.isnan(values).any(axis=1)]
+    return values[:, :-1], values[:, -1]
+
+
+def test_fit_matches_least_squares(synthetic_frame):
+    x, y = _complete(synthetic_frame)
+    expected = np.linalg.lstsq(np.column_stack([np.ones(len(x)), x]), y, rcond=None)[0]
+
+    model = fit_model(regression_stats(synthetic_frame), ridge=0.0)
+    assert model['rows'] == len(x)
+    np.testing.assert_allclose(model['intercept'], expected[0], rtol=1e-6)
+    np.testing.assert_allclose(model['coefficients'], expected[1:], rtol=1e-6, atol=1e-9)
+
+
+def test_ridge_matches_augmented_least_squares(synthetic_frame):
+    x, y = _complete(synthetic_frame)
+    xc, yc = x - x.mean(axis=0), y - y.mean()
+    # Ridge on standardized predictors: penalty RIDGE_ALPHA * variance per coefficient
+    penalty = np.diag(np.sqrt(RIDGE_ALPHA * xc.var(axis=0) * len(x)))
+    expected = np.linalg.lstsq(np.vstack([xc, penalty]), np.concatenate([yc, np.zeros(len(PREDICTORS))]), rcond=None)[0]
+
+    model = fit_model(regression_stats(synthetic_frame))
+    np.testing.assert_allclose(model['coefficients'], expected, rtol=1e-6, atol=1e-9)
+    np.testing.assert_allclose(model['intercept'], y.mean() - x.mean(axis=0) @ expected, rtol=1e-6)
+
+
+def test_appended_rows_match_a_full_refit(synthetic_frame):
+    df = synthetic_frame.iloc[:15_000].copy()
+    df.attrs['dataset_version'] = 'prediction-test-base'
+    delta = synthetic_frame.iloc[15_000:]
+    combined = synthetic_frame.copy()
+    combined.attrs['dataset_version'] = 'prediction-test-combined'
+
+    train_model(df, refit=True)  # saved, so the append folds into its statistics
+    merged = appended_model(df, delta, combined)
+    refit = fit_model(regression_stats(combined), dataset_version='prediction-test-combined')
+    for key in ['rows', 'intercept', 'coefficients', 'feature_means', 'feature_stds', 'r2', 'residual_std']:
+        np.testing.assert_allclose(merged[key], refit[key], rtol=1e-9, err_msg=key)
+
+
+def test_appended_model_needs_a_fitted_model(synthetic_frame):
+    df = synthetic_frame.iloc[:100].copy()
+    df.attrs['dataset_version'] = 'prediction-test-never-fitted'
+    assert appended_model(df, synthetic_frame.iloc[100:200], synthetic_frame) is None
+
+
+@pytest.mark.parametrize('chunksize', [777, 100_000])
+def test_score_csv_matches_score(synthetic_frame, tmp_path, chunksize):
+    model = fit_model(regression_stats(synthetic_frame))
+    raw = generate_cohort(3_000, seed=1)
+    input_path, output_path = tmp_path / 'cohort.csv', tmp_path / 'scored.csv'
+    raw.to_csv(input_path, index=False)
+
+    rows, flagged = score_csv(model, input_path, output_path, chunksize=chunksize)
+    scored = pd.read_csv(output_path)
+    expected = score(model, apply_schema(pd.read_csv(input_path)))
+
+    assert rows == len(raw) == len(scored)
+    assert list(scored.columns) == list(raw.columns) + ['Predicted_Overall', 'At_risk']
+    np.testing.assert_allclose(scored['Predicted_Overall'], expected['Predicted_Overall'], atol=5e-4)
+    assert scored['At_risk'].tolist() == expected['At_risk'].tolist()
+    assert flagged == int(expected['At_risk'].sum())
@@ -0,0 +1,66 @@
+"""Every query backend returns what the pandas backend returns.
+
+Counts, minima and maxima must match exactly; sums and quantiles to
+PARITY_RTOL, since the engines add in different orders.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregates import CUBE_DIMENSIONS, MEASURES
+from filters import FILTER_COLUMNS
+from query import get_backend
+
+PARITY_RTOL = 1e-9
+
+ENGINE_MODULES = {'duckdb': 'duckdb', 'polars': 'polars'}
+
+
+def _where(df):
+    """Two labels of each of the first two filter columns."""
+    return {col: list(df[col].dropna().unique()[:2]) for col in FILTER_COLUMNS[:2] if col in df.columns}
+
+
+def _measures(df):
+    return [m for m in MEASURES if m in df.columns]
+
+
+@pytest.fixture(params=list(ENGINE_MODULES))
+def backend(request):
+    pytest.importorskip(ENGINE_MODULES[request.param])
+    return get_backend(request.param)
+
+
+@pytest.fixture(params=['bundled_frame', 'synthetic_frame'])
+def frame(request):
+    return request.getfixturevalue(request.param)
+
+
+@pytest.mark.parametrize('name', list(CUBE_DIMENSIONS))
+@pytest.mark.parametrize('filtered', [False, True], ids=['all', 'filtered'])
+def test_group_stats(backend, frame, name, filtered):
+    dims = list(CUBE_DIMENSIONS[name])
+    if not all(d in frame.columns for d in dims):
+        pytest.skip(f"{name} needs columns the frame lacks")
+    where = _where(frame) if filtered else None
+    expected = get_backend('pandas').group_stats(frame, dims, _measures(frame), where)
+    result = backend.group_stats(frame, dims, _measures(frame), where)
+
+    exact = [c for c in expected.columns if c[1] in ('count', 'min', 'max')]
+    pd.testing.assert_frame_equal(result[exact], expected[exact], check_exact=True)
+    pd.testing.assert_frame_equal(result, expected, check_exact=False, rtol=PARITY_RTOL, atol=0)
+
+
+@pytest.mark.parametrize('q', [0.1, 0.5, 0.9])
+@pytest.mark.parametrize('filtered', [False, True], ids=['all', 'filtered'])
+def test_quantile(backend, frame, q, filtered):
+    column = _measures(frame)[0]
+    where = _where(frame) if filtered else None
+    expected = get_backend('pandas').quantile(frame, column, q, where)
+    result = backend.quantile(frame, column, q, where)
+    assert np.isclose(result, expected, rtol=PARITY_RTOL, atol=0) or (np.isnan(result) and np.isnan(expected))
+
+
+def test_count(backend, frame):
+    where = _where(frame)
+    assert backend.count(frame, where) == get_backend('pandas').count(frame, where)
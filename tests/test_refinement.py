@@ -0,0 +1,46 @@
+"""Large cohorts render sample estimates first while the exact cube is built off the script thread."""
+import threading
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import aggregates
+import metrics
+import utils
+
+ROOT = Path(__file__).resolve().parent.parent
+COMPUTING = "⏳ Computing exact statistics…"
+
+
+@pytest.fixture
+def gated_cube(monkeypatch):
+    """Background cube builds wait until the returned event is set."""
+    gate, build_cube = threading.Event(), aggregates.build_cube
+
+    def gated_build(df):
+        gate.wait(60)
+        return build_cube(df)
+
+    monkeypatch.setattr(metrics, 'APPROX_MIN_ROWS', 1)  # every cohort counts as large
+    monkeypatch.setattr(aggregates, 'build_cube', gated_build)
+    monkeypatch.setattr(aggregates, '_BACKGROUND_CUBES', {})
+    yield gate
+    gate.set()
+
+
+@pytest.mark.parametrize('page', ['objective1.py', 'objective2.py', 'objective3.py'])
+def test_charts_wait_for_the_exact_cube_without_blocking(page, gated_cube):
+    df = utils.get_data()
+    app = AppTest.from_file(str(ROOT / page), default_timeout=30)
+    app.run()  # would time out if the script waited for the gated cube
+    assert not app.exception
+    assert COMPUTING in [caption.value for caption in app.caption]
+    assert any(caption.value.startswith("≈ Estimated") for caption in app.caption)
+
+    gated_cube.set()
+    aggregates._BACKGROUND_CUBES[df.attrs['dataset_version']].result(timeout=60)
+    app.run()
+    assert not app.exception
+    assert COMPUTING not in [caption.value for caption in app.caption]
+    assert not any(caption.value.startswith("≈ Estimated") for caption in app.caption)
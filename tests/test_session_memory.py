@@ -0,0 +1,61 @@
+"""Sessions share one read-only dataset instead of each holding a copy."""
+import gc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils
+from session_memory import additional_session_bytes, session_memory
+from synthetic import generate_cohort
+from utils import COL_HSC, LOCAL_DATA_PATH, _dataset, freeze, get_data, is_frozen
+
+# Large enough that a copied frame would dwarf a session's own widgets and figures
+SESSION_TEST_ROWS = 300_000
+SESSIONS = 5
+# Each extra session holds its widgets and figure payloads (about 2 MB here); a copy of the data costs 100%
+SESSION_BUDGET_FRACTION = 0.2
+
+
+def test_page_edits_stay_in_the_view():
+    source = str(LOCAL_DATA_PATH)
+    shared = _dataset(source).current()
+    before = pd.util.hash_pandas_object(shared, index=True).sum()
+    assert is_frozen(shared)
+
+    view = get_data(source)
+    assert view is not shared
+    assert np.shares_memory(view[COL_HSC].to_numpy(), shared[COL_HSC].to_numpy()), "get_data copied the buffers"
+
+    dropped = view.columns[-1]
+    view['scratch'] = 1.0  # typical page edits: new column, overwritten values, in-place drops
+    view.loc[view.index[:10], COL_HSC] = -1.0
+    view.drop(columns=dropped, inplace=True)
+    view.attrs['dataset_version'] = 'edited'
+
+    assert 'scratch' not in shared.columns and dropped in shared.columns
+    assert pd.util.hash_pandas_object(shared, index=True).sum() == before
+    assert shared.attrs['dataset_version'] != 'edited'
+
+
+def test_direct_writes_to_the_shared_frame_raise(bundled_frame):
+    # A frame frozen like the shared one but with no views alive, so copy-on-write writes straight
+    # into its buffers (the process-wide frame may still be viewed by sessions other tests left behind)
+    shared = freeze(bundled_frame.copy())
+    gc.collect()
+    for col in [COL_HSC, utils.COL_GENDER]:
+        with pytest.raises(ValueError):
+            shared.loc[shared.index[:1], col] = shared[col].iloc[1]
+
+
+def test_additional_session_memory(tmp_path, monkeypatch):
+    source = tmp_path / 'cohort.csv'
+    generate_cohort(SESSION_TEST_ROWS).to_csv(source, index=False)
+    monkeypatch.setattr(utils, 'DATA_SOURCE', str(source))  # read when each session picks its dataset
+
+    rows, data_bytes = session_memory('objective1.py', SESSIONS)
+    per_session = additional_session_bytes(rows)
+    assert per_session < SESSION_BUDGET_FRACTION * data_bytes, (
+        f"each additional session costs {utils.format_bytes(per_session)} "
+        f"({per_session / data_bytes:.0%} of the {utils.format_bytes(data_bytes)} dataset)"
+    )
@@ -0,0 +1,36 @@
+"""Cold start stays within its stage budgets, and the homepage stays light."""
+import pytest
+
+from startup_report import BUDGETS, PREFETCH_PROBE_SECONDS, startup_report
+
+
+@pytest.fixture(scope='module')
+def report():
+    """One cold-start report: every stage runs in a fresh interpreter."""
+    return startup_report()
+
+
+@pytest.mark.parametrize('stage', sorted(BUDGETS))
+def test_stage_within_budget(report, stage):
+    assert report['stages'][stage] <= BUDGETS[stage], (
+        f"{stage} took {report['stages'][stage]:.2f}s (budget {BUDGETS[stage]:.2f}s)"
+    )
+
+
+def test_home_starts_the_load_without_waiting(report):
+    prefetch = report['prefetch']
+    assert not prefetch['exceptions']
+    assert prefetch['load_started'], "home.py did not start the dataset load in the background"
+    assert prefetch['seconds'] < PREFETCH_PROBE_SECONDS, (
+        f"home.py waited for the dataset load ({prefetch['seconds']:.2f}s with a {PREFETCH_PROBE_SECONDS:.0f}s load)"
+    )
+
+
+def test_home_does_not_import_plotly(report):
+    assert not report['pages']['home.py']['plotly_imported']
+
+
+def test_pages_run_cold(report):
+    raised = {page: result['exceptions'] for page, result in report['pages'].items() if result['exceptions']}
+    assert not raised
+    assert report['pages']['objective1.py']['data_ready']
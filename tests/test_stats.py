@@ -0,0 +1,24 @@
+"""Student t quantiles behind the group-mean confidence intervals."""
+import numpy as np
+import pytest
+
+from stats import T_EXACT_MAX_DOF, t_quantile
+
+# Two-sided 95% critical values, t(0.975, dof)
+REFERENCE = {
+    1: 12.7062047362, 2: 4.30265272975, 3: 3.18244630528, 4: 2.7764451052, 5: 2.57058183661,
+    10: 2.22813885196, 29: 2.04522964213, 30: 2.0422724563, 100: 1.98397151852,
+}
+
+
+@pytest.mark.parametrize('dof', sorted(REFERENCE))
+def test_t_quantile(dof):
+    tolerance = 1e-9 if dof < T_EXACT_MAX_DOF else 1e-5
+    assert float(t_quantile(0.975, dof)) == pytest.approx(REFERENCE[dof], abs=tolerance)
+    assert float(t_quantile(0.025, dof)) == pytest.approx(-REFERENCE[dof], abs=tolerance)
+
+
+def test_t_quantile_arrays():
+    quantiles = t_quantile(0.975, np.array([1.0, 4.0, 100.0, np.nan]))
+    np.testing.assert_allclose(quantiles[:3], [REFERENCE[1], REFERENCE[4], REFERENCE[100]], atol=1e-5)
+    assert np.isnan(quantiles[3])
@@ -1,11 +1,42 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
+import numpy as np
 import pandas as pd
-from collections import OrderedDict
+
+from ingest import (
+    BASE_DIR, LOCAL_DATA_PATH, REQUIRED_COLUMNS, can_partition, file_state, is_remote, read_appended,
+    read_partitions, read_source, source_fingerprint
+)
+
+logger = logging.getLogger('dashboard.data')
 
 # --- Constants ---
 # Assuming the file is hosted online or accessible via a path
 DATA_URL = 'https://raw.githubusercontent.com/tirayanaa-aa/AssingmentSV/refs/heads/main/processed_data.csv'
 
+# Prefer the bundled CSV (converted once to a local columnar artifact) over the network copy.
+# STUDENT_DATA_SOURCE can point at any other CSV path or URL.
+DATA_SOURCE = os.environ.get(
+    'STUDENT_DATA_SOURCE', str(LOCAL_DATA_PATH) if LOCAL_DATA_PATH.exists() else DATA_URL
+)
+
+# Further cohorts users can switch between (e.g. one per faculty or intake year): every CSV in
+# datasets/, plus STUDENT_DATASETS entries written as "Label=path-or-url;Other label=path-or-url".
+DATASETS_DIR = BASE_DIR / 'datasets'
+DEFAULT_DATASET_LABEL = 'All students'
+
+# Loaded datasets share this memory budget; the least recently used ones are evicted beyond it
+DATA_CACHE_BUDGET_BYTES = int(float(os.environ.get('STUDENT_DATA_CACHE_MB', 1024)) * 2**20)
+
+# 'full' loads the whole source into memory; 'stream' folds it chunk by chunk into
+# mergeable summaries plus a bounded row sample (see streaming.py) for larger-than-RAM exports.
+INGEST_MODE = os.environ.get('STUDENT_INGEST_MODE', 'full')
+
 # Define columns
 COL_HSC = 'HSC'
 COL_SSC = 'SSC'
@@ -24,43 +55,542 @@ COL_GAMING = 'Gaming'
 ATTENDANCE_ORDER = ['0%-19%', '20%-39%', 'Below 40%', '40%-59%', '60%-79%', '80%-100%']
 PREP_ORDER = ['0-1 Hour', '1-2 Hours', '2-3 Hours', 'More than 3 Hours']
 GAMING_ORDER = ['0-1 Hour', '1-2 Hours', '2-3 Hours', 'More than 3 Hours']
+INCOME_ORDER = [
+    'Low (Below 15,000)', 'Lower middle (15,000-30,000)',
+    'Upper middle (30,000-50,000)', 'High (Above 50,000)'
+]
+
+# Numeric values behind the ordered habit categories (same position as the order lists)
+PREP_HOURS = [0.5, 1.5, 2.5, 3.5]
+ATTENDANCE_PERCENT = [10, 30, 30, 50, 70, 90]
+
+# --- In-memory Schema ---
+# Every label column is held as a pandas category and the scores as float32,
+# which keeps large cohort exports small and makes groupbys work on integer codes.
+ORDERED_CATEGORIES = {
+    COL_PREPARATION: PREP_ORDER,
+    COL_GAMING: GAMING_ORDER,
+    COL_ATTENDANCE: ATTENDANCE_ORDER,
+    COL_INCOME: INCOME_ORDER,
+}
+UNORDERED_CATEGORIES = [COL_DEPARTMENT, COL_GENDER, COL_HOMETOWN, 'Job', 'Extra']
+FLOAT32_COLUMNS = [COL_HSC, COL_SSC, COL_LAST, COL_OVERALL]
+
+# Columns apply_schema derives, and the raw column each one is computed from
+DERIVED_FROM = {
+    'Preparation_numeric': COL_PREPARATION,
+    'Attendance_numeric': COL_ATTENDANCE,
+    'Gaming_numeric': COL_GAMING,
+    'Semester_sort': COL_SEMESTER,
+    'Semester_numeric': COL_SEMESTER,
+}
+
+
+def _ordered_categorical(series, order):
+    """Ordered category using `order`; unexpected labels are kept, appended after the known ones."""
+    present = pd.unique(series.dropna())
+    extras = sorted(str(v) for v in present if v not in order)
+    return pd.Categorical(series, categories=list(order) + extras, ordered=True)
+
+
+def _semester_categorical(series):
+    """Semester labels ordered by their number, plus the per-category sort key."""
+    labels = pd.Series(pd.unique(series.dropna()), dtype=object)
+    numbers = labels.str.extract(r'(\d+)')[0].astype(float)
+    ranked = labels.iloc[numbers.fillna(float('inf')).argsort(kind='stable')]
+    categories = pd.Index(ranked.tolist())
+    lookup = numbers.set_axis(labels.tolist()).reindex(categories).to_numpy()
+    return pd.Categorical(series, categories=categories, ordered=True), lookup
+
+
+def _from_codes(categorical, values):
+    """Maps category codes to `values` (one per category); missing labels become NaN."""
+    values = np.append(np.asarray(values, dtype='float64'), np.nan)
+    return values[categorical.codes]  # code -1 picks the trailing NaN
+
+
+def apply_schema(df):
+    """Converts a raw frame to the compact schema and derives the numeric habit columns."""
+    for col in FLOAT32_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float32')
+
+    for col, order in ORDERED_CATEGORIES.items():
+        if col in df.columns:
+            df[col] = _ordered_categorical(df[col], order)
+
+    for col in UNORDERED_CATEGORIES:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
+    # Create numerical mappings for correlation through category-code lookups
+    if COL_PREPARATION in df.columns:
+        prep = df[COL_PREPARATION].cat
+        hours = [PREP_HOURS[PREP_ORDER.index(c)] if c in PREP_ORDER else np.nan for c in prep.categories]
+        df['Preparation_numeric'] = _from_codes(prep, hours)
+
+    if COL_ATTENDANCE in df.columns:
+        att = df[COL_ATTENDANCE].cat
+        percent = [ATTENDANCE_PERCENT[ATTENDANCE_ORDER.index(c)] if c in ATTENDANCE_ORDER else np.nan for c in att.categories]
+        df['Attendance_numeric'] = _from_codes(att, percent)
+
+    if COL_GAMING in df.columns:
+        gaming = df[COL_GAMING].cat
+        hours = [PREP_HOURS[GAMING_ORDER.index(c)] if c in GAMING_ORDER else np.nan for c in gaming.categories]
+        df['Gaming_numeric'] = _from_codes(gaming, hours)
+
+    # Handle Semester column for line plot ordering
+    if COL_SEMESTER in df.columns:
+        semesters, sort_keys = _semester_categorical(df[COL_SEMESTER])
+        df[COL_SEMESTER] = semesters
+        df['Semester_sort'] = _from_codes(semesters, sort_keys)
+        # The exported Semester_numeric column is empty, so fill it from the parsed semester number
+        df['Semester_numeric'] = df['Semester_sort']
+
+    return df
+
+
+def format_bytes(n):
+    """Human-readable byte count (e.g. '1.2 MB')."""
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if abs(n) < 1024 or unit == 'GB':
+            return f"{n:.0f} {unit}" if unit == 'B' else f"{n:.1f} {unit}"
+        n /= 1024
+
 
 # --- Data Loading and Caching ---
 
-@st.cache_data
-def load_data(url):
-    """Loads and pre-processes the dataset."""
-    try:
-        df = pd.read_csv(url)
-        
-        # Ensure core academic columns are numeric
-        required_cols = [COL_HSC, COL_SSC, COL_LAST, COL_OVERALL]
-        for col in required_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-
-        # Create numerical mappings for correlation
-        preparation_mapping = OrderedDict(zip(PREP_ORDER, [0.5, 1.5, 2.5, 3.5]))
-        if COL_PREPARATION in df.columns:
-            df['Preparation_numeric'] = df[COL_PREPARATION].map(preparation_mapping)
-        
-        attendance_mapping = OrderedDict(zip(ATTENDANCE_ORDER, [10, 30, 30, 50, 70, 90]))
-        if COL_ATTENDANCE in df.columns:
-             df['Attendance_numeric'] = df[COL_ATTENDANCE].map(attendance_mapping)
-             df[COL_ATTENDANCE] = pd.Categorical(df[COL_ATTENDANCE], categories=[c for c in ATTENDANCE_ORDER if c in df[COL_ATTENDANCE].unique()], ordered=True)
-
-        # Handle Semester column for line plot ordering
-        if COL_SEMESTER in df.columns:
-            df['Semester_sort'] = df[COL_SEMESTER].str.extract('(\d+)').astype(float)
-        
-        df.dropna(subset=[COL_HSC, COL_LAST, COL_OVERALL], inplace=True)
+@st.cache_resource(show_spinner=False)
+def load_stream_summary(source):
+    """Streams the source once into a streaming.StreamSummary shared by every session."""
+    from streaming import stream_ingest  # streaming builds on this module
+
+    return stream_ingest(source)
+
+
+def _load_streamed(source):
+    from streaming import sample_frame
+
+    summary = load_stream_summary(source)
+    df = sample_frame(summary)
+    df.attrs['dataset_version'] = summary.dataset_version
+    df.attrs['ingest_mode'] = 'stream'
+    df.attrs['source'] = source
+    df.attrs['total_rows'] = summary.rows
+    return df
+
+
+def _read_slice(source, where, columns):
+    """Raw rows matching `where` with the columns needed to derive `columns`, plus the slice's version."""
+    raw_columns = None
+    if columns is not None:
+        raw_columns = set(columns) | {DERIVED_FROM[c] for c in columns if c in DERIVED_FROM}
+    if can_partition(source):  # the layout holds complete rows only, so REQUIRED_COLUMNS need not be read
+        df, content_hash = read_partitions(source, where, raw_columns)
+    else:  # no partitioned layout: read everything and slice in memory
+        df, content_hash = read_source(source)
+        for col, values in (where or {}).items():
+            df = df[df[col].astype(str).isin([str(v) for v in values])]
+        if raw_columns is not None:  # keep the columns whose missing values drop a row, for the dropna below
+            df = df[[c for c in df.columns if c in raw_columns or c in REQUIRED_COLUMNS]]
+    key = f"{content_hash}|{sorted((k, sorted(map(str, v))) for k, v in (where or {}).items())}|{sorted(columns or [])}"
+    return df, hashlib.sha256(key.encode()).hexdigest()
+
 
+def prepare_data(source, where=None, columns=None):
+    """Reads a source through its local columnar cache and applies the in-memory schema (uncached).
+
+    With `where` ({column: [values]}) and/or `columns`, only that slice is
+    read: from the Semester/Department-partitioned layout (ingest.py), whose
+    non-matching partitions and unlisted columns are never opened. A slice
+    has its own dataset version.
+    """
+    if where or columns is not None:
+        df, content_hash = _read_slice(source, where, columns)
+    elif INGEST_MODE == 'stream':
+        return _load_streamed(source)
+    else:
+        df, content_hash = read_source(source)
+    raw_bytes = int(df.memory_usage(deep=True).sum())
+
+    df = apply_schema(df)
+    df.dropna(subset=[col for col in REQUIRED_COLUMNS if col in df.columns], inplace=True)
+    if COL_ATTENDANCE in df.columns:
+        df[COL_ATTENDANCE] = df[COL_ATTENDANCE].cat.remove_unused_categories()
+    if columns is not None:
+        df = df[[col for col in df.columns if col in columns]]
+
+    compact_bytes = int(df.memory_usage(deep=True).sum())
+    df.attrs['dataset_version'] = content_hash
+    if where or columns is not None:
+        df.attrs['slice'] = {'where': where, 'columns': columns}
+    df.attrs['memory_report'] = {
+        'raw_bytes': raw_bytes,
+        'compact_bytes': compact_bytes,
+        'saved_bytes': raw_bytes - compact_bytes,
+    }
+    return df
+
+
+def load_data(source):
+    """Loads and pre-processes the dataset from its local columnar cache (built on first use).
+
+    Uncached on its own; get_data keeps loaded datasets in the shared, memory-bounded dataset cache.
+    """
+    try:
         # In a real app, you might not show st.success here, but we'll leave it for debugging
         # st.success(f"Successfully loaded and pre-processed {len(df)} rows.")
-        return df
+        return prepare_data(source)
     except Exception as e:
-        st.error(f"Error loading or processing data from URL: {e}")
+        st.error(f"Error loading or processing data from {source}: {e}")
         return pd.DataFrame()
 
-# Load the data once and make it accessible
-DF = load_data(DATA_URL)
+
+# --- Shared Read-Only Frames ---
+# Every session reads the same loaded frame. It is rebuilt once over read-only views of its column
+# buffers, and callers get a shallow view: with copy-on-write (always on from pandas 3, the minimum
+# in requirements.txt), page code that assigns, drops or edits columns on the view copies only
+# what it touches, and a direct write into the shared buffers raises. Only public accessors are used, so a pandas upgrade cannot bypass the guard.
+
+def _read_only(series):
+    """series' values over a read-only buffer (a view of the NumPy data, a copy of categorical codes)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Categorical keeps its own view of the codes, so the codes it is built from must own their
+        # (one byte per row) buffer for the read-only flag to carry over
+        codes = series.cat.codes.to_numpy().copy()
+        codes.flags.writeable = False
+        return pd.Categorical.from_codes(codes, dtype=series.dtype)
+    if isinstance(series.dtype, np.dtype):
+        values = series.to_numpy()
+        values.flags.writeable = False
+        return values
+    return series.array  # other extension arrays (strings) replace their data on assignment
+
+
+def freeze(df):
+    """A frame over read-only views of df's column buffers, with df's index and attrs."""
+    frozen = pd.DataFrame({col: _read_only(df[col]) for col in df.columns}, index=df.index, copy=False)
+    frozen.attrs = df.attrs
+    return frozen
+
+
+def _buffer(series):
+    """The array series' values are stored in: categorical codes or the NumPy data (None for others)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.array.codes.base  # .codes is a read-only view; its base owns the stored codes
+    if isinstance(series.dtype, np.dtype):
+        return np.asarray(series.array)
+    return None
+
+
+def is_frozen(df):
+    """True when none of df's column buffers can be written in place."""
+    buffers = (_buffer(df[col]) for col in df.columns)
+    return all(not buffer.flags.writeable for buffer in buffers if buffer is not None)
+
+
+def shared_view(df):
+    """A zero-copy view of a shared frame that page code may modify without affecting other sessions."""
+    return df.copy(deep=False)
+
+
+# --- Incremental Refresh ---
+
+def _merged_categories(col, known, new):
+    """Category list covering both frames, in the order apply_schema would have produced."""
+    labels = list(known) + [c for c in new if c not in known]
+    if col in ORDERED_CATEGORIES:
+        order = ORDERED_CATEGORIES[col]
+        return [c for c in order if c in labels] + sorted(c for c in labels if c not in order)
+    if col == COL_SEMESTER:
+        return list(_semester_categorical(pd.Series(labels))[0].categories)
+    return sorted(labels)
+
+
+def _align_categories(df, delta):
+    """Gives both frames identical category dtypes so concat keeps the compact columns."""
+    for col in df.columns:
+        if col in delta.columns and isinstance(df[col].dtype, pd.CategoricalDtype):
+            known = df[col].cat.categories
+            used = delta[col].cat.remove_unused_categories().cat.categories
+            if not used.isin(known).all():
+                df[col] = df[col].cat.set_categories(_merged_categories(col, known, used))
+            delta[col] = delta[col].cat.set_categories(df[col].cat.categories)
+    return df, delta
+
+
+def append_rows(df, delta_raw, delta_bytes):
+    """Preprocesses only the appended rows and returns the extended frame under a new dataset version."""
+    delta = apply_schema(delta_raw)
+    delta = delta.dropna(subset=REQUIRED_COLUMNS)
+    delta.index = pd.RangeIndex(df.index.max() + 1, df.index.max() + 1 + len(delta)) if len(df) else delta.index
+
+    df, delta = _align_categories(df.copy(deep=False), delta)
+    combined = pd.concat([df, delta[df.columns]])
+    version = hashlib.sha256((df.attrs['dataset_version'] + hashlib.sha256(delta_bytes).hexdigest()).encode()).hexdigest()
+
+    combined.attrs = dict(df.attrs, dataset_version=version, appended_rows=df.attrs.get('appended_rows', 0) + len(delta))
+    if 'memory_report' in df.attrs:
+        report = dict(df.attrs['memory_report'])
+        report['compact_bytes'] = int(combined.memory_usage(deep=True).sum())
+        combined.attrs['memory_report'] = report
+    return combined, delta
+
+
+class LiveDataset:
+    """The current frame for a source; local sources are extended in place of a reload when rows are appended."""
+
+    def __init__(self, source):
+        self.source = source
+        self._lock = threading.Lock()
+        self.live = INGEST_MODE != 'stream' and not is_remote(source)
+        self.state = file_state(source) if self.live else None
+        self.df = freeze(load_data(source))
+
+    @property
+    def nbytes(self):
+        """Memory held by the frame (the compact size recorded at load, when available)."""
+        report = self.df.attrs.get('memory_report')
+        return report['compact_bytes'] if report else int(self.df.memory_usage(deep=True).sum())
+
+    def current(self):
+        """Returns the frame, first folding in any rows appended to the source since the last call."""
+        if self.df.empty or not self.live:
+            return self.df
+        with self._lock:
+            try:
+                self._refresh()
+            except Exception:
+                # df and state are left as they were, so the next call retries the same change
+                logger.exception("Could not refresh %s; serving the previous data", self.source)
+        return self.df
+
+    def _refresh(self):
+        """Swaps in the appended (or reloaded) frame together with its state, once everything it needs is built."""
+        appended = read_appended(self.source, self.state)
+        if appended is None:
+            # Rewritten rather than appended: full reload (new content hash, new artifact)
+            state = file_state(self.source)
+            self.df, self.state = freeze(prepare_data(self.source)), state
+            return
+        delta_raw, delta_bytes, state = appended
+        if not len(delta_raw):
+            return
+
+        from aggregates import build_cube, get_cube, merge_cubes, register_cube
+        from correlation import appended_stats, register_stats
+        from prediction import appended_model, save_model
+
+        previous = self.df
+        combined, delta = append_rows(previous, delta_raw, delta_bytes)
+        combined = freeze(combined)
+        version = combined.attrs['dataset_version']
+        cube = merge_cubes(get_cube(previous), build_cube(delta))
+        pearson = appended_stats(previous, delta)
+        model = appended_model(previous, delta, combined)
+
+        register_cube(version, cube)
+        register_stats(version, 'pearson', pearson)
+        self.df, self.state = combined, state
+        if model is not None:
+            try:
+                save_model(model)
+            except OSError:
+                logger.warning("Could not save the CGPA model for %s; it is refitted on first use", self.source)
+
+
+# --- Dataset Catalog ---
+
+def available_datasets():
+    """Selectable datasets as {label: source}; the configured default source comes first."""
+    datasets = {DEFAULT_DATASET_LABEL: DATA_SOURCE}
+    if DATASETS_DIR.is_dir():
+        for path in sorted(DATASETS_DIR.glob('*.csv')):
+            datasets[path.stem.replace('_', ' ')] = str(path)
+    for entry in os.environ.get('STUDENT_DATASETS', '').split(';'):
+        label, _, source = entry.partition('=')
+        if label.strip() and source.strip():
+            datasets[label.strip()] = source.strip()
+    return datasets
+
+
+def selected_source():
+    """Source of the dataset chosen in this session (the default source outside a session)."""
+    try:
+        label = st.session_state.get('_dataset')
+    except Exception:  # no Streamlit session (e.g. bare scripts)
+        label = None
+    return available_datasets().get(label, DATA_SOURCE)
+
+
+def dataset_selector():
+    """Sidebar picker for the dataset every page reads; only shown when there is more than one."""
+    datasets = available_datasets()
+    if len(datasets) < 2:
+        return
+    labels = list(datasets)
+    current = st.session_state.get('_dataset')
+    # Stored outside the widget key, since widget state does not survive a page switch
+    choice = st.sidebar.selectbox(
+        "📂 Dataset", labels, index=labels.index(current) if current in labels else 0,
+        help="Cohort datasets loaded on demand and kept in a shared, memory-bounded cache."
+    )
+    st.session_state['_dataset'] = choice
+
+
+# --- Dataset Cache ---
+# Loaded datasets are keyed by source content hash, so identical files behind different
+# labels or paths share one copy, and held in LRU order under DATA_CACHE_BUDGET_BYTES.
+
+_DATASETS = OrderedDict()  # content key -> LiveDataset
+_SOURCE_KEYS = {}          # source -> content key of its loaded entry
+_SOURCE_LOCKS = {}
+_CACHE_LOCK = threading.Lock()
+_CACHE_COUNTERS = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+
+def _content_key(source):
+    if INGEST_MODE == 'stream':
+        return f'stream:{source}'
+    if is_remote(source):
+        return source  # the content is only known once fetched; read_source caches it by hash
+    return source_fingerprint(source)
+
+
+def _evict_datasets(keep):
+    """Drops least recently used datasets (never `keep`) until the cache fits its budget."""
+    while sum(d.nbytes for d in _DATASETS.values()) > DATA_CACHE_BUDGET_BYTES:
+        victim = next((k for k in _DATASETS if k != keep), None)
+        if victim is None:
+            return
+        _DATASETS.pop(victim)
+        for source in [s for s, k in _SOURCE_KEYS.items() if k == victim]:
+            del _SOURCE_KEYS[source]
+        _CACHE_COUNTERS['evictions'] += 1
+
+
+def _dataset(source):
+    with _CACHE_LOCK:
+        key = _SOURCE_KEYS.get(source)
+        if key in _DATASETS:
+            _DATASETS.move_to_end(key)
+            _CACHE_COUNTERS['hits'] += 1
+            return _DATASETS[key]
+        source_lock = _SOURCE_LOCKS.setdefault(source, threading.Lock())
+
+    with source_lock:  # one load per source, while other datasets stay available
+        key = _content_key(source)
+        with _CACHE_LOCK:
+            if key in _DATASETS:  # loaded meanwhile, or the same content under another source
+                _SOURCE_KEYS[source] = key
+                _DATASETS.move_to_end(key)
+                _CACHE_COUNTERS['hits'] += 1
+                return _DATASETS[key]
+        dataset = LiveDataset(source)
+        with _CACHE_LOCK:
+            _CACHE_COUNTERS['misses'] += 1
+            if not dataset.df.empty:  # failed loads are retried on the next rerun
+                _DATASETS[key] = dataset
+                _SOURCE_KEYS[source] = key
+                _evict_datasets(keep=key)
+    return dataset
+
+
+def dataset_cache_stats():
+    """Loaded datasets with their rows and bytes, plus counters, total bytes and the budget."""
+    with _CACHE_LOCK:
+        sources = {k: s for s, k in _SOURCE_KEYS.items()}
+        entries = [
+            {'source': sources.get(key, dataset.source), 'rows': len(dataset.df), 'bytes': dataset.nbytes,
+             'version': dataset.df.attrs.get('dataset_version', '')[:12]}
+            for key, dataset in _DATASETS.items()
+        ]
+        return dict(
+            _CACHE_COUNTERS, entries=entries, bytes=sum(e['bytes'] for e in entries),
+            budget_bytes=DATA_CACHE_BUDGET_BYTES
+        )
+
+
+# Sources whose data has been loaded in this process (lets the homepage report status without loading)
+_LOADED_SOURCES = set()
+
+
+def get_data(source=None):
+    """The dataset pages should read on each rerun; loads on first use, and local sources pick up appended rows.
+
+    Without a source, the dataset selected in this session is used.
+    """
+    source = source or selected_source()
+    df = _dataset(source).current()
+    _LOADED_SOURCES.add(source)
+    return shared_view(df)  # every session reads the same buffers; edits stay in its own view
+
+
+# --- Background Loading ---
+# Pages start the selected dataset loading on a worker thread and render their static content
+# (titles, key findings, interpretations) at once; data sections show a loading note until it arrives.
+
+LOAD_WAIT_SECONDS = 0.5  # a load finishing within this renders in the same run, without loading notes
+LOAD_POLL_SECONDS = 0.5
+
+_LOADS = {}  # source -> Future of its dataset
+_load_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='load')
+
+
+def data_ready(source=None):
+    """True when get_data(source) returns without waiting for a load."""
+    source = source or selected_source()
+    with _CACHE_LOCK:
+        return _SOURCE_KEYS.get(source) in _DATASETS
+
+
+def load_in_background(source=None):
+    """Starts loading a dataset on a worker thread (once per source, again after a failure); returns its Future."""
+    source = source or selected_source()
+    with _CACHE_LOCK:
+        future = _LOADS.get(source)
+        if future is None or (future.done() and _SOURCE_KEYS.get(source) not in _DATASETS):
+            future = _LOADS[source] = _load_pool.submit(_dataset, source)
+    return future
+
+
+def await_data(source=None):
+    """The dataset pages should read, or None while it is still loading in the background.
+
+    Waits up to LOAD_WAIT_SECONDS first. While the result is None, a fragment
+    polls the load and reruns the page once it has finished.
+    """
+    source = source or selected_source()
+    if not data_ready(source):
+        future = load_in_background(source)
+        try:
+            future.result(timeout=LOAD_WAIT_SECONDS)
+        except TimeoutError:
+            @st.fragment(run_every=LOAD_POLL_SECONDS)
+            def poll_load():
+                if future.done():
+                    st.rerun()
+
+            poll_load()
+            return None
+    return get_data(source)  # a failed load is retried here, so its error shows on the page
+
+
+def loading_note(computing=False):
+    """Stand-in for a data section while the dataset loads (computing: while its exact statistics are built)."""
+    st.caption("⏳ Computing exact statistics…" if computing else "⏳ Loading data…")
+
+
+def peek_data(source=None):
+    """The dataset if it is already loaded in this process, else None (never triggers a load)."""
+    source = source or selected_source()
+    with _CACHE_LOCK:
+        loaded = _SOURCE_KEYS.get(source) in _DATASETS
+    return get_data(source) if loaded else None
+
+
+def __getattr__(name):
+    # `from utils import DF` keeps working, but the data now loads on first access instead of at import
+    if name == 'DF':
+        return get_data()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")